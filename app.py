@@ -19,8 +19,17 @@ from visualizations import (
 )
 from trend_analyzer import analyze_trends
 from disaster_keywords import get_disaster_keywords
-from utils import filter_dataframe, export_data
-from database import save_tweets, get_tweets, get_tweet_count, clear_old_tweets
+from utils import filter_dataframe, export_data_chunks, keep_newest
+from time_rollup import TimeRollup
+from search_index import InvertedIndex
+from ingest_queue import get_ingest_queue
+from database import get_tweets, iter_tweets, get_tweet_stats, get_rollup_counts, get_pool_stats, search_tweets, get_tweet_page, clear_old_tweets
+
+# Maximum number of tweets kept in the session
+MAX_SESSION_TWEETS = int(os.environ.get('MAX_SESSION_TWEETS', 1000))
+
+# Seconds the charts wait for queued tweets to be saved before reading the database rollups
+CHART_FLUSH_TIMEOUT = float(os.environ.get('CHART_FLUSH_TIMEOUT', 2))
 
 # Page configuration
 st.set_page_config(
@@ -41,6 +50,14 @@ if 'filter_query' not in st.session_state:
     st.session_state.filter_query = ""
 if 'selected_disaster_type' not in st.session_state:
     st.session_state.selected_disaster_type = "All"
+if 'rollup' not in st.session_state:
+    st.session_state.rollup = TimeRollup()  # per-bucket counts of the tweets in tweets_df
+    st.session_state.rollup_cutoff = None  # buckets before this time were evicted from the rollup
+if 'search_index' not in st.session_state:
+    st.session_state.search_index = InvertedIndex()  # word index over the rows of tweets_df
+if 'browse_pages' not in st.session_state:
+    st.session_state.browse_pages = []  # pages of stored tweets loaded in the browser, newest first
+    st.session_state.browse_cursor = None  # cursor of the next page; None once the last page is loaded
 
 # Import mock data generator
 from mock_data_generator import generate_mock_tweets, get_mock_tweet_trends
@@ -62,16 +79,56 @@ def fetch_tweets(mock_generator, disaster_type="All", count=100):
     # Generate mock tweets
     tweets_df = generate_mock_tweets(count=count, disaster_type=disaster_type, time_range=time_range)
     
-    # Add to existing dataframe if it exists
-    if not st.session_state.tweets_df.empty:
-        tweets_df = pd.concat([tweets_df, st.session_state.tweets_df]).drop_duplicates(subset=['id']).reset_index(drop=True)
-        
-        # Keep only last 1000 tweets to manage memory
-        if len(tweets_df) > 1000:
-            tweets_df = tweets_df.head(1000)
-    
     return tweets_df
 
+# Function to add tweets to the session, keeping the rollup and search index in sync
+def append_session_tweets(new_df):
+    old_df = st.session_state.tweets_df
+    
+    # Append tweets not already in the session at the end
+    new_df = new_df.drop_duplicates(subset=['id'])
+    if not old_df.empty:
+        new_df = new_df[~new_df['id'].isin(old_df['id'])]
+    tweets_df = pd.concat([old_df, new_df], ignore_index=True) if not old_df.empty else new_df.reset_index(drop=True)
+    
+    st.session_state.rollup.apply(new_df)
+    
+    # Keep only the newest tweets by creation time to manage memory, oldest first
+    kept_df, dropped_df = keep_newest(tweets_df, MAX_SESSION_TWEETS)
+    if not dropped_df.empty:
+        st.session_state.rollup.remove(dropped_df)
+    
+    if kept_df.index.equals(pd.RangeIndex(len(dropped_df), len(tweets_df))):
+        # Rows kept their order and only the front was dropped: update the index in place
+        st.session_state.search_index.add(new_df)
+        st.session_state.search_index.drop_first(len(dropped_df))
+    else:
+        st.session_state.search_index = InvertedIndex.from_frame(kept_df)
+    
+    st.session_state.tweets_df = kept_df.reset_index(drop=True)
+
+# Function to clear the session tweets
+def reset_session_tweets():
+    st.session_state.tweets_df = pd.DataFrame()
+    st.session_state.rollup.clear()
+    st.session_state.rollup_cutoff = None
+    st.session_state.search_index.clear()
+
+# Function to get the session rollup for a time range, evicting older buckets
+def get_session_rollup(time_start):
+    cutoff = st.session_state.rollup_cutoff
+    
+    # Evicted counts are gone; recount the session tweets when the range widens
+    if cutoff is not None and (time_start is None or time_start < cutoff):
+        st.session_state.rollup = TimeRollup.from_frame(st.session_state.tweets_df)
+        st.session_state.rollup_cutoff = None
+    
+    if time_start is not None:
+        st.session_state.rollup.evict_before(time_start)
+        st.session_state.rollup_cutoff = time_start
+    
+    return st.session_state.rollup
+
 # Function to refresh data
 def refresh_data():
     mock_generator = initialize_mock_data_generator()
@@ -86,20 +143,18 @@ def refresh_data():
         tweets_df = fetch_tweets(mock_generator, st.session_state.selected_disaster_type, count=count)
         
         if not tweets_df.empty:
-            # Save to database
-            saved_count = save_tweets(tweets_df)
+            # Queue for saving; the background writer saves the tweets and
+            # clears tweets older than 30 days without blocking the page
+            queued = get_ingest_queue(retention_days=30).put(tweets_df, block=False)
             
             # Update session state with the latest tweets
-            st.session_state.tweets_df = tweets_df
+            append_session_tweets(tweets_df)
             st.session_state.last_refresh = datetime.now()
             
-            if saved_count > 0:
-                st.success(f"Generated and saved {saved_count} new tweets to the database.")
-            
-            # Clear old tweets (older than 30 days)
-            deleted_count = clear_old_tweets(30)
-            if deleted_count > 0:
-                st.info(f"Cleared {deleted_count} old tweets from the database.")
+            if queued:
+                st.success(f"Generated {len(tweets_df)} new tweets; saving them to the database in the background.")
+            else:
+                st.warning("The database writer is falling behind; these tweets were not saved.")
         else:
             st.warning("Failed to generate new tweet data.")
 
@@ -118,12 +173,20 @@ with st.sidebar:
     if selected_disaster != st.session_state.selected_disaster_type:
         st.session_state.selected_disaster_type = selected_disaster
         # Clear existing data when changing disaster type
-        st.session_state.tweets_df = pd.DataFrame()
+        reset_session_tweets()
+        st.session_state.browse_pages = []
     
     # Search and filter
     st.subheader("Search & Filter")
-    filter_query = st.text_input("Filter tweets (contains text)", st.session_state.filter_query)
+    filter_query = st.text_input(
+        "Filter tweets (words, #hashtag, @user, prefix*, OR)",
+        st.session_state.filter_query
+    )
     st.session_state.filter_query = filter_query
+    search_database = st.checkbox(
+        "Search all stored tweets",
+        help="Search the database full-text index instead of the tweets loaded in this session"
+    )
     
     # Time range selector
     st.subheader("Time Range")
@@ -147,23 +210,16 @@ with st.sidebar:
     # Database stats
     st.subheader("Database Stats")
     
-    # Get tweet counts by disaster type
-    db_stats = {}
-    total_tweets = 0
-    
-    for disaster_type in disaster_types:
-        count = get_tweet_count(disaster_type if disaster_type != "All" else None)
-        db_stats[disaster_type] = count
-        if disaster_type != "All":
-            total_tweets += count
+    # Get tweet counts by disaster type (one grouped query, briefly cached)
+    db_stats = get_tweet_stats()
     
     # Display database stats
-    st.metric("Total tweets in database", total_tweets)
+    st.metric("Total tweets in database", db_stats['total'])
     st.caption("Tweets by disaster type:")
     
-    for disaster_type, count in db_stats.items():
+    for disaster_type in disaster_types:
         if disaster_type != "All":
-            st.caption(f"- {disaster_type}: {count}")
+            st.caption(f"- {disaster_type}: {db_stats['disaster_type'].get(disaster_type, 0)}")
     
     st.markdown("---")
     st.markdown("### About")
@@ -184,30 +240,50 @@ if st.session_state.tweets_df.empty:
     
     # Get tweets from database
     db_tweets = get_tweets(
-        limit=1000, 
+        limit=MAX_SESSION_TWEETS, 
         disaster_type=st.session_state.selected_disaster_type,
         time_range=(start_time, end_time)
     )
     
     if not db_tweets.empty:
-        st.session_state.tweets_df = db_tweets
+        # Stored tweets come newest first; the session keeps them oldest first
+        reset_session_tweets()
+        append_session_tweets(db_tweets.sort_values('created_at', kind='stable'))
         st.session_state.last_refresh = datetime.now()
 
-# Filter the DataFrame based on time range
-df = st.session_state.tweets_df.copy()
-if not df.empty:
-    now = datetime.now()
-    
-    if time_range == "Last hour":
-        df = df[df['created_at'] > (now - timedelta(hours=1))]
-    elif time_range == "Last 24 hours":
-        df = df[df['created_at'] > (now - timedelta(days=1))]
-    elif time_range == "Last 7 days":
-        df = df[df['created_at'] > (now - timedelta(days=7))]
+# Filter the DataFrame based on text query and time range
+df = st.session_state.tweets_df
+now = datetime.now()
+time_start = {
+    "Last hour": now - timedelta(hours=1),
+    "Last 24 hours": now - timedelta(days=1),
+    "Last 7 days": now - timedelta(days=7)
+}.get(time_range)
+
+if filter_query and search_database:
+    # A database search covers every stored tweet in the time range, even
+    # while the session has none, ranked by relevance (newest first with
+    # SQLite daily partitions)
+    df, _ = search_tweets(
+        filter_query,
+        disaster_type=st.session_state.selected_disaster_type,
+        time_range=(time_start, None),
+        limit=MAX_SESSION_TWEETS
+    )
     
-    # Apply text filter if provided
+    # A failed search returns a frame without columns; no matches keep them
+    if df.columns.empty:
+        st.error("The database search failed. Check the log for details.")
+elif not df.empty:
+    # Apply text filter first, on the session frame, so it is answered
+    # from the search index kept in sync with the session tweets
     if filter_query:
-        df = filter_dataframe(df, filter_query)
+        df = filter_dataframe(df, filter_query, index=st.session_state.search_index)
+    
+    if time_start is not None:
+        df = df[df['created_at'] > time_start]
+
+df = df.copy()
 
 # Display main dashboard
 if df.empty:
@@ -241,15 +317,50 @@ else:
     # Create tabs for different visualizations
     tab1, tab2, tab3, tab4, tab5 = st.tabs(["Sentiment Analysis", "Tweet Volume", "Word Cloud", "Location Map", "Database Management"])
     
+    # Read hourly counts from the database rollups, which cover every stored tweet,
+    # falling back to the session rollup; a text filter needs the filtered tweets instead
+    hourly_counts = None
+    hourly_note = None
+    if not filter_query:
+        # Tweets from this refresh may still be waiting in the write queue;
+        # save them first so the database rollups count them
+        ingest_queue = get_ingest_queue(retention_days=30)
+        ingest_stats = ingest_queue.metrics()
+        if ingest_stats['queued_rows'] + ingest_stats['pending_rows']:
+            ingest_queue.flush(timeout=CHART_FLUSH_TIMEOUT)
+            ingest_stats = ingest_queue.metrics()
+        unsaved = ingest_stats['queued_rows'] + ingest_stats['pending_rows']
+        
+        bucket_start = pd.Timestamp(time_start).floor('1h') if time_start is not None else None
+        hourly_counts = get_rollup_counts(
+            time_range=(time_start, None),
+            disaster_type=st.session_state.selected_disaster_type,
+            by='sentiment'
+        )
+        if hourly_counts.empty:
+            hourly_counts = get_session_rollup(time_start).counts('1h', by='sentiment', start=bucket_start)
+        
+        # Counts are per whole hour, so the first bar starts before the selected range
+        if bucket_start is not None and bucket_start < pd.Timestamp(time_start) and not hourly_counts.empty:
+            hourly_note = (f"Hourly counts start at {bucket_start:%b %d, %H:%M}, the start of the hour "
+                           f"the selected range begins in; the first bar includes earlier tweets from that hour.")
+        if unsaved:
+            unsaved_note = f"{unsaved} tweets still being saved are not counted yet."
+            hourly_note = f"{hourly_note} {unsaved_note}" if hourly_note else unsaved_note
+    
     with tab1:
         st.subheader("Sentiment Analysis Over Time")
-        sentiment_chart = create_sentiment_chart(df)
+        sentiment_chart = create_sentiment_chart(df, counts=hourly_counts)
         st.plotly_chart(sentiment_chart, use_container_width=True)
+        if hourly_note:
+            st.caption(hourly_note)
     
     with tab2:
         st.subheader("Tweet Volume Over Time")
-        volume_chart = create_tweet_volume_chart(df)
+        volume_chart = create_tweet_volume_chart(df, counts=hourly_counts)
         st.plotly_chart(volume_chart, use_container_width=True)
+        if hourly_note:
+            st.caption(hourly_note)
     
     with tab3:
         st.subheader("Common Words in Tweets")
@@ -266,8 +377,24 @@ else:
         st.markdown("This tab allows you to manage the tweet database.")
         
         # Display current database stats
-        total_tweets = get_tweet_count()
-        st.info(f"Total tweets in database: {total_tweets}")
+        st.info(f"Total tweets in database: {get_tweet_stats()['total']}")
+        pool_stats = get_pool_stats()
+        st.caption(
+            f"Connection pool: {pool_stats.get('checked_out', 0)} in use, "
+            f"checkout wait avg {pool_stats['wait_avg_ms']:.1f} ms, "
+            f"p95 {pool_stats['wait_p95_ms']:.1f} ms, max {pool_stats['wait_max_ms']:.1f} ms"
+        )
+        ingest_stats = get_ingest_queue(retention_days=30).metrics()
+        st.caption(
+            f"Write queue: {ingest_stats['depth']} batches waiting, "
+            f"{ingest_stats['queued_rows'] + ingest_stats['pending_rows']} tweets not yet saved, "
+            f"flush latency avg {ingest_stats['flush_avg_ms']:.1f} ms, p95 {ingest_stats['flush_p95_ms']:.1f} ms"
+        )
+        if ingest_stats['failed_flushes']:
+            st.warning(
+                f"Write queue: {ingest_stats['failed_flushes']} database writes failed; "
+                f"{ingest_stats['dropped_rows']} tweets were dropped after retrying"
+            )
         
         col1, col2 = st.columns(2)
         
@@ -292,17 +419,43 @@ else:
             # Import already done
             if st.button("Export Database"):
                 with st.spinner("Exporting tweets..."):
-                    # Get all tweets
-                    all_tweets = get_tweets(limit=10000)
+                    # Stream tweets from the database in chunks straight into the file
+                    filename, exported = export_data_chunks(iter_tweets(limit=10000), format=export_format.lower())
                     
-                    if not all_tweets.empty:
-                        filename = export_data(all_tweets, format=export_format.lower())
-                        if filename:
-                            st.success(f"Exported {len(all_tweets)} tweets to {filename}")
-                        else:
-                            st.error("Failed to export tweets.")
-                    else:
+                    if filename:
+                        st.success(f"Exported {exported} tweets to {filename}")
+                    elif get_tweet_stats()['total'] == 0:
                         st.warning("No tweets to export.")
+                    else:
+                        st.error("Failed to export tweets.")
+        
+        # Browse stored tweets page by page, each page read after the cursor of the previous one
+        st.subheader("Browse Stored Tweets")
+        browse_columns = ['created_at', 'username', 'text', 'sentiment', 'disaster_type']
+        
+        if not st.session_state.browse_pages:
+            first_page, st.session_state.browse_cursor = get_tweet_page(
+                limit=50, disaster_type=st.session_state.selected_disaster_type, columns=browse_columns
+            )
+            st.session_state.browse_pages = [first_page]
+        
+        st.dataframe(pd.concat(st.session_state.browse_pages, ignore_index=True), use_container_width=True)
+        
+        browse_col1, browse_col2 = st.columns(2)
+        with browse_col1:
+            if st.session_state.browse_cursor and st.button("Load older tweets"):
+                next_page, st.session_state.browse_cursor = get_tweet_page(
+                    limit=50,
+                    disaster_type=st.session_state.selected_disaster_type,
+                    columns=browse_columns,
+                    cursor=st.session_state.browse_cursor
+                )
+                st.session_state.browse_pages.append(next_page)
+                st.rerun()
+        with browse_col2:
+            if st.button("Back to newest"):
+                st.session_state.browse_pages = []
+                st.rerun()
     
     # Trending hashtags and topics
     st.subheader("Trending Hashtags and Topics")
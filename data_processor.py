@@ -1,18 +1,42 @@
 import pandas as pd
-import re
 from datetime import datetime
+from itertools import islice
+import asyncio
+import gzip
+import json
 import logging
-from sentiment_analyzer import analyze_sentiment, analyze_disaster_impact
+from sentiment_analyzer import analyze_sentiment_batch, analyze_disaster_impact_batch
+from text_normalizer import normalize_text, normalize_series
+from geocoder import geocode_series
+from time_rollup import TimeRollup
+from filter_engine import keyword_mask
 
 # Initialize logger
 logger = logging.getLogger(__name__)
 
-def process_tweets(tweets):
+# Output columns of process_tweets, in order
+TWEET_COLUMNS = [
+    'id', 'text', 'clean_text', 'created_at', 'username', 'display_name', 'location',
+    'retweet_count', 'like_count', 'reply_count', 'hashtags', 'mentions',
+    'sentiment', 'sentiment_score', 'disaster_impact'
+]
+
+# Columns filled in by the batch analysis steps rather than read from the payload
+ANALYSIS_COLUMNS = ['clean_text', 'sentiment', 'sentiment_score', 'disaster_impact']
+
+# Raw tweets per micro-batch in the streaming pipeline
+DEFAULT_BATCH_SIZE = 1000
+
+def process_tweets(tweets, sentiment_method="combined"):
     """
     Process raw tweets into a structured DataFrame with sentiment analysis.
     
+    The payloads are first flattened into column lists; cleaning, sentiment
+    and impact analysis then run once over each column.
+    
     Args:
         tweets (list): List of tweet objects from Twitter API
+        sentiment_method (str): Registered sentiment scorer to use
         
     Returns:
         pandas.DataFrame: Processed DataFrame with sentiment analysis
@@ -20,95 +44,214 @@ def process_tweets(tweets):
     if not tweets:
         return pd.DataFrame()
     
-    processed_data = []
+    columns = _flatten_tweets(tweets)
+    if not columns['id']:
+        return pd.DataFrame()
     
-    for tweet in tweets:
-        try:
-            # Extract basic tweet information
-            tweet_id = tweet.get('id', '')
-            text = tweet.get('text', '')
-            created_at = tweet.get('created_at', None)
-            
-            # Extract user information
-            user = tweet.get('user', {})
-            username = user.get('username', '')
-            display_name = user.get('name', '')
-            location = user.get('location', '')
-            
-            # Extract engagement metrics
-            metrics = tweet.get('public_metrics', {})
-            retweet_count = metrics.get('retweet_count', 0)
-            like_count = metrics.get('like_count', 0)
-            reply_count = metrics.get('reply_count', 0)
-            
-            # Extract hashtags and mentions from entities
-            hashtags = []
-            mentions = []
-            
-            entities = tweet.get('entities', {})
-            if 'hashtags' in entities:
-                hashtags = [tag.get('tag', '') for tag in entities['hashtags']]
-            
-            if 'mentions' in entities:
-                mentions = [mention.get('username', '') for mention in entities['mentions']]
-            
-            # Perform sentiment analysis
-            sentiment_label, sentiment_score = analyze_sentiment(text)
-            
-            # Analyze disaster impact
-            disaster_impact = analyze_disaster_impact(text)
-            
-            # Add to processed data
-            processed_data.append({
-                'id': tweet_id,
-                'text': text,
-                'clean_text': clean_text(text),
-                'created_at': created_at,
-                'username': username,
-                'display_name': display_name,
-                'location': location,
-                'retweet_count': retweet_count,
-                'like_count': like_count,
-                'reply_count': reply_count,
-                'hashtags': hashtags,
-                'mentions': mentions,
-                'sentiment': sentiment_label,
-                'sentiment_score': sentiment_score,
-                'disaster_impact': disaster_impact
-            })
+    df = pd.DataFrame(columns)
+    
+    # Clean text, then perform sentiment and impact analysis for the whole batch at once
+    df['clean_text'] = normalize_series(df['text'])['clean_text']
+    
+    labels, scores = analyze_sentiment_batch(df['clean_text'], method=sentiment_method, normalized=True)
+    df['sentiment'] = labels
+    df['sentiment_score'] = scores
+    df['disaster_impact'] = analyze_disaster_impact_batch(df['text'])
+    
+    # Convert created_at to datetime
+    df['created_at'] = pd.to_datetime(df['created_at'])
+    
+    return df[TWEET_COLUMNS]
+
+def _flatten_tweets(tweets):
+    """
+    Flatten raw tweet payloads into column lists.
+    
+    Args:
+        tweets (list): List of tweet objects from Twitter API
+        
+    Returns:
+        dict: Column name to list of values, without the analysis columns
+    """
+    valid = [tweet for tweet in tweets if isinstance(tweet, dict)]
+    if len(valid) < len(tweets):
+        logger.error(f"Skipping {len(tweets) - len(valid)} malformed tweets")
+    
+    try:
+        users = [tweet.get('user', {}) for tweet in valid]
+        metrics = [tweet.get('public_metrics', {}) for tweet in valid]
+        entities = [tweet.get('entities', {}) for tweet in valid]
         
-        except Exception as e:
+        return {
+            'id': [tweet.get('id', '') for tweet in valid],
+            'text': [tweet.get('text', '') for tweet in valid],
+            'created_at': [tweet.get('created_at', None) for tweet in valid],
+            'username': [user.get('username', '') for user in users],
+            'display_name': [user.get('name', '') for user in users],
+            'location': [user.get('location', '') for user in users],
+            'retweet_count': [metric.get('retweet_count', 0) for metric in metrics],
+            'like_count': [metric.get('like_count', 0) for metric in metrics],
+            'reply_count': [metric.get('reply_count', 0) for metric in metrics],
+            'hashtags': [[tag.get('tag', '') for tag in entity.get('hashtags', [])] for entity in entities],
+            'mentions': [[mention.get('username', '') for mention in entity.get('mentions', [])] for entity in entities]
+        }
+    
+    except Exception as e:
+        columns = {column: [] for column in TWEET_COLUMNS if column not in ANALYSIS_COLUMNS}
+        if len(valid) == 1:
             logger.error(f"Error processing tweet: {e}")
-            continue
+            return columns
     
-    # Create DataFrame
-    df = pd.DataFrame(processed_data)
+    # A payload has unexpected nested fields; flatten one tweet at a time to skip it
+    for tweet in valid:
+        for column, values in _flatten_tweets([tweet]).items():
+            columns[column].extend(values)
     
-    # Convert created_at to datetime if it exists
-    if 'created_at' in df.columns and not df.empty:
-        df['created_at'] = pd.to_datetime(df['created_at'])
+    return columns
+
+def process_tweet_stream(tweets, batch_size=DEFAULT_BATCH_SIZE, sentiment_method="combined", as_records=False):
+    """
+    Process an iterable of raw tweets in micro-batches.
     
-    return df
+    Only one batch of raw tweets is held in memory at a time, so arbitrarily
+    large inputs (e.g. an archived dump read with iter_tweet_dump) can be
+    replayed with bounded memory.
+    
+    Args:
+        tweets (iterable): Raw tweet objects from Twitter API
+        batch_size (int): Number of raw tweets per batch
+        sentiment_method (str): Registered sentiment scorer to use
+        as_records (bool): Yield lists of dicts instead of DataFrames
+        
+    Yields:
+        pandas.DataFrame or list: One processed batch; batches in which every
+                                  tweet was malformed are skipped
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+    
+    iterator = iter(tweets)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        
+        df = process_tweets(batch, sentiment_method=sentiment_method)
+        if not df.empty:
+            yield df.to_dict('records') if as_records else df
 
-def clean_text(text):
-    """Clean tweet text for analysis purposes."""
-    # Lower case
-    text = text.lower()
+async def aprocess_tweet_stream(tweets, batch_size=DEFAULT_BATCH_SIZE, sentiment_method="combined", as_records=False):
+    """
+    Process an async iterator (or plain iterable) of raw tweets in micro-batches.
     
-    # Remove URLs
-    text = re.sub(r'https?://\S+|www\.\S+', '', text)
+    Each batch is processed in a worker thread while the event loop keeps
+    receiving the next batch. At most one batch is analyzed at a time, so a
+    fast source waits for the analysis instead of queueing batches without
+    limit; batches are yielded in arrival order.
     
-    # Remove mentions and hashtags
-    text = re.sub(r'@\w+', '', text)
-    text = re.sub(r'#\w+', '', text)
+    Args:
+        tweets (AsyncIterable or iterable): Raw tweet objects from Twitter API
+        batch_size (int): Number of raw tweets per batch
+        sentiment_method (str): Registered sentiment scorer to use
+        as_records (bool): Yield lists of dicts instead of DataFrames
+        
+    Yields:
+        pandas.DataFrame or list: One processed batch
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
     
-    # Remove RT indicator
-    text = re.sub(r'^rt\s+', '', text)
+    async def to_batch(batch):
+        df = await asyncio.to_thread(process_tweets, batch, sentiment_method)
+        return df.to_dict('records') if as_records else df
     
-    # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
+    batch = []
+    in_flight = None
+    try:
+        async for tweet in _as_async_iterator(tweets):
+            batch.append(tweet)
+            if len(batch) < batch_size:
+                continue
+            
+            # Finish the previous batch, then analyze this one while receiving the next
+            result = await in_flight if in_flight is not None else None
+            in_flight = asyncio.create_task(to_batch(batch))
+            batch = []
+            if result is not None and len(result):
+                yield result
+        
+        if in_flight is not None:
+            result = await in_flight
+            in_flight = None
+            if len(result):
+                yield result
+        
+        if batch:
+            result = await to_batch(batch)
+            if len(result):
+                yield result
+    finally:
+        if in_flight is not None and not in_flight.done():
+            in_flight.cancel()
+
+async def _as_async_iterator(items):
+    """Iterate over an async iterator or a plain iterable asynchronously."""
+    if hasattr(items, '__aiter__'):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+def save_tweet_stream(tweets, batch_size=DEFAULT_BATCH_SIZE, sentiment_method="combined", disaster_type=None):
+    """
+    Process raw tweets in micro-batches and save each batch to the database.
     
-    return text
+    Args:
+        tweets (iterable): Raw tweet objects from Twitter API
+        batch_size (int): Number of raw tweets per batch
+        sentiment_method (str): Registered sentiment scorer to use
+        disaster_type (str, optional): Disaster type stored with every tweet
+        
+    Returns:
+        int: Number of new tweets saved
+    """
+    from database import save_tweets
+    
+    saved = 0
+    for df in process_tweet_stream(tweets, batch_size, sentiment_method):
+        if disaster_type:
+            df['disaster_type'] = disaster_type
+        saved += save_tweets(df)
+    
+    return saved
+
+def iter_tweet_dump(path):
+    """
+    Lazily read raw tweets from a JSON-lines dump.
+    
+    Args:
+        path (str): File with one tweet object per line; '.gz' files are
+                    decompressed on the fly
+        
+    Yields:
+        dict: Raw tweet objects; lines that are not valid JSON are skipped
+    """
+    opener = gzip.open if str(path).endswith('.gz') else open
+    
+    with opener(path, 'rt', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.error(f"Skipping invalid tweet on line {line_number} of {path}: {e}")
+
+def clean_text(text):
+    """Clean tweet text for analysis purposes."""
+    return normalize_text(text)
 
 def extract_locations(df):
     """
@@ -126,56 +269,38 @@ def extract_locations(df):
     # Make a copy to avoid modifying the original
     result_df = df.copy()
     
-    # Initialize geocoded columns
-    result_df['lat'] = None
-    result_df['lon'] = None
-    
-    # For simplicity, we're not doing actual geocoding in this function
-    # as it would require external APIs. In a real implementation,
-    # you would use a geocoding service to convert location strings to coordinates.
-    
-    # For demonstration, we'll use a simple random assignment for tweets with locations
-    import random
-    
-    has_location = result_df['location'].notna() & (result_df['location'] != '')
-    
-    if has_location.any():
-        # Assign random coordinates within reasonable bounds
-        result_df.loc[has_location, 'lat'] = [random.uniform(25, 50) for _ in range(sum(has_location))]
-        result_df.loc[has_location, 'lon'] = [random.uniform(-125, -70) for _ in range(sum(has_location))]
+    # Geocode each distinct location string once against the bundled gazetteer
+    coords = geocode_series(result_df['location'])
+    result_df['lat'] = coords['lat']
+    result_df['lon'] = coords['lon']
     
     return result_df
 
-def aggregate_by_time(df, freq='1H'):
+def aggregate_by_time(df, freq='1h', rollup=None):
     """
     Aggregate tweet data by time periods.
     
     Args:
         df (pandas.DataFrame): DataFrame containing tweet data
-        freq (str): Frequency string for resampling (e.g., '1H' for hourly)
+        freq (str): Frequency string for the buckets (e.g., '1h' for hourly)
+        rollup (TimeRollup, optional): Incrementally maintained counts to read
+                                       instead of grouping df; freq must be one
+                                       of its granularities
         
     Returns:
         pandas.DataFrame: Aggregated DataFrame
     """
-    if df.empty or 'created_at' not in df.columns:
-        return pd.DataFrame()
-    
-    # Set index to created_at for resampling
-    temp_df = df.set_index('created_at')
-    
-    # Count tweets per time period
-    counts = temp_df.resample(freq).size().reset_index(name='tweet_count')
-    
-    # Aggregate sentiment
-    sentiment_counts = temp_df.groupby([pd.Grouper(freq=freq), 'sentiment']).size().unstack(fill_value=0)
+    if rollup is None:
+        if df.empty or 'created_at' not in df.columns:
+            return pd.DataFrame()
+        rollup = TimeRollup.from_frame(df, [freq])
     
-    # Merge with counts
-    result = pd.merge(counts, sentiment_counts.reset_index(), on='created_at', how='left')
-    
-    # Fill NaN with 0
-    result = result.fillna(0)
+    # Count tweets per time period, split by sentiment
+    result = rollup.counts(freq, by='sentiment', fill_gaps=True)
+    if result.empty:
+        return pd.DataFrame()
     
-    return result
+    return result.rename(columns={'bucket': 'created_at'})
 
 def filter_by_keywords(df, keywords):
     """
@@ -194,10 +319,5 @@ def filter_by_keywords(df, keywords):
     if not keywords:
         return df
     
-    # Create regex pattern from keywords
-    pattern = '|'.join(keywords)
-    
-    # Filter tweets containing any of the keywords
-    filtered_df = df[df['text'].str.contains(pattern, case=False, regex=True)]
-    
-    return filtered_df
+    # Filter tweets containing any of the keywords (matched literally)
+    return df[keyword_mask(df, keywords)]
@@ -1,10 +1,24 @@
 import os
 import logging
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Float, JSON
+import re
+import json
+import base64
+from sqlalchemy import (
+    create_engine, event, text, Column, Integer, String, Text, DateTime, Float, JSON, Index, MetaData,
+    insert, select, func, table, column, literal_column, tuple_, and_, or_
+)
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import pandas as pd
-from datetime import datetime
+import numpy as np
+import time
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+from search_index import parse_query
 
 
 # Initialize logger
@@ -19,24 +33,203 @@ if os.environ.get('DATABASE_URL'):
 else:
     # Use SQLite for local development
     SQLALCHEMY_DATABASE_URL = "sqlite:///./tweets.db"
-# Create SQLAlchemy engine
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, 
-    connect_args={} if SQLALCHEMY_DATABASE_URL.startswith('postgresql') else {"check_same_thread": False}
+# Rows per INSERT statement in save_tweets
+SAVE_CHUNK_SIZE = int(os.environ.get('SAVE_CHUNK_SIZE', 500))
+
+# Rows fetched from the database per chunk when reading tweets
+READ_CHUNK_SIZE = int(os.environ.get('READ_CHUNK_SIZE', 5000))
+
+# Seconds get_tweet_stats results are reused; 0 disables the cache
+STATS_CACHE_TTL = float(os.environ.get('STATS_CACHE_TTL', 5))
+
+# 'daily' stores tweets in one partition per day of created_at, so retention drops whole days
+TWEET_PARTITIONING = os.environ.get('TWEET_PARTITIONING', 'none').lower()
+PARTITIONED = TWEET_PARTITIONING == 'daily'
+
+# PostgreSQL partitions the tweets table natively; SQLite keeps one tweets_pYYYYMMDD table per day
+NATIVE_PARTITIONING = PARTITIONED and SQLALCHEMY_DATABASE_URL.startswith('postgresql')
+PARTITION_NAME = re.compile(r'^tweets_p(\d{8})$')
+
+# Full-text document of a tweet on PostgreSQL; the GIN index and the search
+# queries must use this exact expression. Weights mark the field of each word.
+PG_SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(text, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(username, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(hashtags::text, '')), 'C')"
 )
 
+# tsvector weights each searchable field matches; plain words match the text
+# and hashtags but not usernames, like the session search index
+PG_FIELD_WEIGHTS = {'text': 'AC', 'username': 'B', 'hashtags': 'C'}
+
+# FTS5 columns each searchable field matches
+FTS_FIELD_COLUMNS = {'text': '{text hashtags}', 'username': 'username', 'hashtags': 'hashtags'}
+
+# Search results are ranked by relevance unless each SQLite day partition has
+# its own full-text index, whose scores are not comparable across days
+SEARCH_BY_SCORE = not PARTITIONED or NATIVE_PARTITIONING
+
+# Connection pool sizing; connections idle longer than DB_POOL_RECYCLE seconds are replaced
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 30))
+DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+
+# SQLite waits this long for a lock held by another connection before failing
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+
+# Bytes of the SQLite file read through memory mapping; 0 disables it
+SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+
+class PoolWaitStats:
+    """
+    Thread-safe record of how long pool checkouts waited for a connection.
+    
+    Recent waits are kept for percentiles; the count, total and maximum
+    cover every checkout since the engine was created.
+    """
+    
+    def __init__(self, window=1000):
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=window)
+        self.checkouts = 0
+        self.total = 0.0
+        self.max = 0.0
+    
+    def record(self, seconds):
+        """Record the wait of one checkout."""
+        with self._lock:
+            self._recent.append(seconds)
+            self.checkouts += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+    
+    def snapshot(self):
+        """
+        Get the wait statistics in milliseconds.
+        
+        Returns:
+            dict: 'checkouts' plus average, p95 and maximum wait in milliseconds
+        """
+        with self._lock:
+            recent = list(self._recent)
+            checkouts, total, longest = self.checkouts, self.total, self.max
+        
+        return {
+            'checkouts': checkouts,
+            'wait_avg_ms': total / checkouts * 1000 if checkouts else 0.0,
+            'wait_p95_ms': float(np.percentile(recent, 95)) * 1000 if recent else 0.0,
+            'wait_max_ms': longest * 1000
+        }
+
+# Checkout waits of every TimedQueuePool, shared so the numbers survive pool recreation
+pool_wait_stats = PoolWaitStats()
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waits for a connection."""
+    
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_wait_stats.record(time.perf_counter() - start)
+
+def create_db_engine(url=None):
+    """
+    Create the SQLAlchemy engine with tuned pooling for the database in use
+    
+    PostgreSQL connections are checked with a ping before use and recycled
+    after DB_POOL_RECYCLE seconds. SQLite connections run in WAL mode with
+    synchronous=NORMAL, a busy timeout and memory-mapped reads, so dashboard
+    reads no longer block on the auto-refresh writes and concurrent writers
+    wait for the lock instead of failing.
+    
+    Args:
+        url (str, optional): Database URL; defaults to SQLALCHEMY_DATABASE_URL
+        
+    Returns:
+        sqlalchemy.engine.Engine: The configured engine
+    """
+    url = url or SQLALCHEMY_DATABASE_URL
+    pool_args = {
+        'poolclass': TimedQueuePool,
+        'pool_size': DB_POOL_SIZE,
+        'max_overflow': DB_MAX_OVERFLOW,
+        'pool_timeout': DB_POOL_TIMEOUT
+    }
+    
+    if not url.startswith('sqlite'):
+        return create_engine(url, pool_pre_ping=True, pool_recycle=DB_POOL_RECYCLE, **pool_args)
+    
+    in_memory = url in ('sqlite://', 'sqlite:///:memory:') or 'mode=memory' in url
+    if in_memory:
+        # Every connection would get its own empty database, so the default single-connection pool stays
+        pool_args = {}
+    
+    db_engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False},
+        **pool_args
+    )
+    
+    @event.listens_for(db_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            if not in_memory:
+                cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+            cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        finally:
+            cursor.close()
+    
+    return db_engine
+
+def get_pool_stats():
+    """
+    Get the connection pool state and checkout wait times
+    
+    Returns:
+        dict: 'size', 'checked_out' and 'overflow' connections (for pools
+              that track them), plus the checkout wait statistics
+    """
+    pool = engine.pool
+    stats = {}
+    if isinstance(pool, QueuePool):
+        stats = {'size': pool.size(), 'checked_out': pool.checkedout(), 'overflow': max(pool.overflow(), 0)}
+    
+    stats.update(pool_wait_stats.snapshot())
+    return stats
+
+# Create SQLAlchemy engine
+engine = create_db_engine()
+
 # Create declarative base
 Base = declarative_base()
 
 # Define Tweet model
 class Tweet(Base):
     __tablename__ = 'tweets'
+    __table_args__ = (
+        # Reads and counts filtered by disaster type, a created_at range and ordered by created_at
+        Index('ix_tweets_disaster_type_created_at', 'disaster_type', 'created_at'),
+        # Stats over a created_at range, answered from the index without reading the rows
+        Index('ix_tweets_created_at_dimensions', 'created_at', 'disaster_type', 'sentiment', 'disaster_impact'),
+        # Stats over all tweets, read from the index in group order
+        Index('ix_tweets_dimensions', 'disaster_type', 'sentiment', 'disaster_impact'),
+    ) + ((
+        # Unique keys of a partitioned table must contain the partition column
+        Index('ux_tweets_tweet_id_created_at', 'tweet_id', 'created_at', unique=True),
+        {'postgresql_partition_by': 'RANGE (created_at)'}
+    ) if NATIVE_PARTITIONING else ())
     
-    id = Column(Integer, primary_key=True)
-    tweet_id = Column(String(255), unique=True, nullable=False)
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    tweet_id = Column(String(255), unique=not NATIVE_PARTITIONING, nullable=False)
     text = Column(Text, nullable=False)
     clean_text = Column(Text)
-    created_at = Column(DateTime, index=True)
+    created_at = Column(DateTime, index=True, primary_key=NATIVE_PARTITIONING)
     username = Column(String(255))
     display_name = Column(String(255))
     location = Column(String(255))
@@ -52,25 +245,142 @@ class Tweet(Base):
     lat = Column(Float)
     lon = Column(Float)
     inserted_at = Column(DateTime, default=datetime.now)
+
+# Define hourly rollup model, kept in sync by save_tweets and clear_old_tweets
+class TweetRollup(Base):
+    __tablename__ = 'tweet_rollups'
+    __table_args__ = (
+        # Rollup reads filtered by disaster type and a bucket range
+        Index('ix_tweet_rollups_disaster_type_bucket', 'disaster_type', 'bucket'),
+    )
+    
+    bucket = Column(DateTime, primary_key=True)
+    disaster_type = Column(String(50), primary_key=True)
+    sentiment = Column(String(50), primary_key=True)
+    disaster_impact = Column(String(50), primary_key=True)
+    tweet_count = Column(Integer, nullable=False, default=0)
+    sentiment_score_sum = Column(Float, nullable=False, default=0.0)
+    retweet_count_sum = Column(Integer, nullable=False, default=0)
+    like_count_sum = Column(Integer, nullable=False, default=0)
+    reply_count_sum = Column(Integer, nullable=False, default=0)
     
 # Create tables
 def init_db():
     """Initialize database tables"""
+    global PARTITIONED, NATIVE_PARTITIONING, SEARCH_BY_SCORE
+    
     try:
         Base.metadata.create_all(engine)
+        
+        # create_all skips the indexes of tables that already exist
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(engine, checkfirst=True)
+        
         logger.info("Database tables created successfully")
+        
+        with engine.begin() as conn:
+            if NATIVE_PARTITIONING and not _is_partitioned_table(conn):
+                # An existing table cannot be converted in place; it keeps row-by-row retention
+                logger.warning("The tweets table was created without partitioning; recreate it to use TWEET_PARTITIONING")
+                PARTITIONED = NATIVE_PARTITIONING = False
+                SEARCH_BY_SCORE = not PARTITIONED or NATIVE_PARTITIONING
+            
+            _ensure_search_index(conn, Tweet.__table__)
+            for source in tweet_sources(conn):
+                # Day partitions created before an index was added lack it too
+                for index in source.indexes:
+                    index.create(conn, checkfirst=True)
+                _ensure_search_index(conn, source)
+            
+            moved = _move_to_partitions(conn) if PARTITIONED and not NATIVE_PARTITIONING else 0
+            
+            # Fill the rollup table for tweets saved before it existed
+            has_rollups = conn.execute(select(TweetRollup.bucket).limit(1)).first() is not None
+            has_tweets = any(conn.execute(select(source.c.id).limit(1)).first() is not None
+                             for source in tweet_sources(conn))
+        if has_tweets and (moved or not has_rollups):
+            rebuild_rollups()
     except Exception as e:
         logger.error(f"Error creating database tables: {e}")
 
 # Create session factory
 Session = sessionmaker(bind=engine)
 
-def save_tweets(tweets_df):
+# get_tweet_stats results by time range: (expiry time, stats)
+_stats_cache = {}
+_stats_lock = threading.Lock()
+
+# Columns returned by get_tweets, in order, and the Tweet columns they are read from
+# (by key, so the same names apply to the per-day tables of a partitioned store)
+READ_COLUMNS = {
+    'id': Tweet.tweet_id,
+    'text': Tweet.text,
+    'clean_text': Tweet.clean_text,
+    'created_at': Tweet.created_at,
+    'username': Tweet.username,
+    'display_name': Tweet.display_name,
+    'location': Tweet.location,
+    'retweet_count': Tweet.retweet_count,
+    'like_count': Tweet.like_count,
+    'reply_count': Tweet.reply_count,
+    'hashtags': Tweet.hashtags,
+    'mentions': Tweet.mentions,
+    'sentiment': Tweet.sentiment,
+    'sentiment_score': Tweet.sentiment_score,
+    'disaster_impact': Tweet.disaster_impact,
+    'disaster_type': Tweet.disaster_type,
+    'lat': Tweet.lat,
+    'lon': Tweet.lon
+}
+
+# Low-cardinality columns read as pandas categoricals
+CATEGORICAL_COLUMNS = ['sentiment', 'disaster_impact', 'disaster_type']
+
+# Nullable numeric columns read as float64, with NULL as NaN
+FLOAT_COLUMNS = ['sentiment_score', 'lat', 'lon']
+
+# Columns get_tweet_stats groups by
+STATS_DIMENSIONS = ['disaster_type', 'sentiment', 'disaster_impact']
+
+# Key and measure columns of the rollup table
+ROLLUP_KEYS = ['bucket', 'disaster_type', 'sentiment', 'disaster_impact']
+ROLLUP_MEASURES = ['tweet_count', 'sentiment_score_sum', 'retweet_count_sum', 'like_count_sum', 'reply_count_sum']
+
+# DataFrame column, Tweet column and the value used when the DataFrame lacks the column
+SAVE_COLUMNS = [
+    ('id', 'tweet_id', None),
+    ('text', 'text', None),
+    ('clean_text', 'clean_text', None),
+    ('created_at', 'created_at', None),
+    ('username', 'username', None),
+    ('display_name', 'display_name', None),
+    ('location', 'location', None),
+    ('retweet_count', 'retweet_count', 0),
+    ('like_count', 'like_count', 0),
+    ('reply_count', 'reply_count', 0),
+    ('hashtags', 'hashtags', []),
+    ('mentions', 'mentions', []),
+    ('sentiment', 'sentiment', None),
+    ('sentiment_score', 'sentiment_score', None),
+    ('disaster_impact', 'disaster_impact', 'unknown'),
+    ('disaster_type', 'disaster_type', 'General'),
+    ('lat', 'lat', None),
+    ('lon', 'lon', None)
+]
+
+def save_tweets(tweets_df, chunk_size=None, raise_errors=False):
     """
     Save tweets from DataFrame to database
     
+    Tweets are deduplicated within the batch and inserted in chunks; tweets
+    already in the database are skipped by the unique tweet_id.
+    
     Args:
         tweets_df (pandas.DataFrame): DataFrame containing tweet data
+        chunk_size (int, optional): Rows per INSERT statement; defaults to SAVE_CHUNK_SIZE
+        raise_errors (bool): Re-raise errors after logging them instead of
+                             returning 0, so callers can retry the batch
         
     Returns:
         int: Number of tweets saved
@@ -78,125 +388,878 @@ def save_tweets(tweets_df):
     if tweets_df.empty:
         return 0
     
-    session = Session()
+    rows = _tweet_rows(tweets_df)
+    chunk_size = max(1, chunk_size or SAVE_CHUNK_SIZE)
     count = 0
     
     try:
-        for _, row in tweets_df.iterrows():
-            # Check if tweet already exists
-            existing = session.query(Tweet).filter_by(tweet_id=str(row['id'])).first()
-            
-            if existing:
-                continue
-                
-            # Create new tweet
-            tweet = Tweet(
-                tweet_id=str(row['id']),
-                text=row['text'],
-                clean_text=row['clean_text'] if 'clean_text' in row else None,
-                created_at=row['created_at'],
-                username=row['username'],
-                display_name=row['display_name'],
-                location=row['location'] if 'location' in row else None,
-                retweet_count=row['retweet_count'] if 'retweet_count' in row else 0,
-                like_count=row['like_count'] if 'like_count' in row else 0,
-                reply_count=row['reply_count'] if 'reply_count' in row else 0,
-                hashtags=row['hashtags'] if 'hashtags' in row else [],
-                mentions=row['mentions'] if 'mentions' in row else [],
-                sentiment=row['sentiment'],
-                sentiment_score=row['sentiment_score'],
-                disaster_impact=row['disaster_impact'] if 'disaster_impact' in row else 'unknown',
-                disaster_type=row.get('disaster_type', 'General'),
-                lat=row['lat'] if 'lat' in row else None,
-                lon=row['lon'] if 'lon' in row else None
-            )
-            
-            session.add(tweet)
-            count += 1
+        with engine.begin() as conn:
+            for start in range(0, len(rows), chunk_size):
+                for table, table_rows in _rows_by_partition(conn, rows[start:start + chunk_size]):
+                    inserted = _insert_new_tweets(conn, table_rows, table)
+                    _add_to_rollups(conn, inserted)
+                    count += len(inserted)
+        
+        if count:
+            invalidate_stats_cache()
         
-        session.commit()
         logger.info(f"Saved {count} new tweets to database")
         return count
         
     except Exception as e:
-        session.rollback()
         logger.error(f"Error saving tweets to database: {e}")
+        if raise_errors:
+            raise
         return 0
+
+def _tweet_rows(tweets_df):
+    """
+    Convert a tweets DataFrame into insert parameters, one dict per distinct tweet.
+    
+    Args:
+        tweets_df (pandas.DataFrame): DataFrame containing tweet data
         
-    finally:
-        session.close()
+    Returns:
+        list: Dicts keyed by Tweet column name with plain Python values
+    """
+    df = tweets_df.assign(id=tweets_df['id'].astype(str)).drop_duplicates(subset=['id'])
+    
+    columns = {}
+    for df_column, db_column, default in SAVE_COLUMNS:
+        if df_column in df.columns:
+            columns[db_column] = [_to_db_value(value) for value in df[df_column].tolist()]
+        else:
+            columns[db_column] = [default] * len(df)
+    
+    return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+def _to_db_value(value):
+    """Convert a pandas/numpy value into a value the database driver accepts."""
+    if isinstance(value, (list, dict)):
+        return value
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if pd.isna(value):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
 
-def get_tweets(limit=1000, disaster_type=None, time_range=None):
+def _insert_new_tweets(conn, rows, table=None):
     """
-    Get tweets from database with optional filtering
+    Insert rows whose tweet_id is not in the database yet.
     
     Args:
-        limit (int): Maximum number of tweets to retrieve
-        disaster_type (str, optional): Filter by disaster type
-        time_range (tuple, optional): Filter by time range (start, end)
+        conn (sqlalchemy.engine.Connection): Connection inside a transaction
+        rows (list): Insert parameters from _tweet_rows
+        table (sqlalchemy.Table, optional): Table to insert into; defaults to the tweets table
         
     Returns:
-        pandas.DataFrame: DataFrame with tweets
+        list: The rows that were inserted
     """
-    session = Session()
+    if not rows:
+        return []
     
-    try:
-        query = session.query(Tweet)
+    table = table if table is not None else Tweet.__table__
+    dialect = conn.dialect.name
+    stmt = insert(table)
+    
+    if dialect in ('sqlite', 'postgresql'):
+        insert_fn = sqlite_insert if dialect == 'sqlite' else postgresql_insert
+        conflict_columns = ['tweet_id', 'created_at'] if NATIVE_PARTITIONING else ['tweet_id']
+        stmt = insert_fn(table).on_conflict_do_nothing(index_elements=conflict_columns)
+        
+        # Executed as batched multi-row INSERTs; RETURNING lists only the rows actually inserted
+        if conn.dialect.use_insertmanyvalues and conn.dialect.insert_executemany_returning:
+            inserted = set(conn.execute(stmt.returning(table.c.tweet_id), rows).scalars())
+            return [row for row in rows if row['tweet_id'] in inserted]
+    
+    # Without RETURNING: skip ids that already exist, then insert with executemany
+    ids = [row['tweet_id'] for row in rows]
+    existing = set(conn.execute(select(table.c.tweet_id).where(table.c.tweet_id.in_(ids))).scalars())
+    new_rows = [row for row in rows if row['tweet_id'] not in existing]
+    
+    if new_rows:
+        conn.execute(stmt, new_rows)
+    return new_rows
+
+def _rollup_key(value, default='unknown'):
+    """Value stored in a rollup key column; the key columns cannot be NULL."""
+    return value if value is not None else default
+
+def _add_to_rollups(conn, rows):
+    """
+    Add newly inserted tweets to the hourly rollup table.
+    
+    Args:
+        conn (sqlalchemy.engine.Connection): Connection inside the insert transaction
+        rows (list): Inserted rows from _insert_new_tweets
+    """
+    totals = {}
+    for row in rows:
+        if row['created_at'] is None:
+            continue
         
-        # Apply filters
-        if disaster_type and disaster_type != "All":
-            query = query.filter(Tweet.disaster_type == disaster_type)
+        key = (
+            row['created_at'].replace(minute=0, second=0, microsecond=0),
+            _rollup_key(row['disaster_type'], 'General'),
+            _rollup_key(row['sentiment']),
+            _rollup_key(row['disaster_impact'])
+        )
+        total = totals.setdefault(key, [0, 0.0, 0, 0, 0])
+        total[0] += 1
+        total[1] += row['sentiment_score'] or 0.0
+        total[2] += row['retweet_count'] or 0
+        total[3] += row['like_count'] or 0
+        total[4] += row['reply_count'] or 0
+    
+    if totals:
+        _apply_rollup_deltas(conn, totals)
+
+def _apply_rollup_deltas(conn, totals):
+    """
+    Add per-bucket deltas to the rollup table, creating missing rows.
+    
+    Args:
+        conn (sqlalchemy.engine.Connection): Connection inside a transaction
+        totals (dict): (bucket, disaster_type, sentiment, disaster_impact) to
+                       [count, score sum, retweet sum, like sum, reply sum]; negative
+                       values subtract
+    """
+    table = TweetRollup.__table__
+    rows = [dict(zip(ROLLUP_KEYS + ROLLUP_MEASURES, key + tuple(values))) for key, values in totals.items()]
+    dialect = conn.dialect.name
+    
+    if dialect in ('sqlite', 'postgresql'):
+        insert_fn = sqlite_insert if dialect == 'sqlite' else postgresql_insert
+        stmt = insert_fn(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=ROLLUP_KEYS,
+            set_={measure: table.c[measure] + stmt.excluded[measure] for measure in ROLLUP_MEASURES}
+        )
+        conn.execute(stmt, rows)
+    else:
+        for row in rows:
+            key_filter = [table.c[key] == row[key] for key in ROLLUP_KEYS]
+            updated = conn.execute(
+                table.update().where(*key_filter).values(
+                    {measure: table.c[measure] + row[measure] for measure in ROLLUP_MEASURES}
+                )
+            ).rowcount
+            if not updated:
+                conn.execute(insert(table), [row])
+    
+    # Buckets emptied by a subtraction are removed
+    if any(values[0] < 0 for values in totals.values()):
+        conn.execute(table.delete().where(table.c.tweet_count <= 0))
+
+def rebuild_rollups():
+    """
+    Recompute the rollup table from the tweets table.
+    
+    Returns:
+        bool: True if the rollups were rebuilt
+    """
+    try:
+        with engine.begin() as conn:
+            conn.execute(TweetRollup.__table__.delete())
             
-        if time_range:
-            start_time, end_time = time_range
-            if start_time:
-                query = query.filter(Tweet.created_at >= start_time)
-            if end_time:
-                query = query.filter(Tweet.created_at <= end_time)
+            # Partitions never share an hour, so each one inserts its own rollup rows
+            for source in tweet_sources(conn):
+                bucket = _hour_bucket(conn.dialect.name, source.c.created_at)
+                query = _rollup_totals_query(source, bucket).where(source.c.created_at.is_not(None))
+                conn.execute(
+                    TweetRollup.__table__.insert().from_select(ROLLUP_KEYS + ROLLUP_MEASURES, query)
+                )
         
-        # Order by created_at descending and limit
-        query = query.order_by(Tweet.created_at.desc()).limit(limit)
+        logger.info("Rebuilt tweet rollups")
+        return True
+        
+    except Exception as e:
+        logger.error(f"Error rebuilding tweet rollups: {e}")
+        return False
+
+def _rollup_totals_query(source, *keys):
+    """Build a query summing the rollup measures of a tweets table per rollup key."""
+    keys = list(keys) + [
+        func.coalesce(source.c.disaster_type, 'General'),
+        func.coalesce(source.c.sentiment, 'unknown'),
+        func.coalesce(source.c.disaster_impact, 'unknown')
+    ]
+    return select(
+        *keys,
+        func.count(),
+        func.coalesce(func.sum(source.c.sentiment_score), 0.0),
+        func.coalesce(func.sum(source.c.retweet_count), 0),
+        func.coalesce(func.sum(source.c.like_count), 0),
+        func.coalesce(func.sum(source.c.reply_count), 0)
+    ).group_by(*keys)
+
+def _hour_bucket(dialect, column):
+    """SQL expression truncating a timestamp column to the hour."""
+    if dialect == 'postgresql':
+        return func.date_trunc('hour', column)
+    if dialect == 'sqlite':
+        # Same text format SQLAlchemy uses to store DateTime values in SQLite
+        return func.strftime('%Y-%m-%d %H:00:00.000000', column)
+    return func.date_trunc('hour', column)
+
+def tweet_sources(conn, time_range=None):
+    """
+    Get the tables holding the tweets of a time range, newest first
+    
+    Without partitioning, and with native PostgreSQL partitioning (where the
+    planner prunes partitions itself), this is the tweets table. With SQLite
+    daily partitioning it is the per-day tables overlapping the time range.
+    
+    Args:
+        conn (sqlalchemy.engine.Connection): Connection to the database
+        time_range (tuple, optional): Time range (start, end)
+        
+    Returns:
+        list: sqlalchemy.Table objects with the columns of the tweets table
+    """
+    if not PARTITIONED or NATIVE_PARTITIONING:
+        return [Tweet.__table__]
+    
+    start_time, end_time = time_range if time_range else (None, None)
+    start_day = pd.Timestamp(start_time).date() if start_time else None
+    end_day = pd.Timestamp(end_time).date() if end_time else None
+    
+    days = [day for day in _list_partitions(conn)
+            if (start_day is None or day >= start_day) and (end_day is None or day <= end_day)]
+    return [_partition_table(day) for day in sorted(days, reverse=True)]
+
+def _partition_name(day):
+    """Name of the partition holding the tweets of a day."""
+    return f"tweets_p{day:%Y%m%d}"
+
+def _list_partitions(conn):
+    """Get the days that have a partition, oldest first."""
+    if conn.dialect.name == 'postgresql':
+        names = conn.execute(text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "WHERE parent.relname = 'tweets'"
+        )).scalars()
+    else:
+        names = conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'table'")).scalars()
+    
+    matches = (PARTITION_NAME.match(name) for name in names)
+    return sorted(datetime.strptime(match.group(1), '%Y%m%d').date() for match in matches if match)
+
+# Per-day SQLite tables, kept out of Base.metadata so create_all does not create them
+_partition_metadata = MetaData()
+
+def _partition_table(day):
+    """Get the Table of a day's SQLite partition, with the tweets table's columns and indexes."""
+    name = _partition_name(day)
+    table = _partition_metadata.tables.get(name)
+    
+    if table is None:
+        table = Tweet.__table__.to_metadata(_partition_metadata, name=name)
+        # Index names are global in SQLite, so named indexes get the partition name
+        for index in table.indexes:
+            if index.name and index.name.startswith('ix_tweets_') and not index.name.startswith(f'ix_{name}_'):
+                index.name = 'ix_' + name + index.name[len('ix_tweets'):]
+    
+    return table
+
+def _ensure_partitions(conn, days):
+    """Create the partitions of the given days that do not exist yet."""
+    for day in sorted(set(days)):
+        if NATIVE_PARTITIONING:
+            next_day = day + timedelta(days=1)
+            conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {_partition_name(day)} PARTITION OF tweets "
+                f"FOR VALUES FROM ('{day.isoformat()}') TO ('{next_day.isoformat()}')"
+            ))
+        else:
+            _partition_table(day).create(conn, checkfirst=True)
+            _ensure_search_index(conn, _partition_table(day))
+
+def _rows_by_partition(conn, rows):
+    """
+    Split insert rows by the table they are stored in.
+    
+    Args:
+        conn (sqlalchemy.engine.Connection): Connection inside the insert transaction
+        rows (list): Insert parameters from _tweet_rows
+        
+    Returns:
+        list: (table, rows) pairs, creating missing partitions; undated
+              tweets already stored in a partition are left out
+    """
+    if not PARTITIONED:
+        return [(Tweet.__table__, rows)]
+    
+    # Undated tweets are filed under the time they are saved, so a tweet saved
+    # again on a later day would land in another partition; skip stored ones
+    undated = [row['tweet_id'] for row in rows if row['created_at'] is None]
+    if undated:
+        stored = _stored_tweet_ids(conn, undated)
+        now = datetime.now()
+        rows = [row for row in rows if row['created_at'] is not None or row['tweet_id'] not in stored]
+        for row in rows:
+            if row['created_at'] is None:
+                row['created_at'] = now
+    
+    by_day = {}
+    for row in rows:
+        by_day.setdefault(row['created_at'].date(), []).append(row)
+    _ensure_partitions(conn, by_day)
+    
+    if NATIVE_PARTITIONING:
+        return [(Tweet.__table__, rows)]
+    return [(_partition_table(day), day_rows) for day, day_rows in by_day.items()]
+
+def _stored_tweet_ids(conn, tweet_ids):
+    """Get the tweet ids already stored in any partition."""
+    sources = [Tweet.__table__] if NATIVE_PARTITIONING else [_partition_table(day) for day in _list_partitions(conn)]
+    
+    stored = set()
+    for source in sources:
+        stored.update(conn.execute(select(source.c.tweet_id).where(source.c.tweet_id.in_(tweet_ids))).scalars())
+    return stored
+
+def _drop_partitions_before(conn, day):
+    """
+    Drop the partitions of the days before a day.
+    
+    Returns:
+        list: Days whose partitions were dropped
+    """
+    dropped = [partition_day for partition_day in _list_partitions(conn) if partition_day < day]
+    
+    for partition_day in dropped:
+        if NATIVE_PARTITIONING:
+            conn.execute(text(f"DROP TABLE IF EXISTS {_partition_name(partition_day)}"))
+        else:
+            _partition_table(partition_day).drop(conn, checkfirst=True)
+            conn.execute(text(f"DROP TABLE IF EXISTS {_partition_name(partition_day)}_fts"))
+    
+    return dropped
+
+def _is_partitioned_table(conn):
+    """Check whether the PostgreSQL tweets table is a partitioned table."""
+    kind = conn.execute(text("SELECT relkind FROM pg_class WHERE relname = 'tweets'")).scalar()
+    return kind == 'p'
+
+def _move_to_partitions(conn):
+    """
+    Move tweets stored in the plain tweets table into SQLite daily partitions.
+    
+    This runs once when partitioning is turned on for an existing database.
+    
+    Returns:
+        int: Number of tweets moved
+    """
+    table = Tweet.__table__
+    if conn.execute(select(table.c.id).limit(1)).first() is None:
+        return 0
+    
+    # Undated tweets are filed under the time they were saved
+    conn.execute(table.update().where(table.c.created_at.is_(None)).values(
+        created_at=func.coalesce(table.c.inserted_at, datetime.now())
+    ))
+    
+    days = [pd.Timestamp(value).date() for value in conn.execute(
+        select(func.date(table.c.created_at)).distinct()
+    ).scalars()]
+    _ensure_partitions(conn, days)
+    
+    columns = [column.name for column in table.columns if column.name != 'id']
+    for day in days:
+        partition = _partition_table(day)
+        start = datetime.combine(day, datetime.min.time())
+        query = select(*(table.c[name] for name in columns)).where(
+            table.c.created_at >= start, table.c.created_at < start + timedelta(days=1)
+        )
+        conn.execute(partition.insert().from_select(columns, query))
+    
+    moved = conn.execute(table.delete()).rowcount
+    logger.info(f"Moved {moved} tweets into {len(days)} daily partitions")
+    return moved
+
+def _ensure_search_index(conn, source):
+    """
+    Create the full-text index of a tweets table if it does not exist.
+    
+    On SQLite this is an FTS5 table over text, username and hashtags, kept in
+    sync by triggers on insert, update and delete and filled from the rows
+    already stored. On PostgreSQL it is a GIN index on PG_SEARCH_VECTOR,
+    created once on the (possibly partitioned) tweets table.
+    
+    Args:
+        conn (sqlalchemy.engine.Connection): Connection inside a transaction
+        source (sqlalchemy.Table): Tweets table to index
+    """
+    name = source.name
+    
+    if conn.dialect.name == 'postgresql':
+        if name == 'tweets':
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_tweets_search ON tweets USING GIN (({PG_SEARCH_VECTOR}))"))
+        return
+    
+    if conn.dialect.name != 'sqlite':
+        return
+    
+    exists = conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': f"{name}_fts"}
+    ).first()
+    if exists:
+        return
+    
+    conn.execute(text(
+        f"CREATE VIRTUAL TABLE {name}_fts USING fts5("
+        f"text, username, hashtags, content='{name}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+    ))
+    
+    new_values = "new.id, new.text, new.username, new.hashtags"
+    old_values = "'delete', old.id, old.text, old.username, old.hashtags"
+    columns = "rowid, text, username, hashtags"
+    conn.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS {name}_fts_insert AFTER INSERT ON {name} BEGIN "
+        f"INSERT INTO {name}_fts({columns}) VALUES ({new_values}); END"
+    ))
+    conn.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS {name}_fts_delete AFTER DELETE ON {name} BEGIN "
+        f"INSERT INTO {name}_fts({name}_fts, {columns}) VALUES ({old_values}); END"
+    ))
+    conn.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS {name}_fts_update AFTER UPDATE ON {name} BEGIN "
+        f"INSERT INTO {name}_fts({name}_fts, {columns}) VALUES ({old_values}); "
+        f"INSERT INTO {name}_fts({columns}) VALUES ({new_values}); END"
+    ))
+    
+    # Index the rows stored before the FTS table existed
+    conn.execute(text(f"INSERT INTO {name}_fts({name}_fts) VALUES ('rebuild')"))
+
+def get_tweets(limit=1000, disaster_type=None, time_range=None, columns=None):
+    """
+    Get tweets from database with optional filtering
+    
+    Args:
+        limit (int): Maximum number of tweets to retrieve
+        disaster_type (str, optional): Filter by disaster type
+        time_range (tuple, optional): Filter by time range (start, end)
+        columns (list, optional): Columns to retrieve; defaults to all of READ_COLUMNS
         
-        # Execute query
-        tweets = query.all()
+    Returns:
+        pandas.DataFrame: DataFrame with tweets, newest first
+    """
+    try:
+        chunks = list(_iter_tweet_frames(limit, disaster_type, time_range, columns, READ_CHUNK_SIZE))
         
-        if not tweets:
+        if not chunks:
             return pd.DataFrame()
         
-        # Convert to DataFrame
-        data = []
-        for tweet in tweets:
-            data.append({
-                'id': tweet.tweet_id,
-                'text': tweet.text,
-                'clean_text': tweet.clean_text,
-                'created_at': tweet.created_at,
-                'username': tweet.username,
-                'display_name': tweet.display_name,
-                'location': tweet.location,
-                'retweet_count': tweet.retweet_count,
-                'like_count': tweet.like_count,
-                'reply_count': tweet.reply_count,
-                'hashtags': tweet.hashtags,
-                'mentions': tweet.mentions,
-                'sentiment': tweet.sentiment,
-                'sentiment_score': tweet.sentiment_score,
-                'disaster_impact': tweet.disaster_impact,
-                'disaster_type': tweet.disaster_type,
-                'lat': tweet.lat,
-                'lon': tweet.lon
-            })
-        
-        df = pd.DataFrame(data)
+        # Categories are set after concatenating so every chunk shares them
+        df = _set_read_dtypes(pd.concat(chunks, ignore_index=True))
         logger.info(f"Retrieved {len(df)} tweets from database")
         return df
         
     except Exception as e:
         logger.error(f"Error retrieving tweets from database: {e}")
         return pd.DataFrame()
+
+def get_tweet_page(limit=1000, disaster_type=None, time_range=None, columns=None, cursor=None):
+    """
+    Get one page of tweets, newest first, and a cursor for the next page
+    
+    Pages are read by keyset on (created_at, id): each page starts below the
+    last row of the previous one instead of skipping rows with OFFSET, so
+    every page costs the same and tweets saved in between do not shift the
+    pages. Tweets without a created_at are not paged.
+    
+    Args:
+        limit (int): Maximum number of tweets in the page
+        disaster_type (str, optional): Filter by disaster type
+        time_range (tuple, optional): Filter by time range (start, end)
+        columns (list, optional): Columns to retrieve; defaults to all of READ_COLUMNS
+        cursor (str, optional): Cursor returned with the previous page
+        
+    Returns:
+        tuple: (DataFrame with the page's tweets; cursor for the next page,
+                or None after the last page)
+    """
+    names = _check_columns(columns)
+    after = None
+    if cursor:
+        created_at, row_id = _decode_cursor(cursor)
+        after = (datetime.fromisoformat(created_at), row_id)
+    
+    # Partitions newer than the cursor hold no rows of the page
+    start_time, end_time = time_range if time_range else (None, None)
+    if after is not None and (not end_time or pd.Timestamp(end_time) > after[0]):
+        end_time = after[0]
+    
+    try:
+        rows = []
+        with engine.connect() as conn:
+            for source in tweet_sources(conn, (start_time, end_time)):
+                query = tweets_query(names, disaster_type, time_range, limit + 1 - len(rows), source, after)
+                query = query.where(source.c.created_at.is_not(None)).add_columns(
+                    source.c.created_at.label('_created_at'), source.c.id.label('_row_id')
+                )
+                
+                # A server-side cursor on PostgreSQL, so large pages are not buffered by the driver
+                result = conn.execution_options(stream_results=True, yield_per=READ_CHUNK_SIZE).execute(query)
+                rows.extend(result.all())
+                if len(rows) > limit:
+                    break
+        
+        page = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = _encode_cursor([page[-1]._created_at.isoformat(), page[-1]._row_id])
+        
+        df = pd.DataFrame([tuple(row)[:len(names)] for row in page], columns=names)
+        return _set_read_dtypes(df), next_cursor
+        
+    except Exception as e:
+        logger.error(f"Error retrieving tweet page from database: {e}")
+        return pd.DataFrame(), None
+
+def iter_tweets(limit=None, disaster_type=None, time_range=None, columns=None, chunk_size=None):
+    """
+    Iterate over tweets from database in DataFrame chunks, newest first
+    
+    Each chunk is a keyset page from get_tweet_page read by its own short
+    query, so only one chunk is held in memory at a time, the cost per chunk
+    does not grow with the depth of the iteration and no long-lived cursor
+    is kept open; use this for exports and other large reads. Keyset pages
+    skip tweets without a created_at, so those are streamed after them.
+    
+    Args:
+        limit (int, optional): Maximum number of tweets to retrieve
+        disaster_type (str, optional): Filter by disaster type
+        time_range (tuple, optional): Filter by time range (start, end)
+        columns (list, optional): Columns to retrieve; defaults to all of READ_COLUMNS
+        chunk_size (int, optional): Rows per chunk; defaults to READ_CHUNK_SIZE
+        
+    Yields:
+        pandas.DataFrame: Chunks of tweets with typed columns
+    """
+    chunk_size = chunk_size or READ_CHUNK_SIZE
+    remaining = limit
+    cursor = None
+    
+    while remaining is None or remaining > 0:
+        page_size = chunk_size if remaining is None else min(chunk_size, remaining)
+        page, cursor = get_tweet_page(page_size, disaster_type, time_range, columns, cursor)
+        if page.empty:
+            break
+        
+        yield page
+        if remaining is not None:
+            remaining -= len(page)
+        if cursor is None:
+            break
+    
+    # A time range excludes undated tweets anyway
+    start_time, end_time = time_range if time_range else (None, None)
+    if (remaining is None or remaining > 0) and not start_time and not end_time:
+        try:
+            for chunk in _iter_tweet_frames(remaining, disaster_type, None, columns, chunk_size, undated=True):
+                yield _set_read_dtypes(chunk)
+        except Exception as e:
+            logger.error(f"Error retrieving undated tweets from database: {e}")
+
+def _iter_tweet_frames(limit, disaster_type, time_range, columns, chunk_size, undated=False):
+    """Stream the selected tweet columns as DataFrame chunks without dtype conversion, or only the undated tweets."""
+    names = _check_columns(columns)
+    remaining = limit
+    
+    with engine.connect() as conn:
+        # Partitions come newest first and do not overlap, so reading them in turn keeps the order
+        for source in tweet_sources(conn, time_range):
+            query = tweets_query(names, disaster_type, time_range, remaining, source)
+            if undated:
+                query = query.where(source.c.created_at.is_(None))
+            result = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(query)
+            
+            for rows in result.partitions(chunk_size):
+                if remaining is not None:
+                    remaining -= len(rows)
+                yield pd.DataFrame(dict(zip(names, zip(*rows))), columns=names)
+            
+            if remaining is not None and remaining <= 0:
+                break
+
+def tweets_query(columns=None, disaster_type=None, time_range=None, limit=None, source=None, after=None):
+    """
+    Build the query get_tweets and get_tweet_page run, newest first
+    
+    Args:
+        columns (list, optional): Columns to select; defaults to all of READ_COLUMNS
+        disaster_type (str, optional): Filter by disaster type
+        time_range (tuple, optional): Filter by time range (start, end)
+        limit (int, optional): Maximum number of tweets
+        source (sqlalchemy.Table, optional): Table to read, from tweet_sources;
+                                             defaults to the tweets table
+        after (tuple, optional): (created_at, id) of the last row of the previous page
+        
+    Returns:
+        sqlalchemy.sql.Select: The select statement
+    """
+    source = source if source is not None else Tweet.__table__
+    names = _check_columns(columns)
+    
+    query = select(*(source.c[READ_COLUMNS[name].key].label(name) for name in names))
+    query = _filter_tweets(query, disaster_type, time_range, source)
+    if after is not None:
+        query = query.where(tuple_(source.c.created_at, source.c.id) < tuple_(*after))
+    
+    # id breaks created_at ties, so pages have a total order; SQLite indexes already end in it
+    query = query.order_by(source.c.created_at.desc(), source.c.id.desc())
+    if limit is not None:
+        query = query.limit(limit)
+    
+    return query
+
+def _check_columns(columns):
+    """Get the requested read columns, defaulting to all, rejecting unknown names."""
+    names = list(columns or READ_COLUMNS)
+    unknown = [name for name in names if name not in READ_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown tweet columns: {', '.join(unknown)}")
+    return names
+
+def tweet_count_query(disaster_type=None, time_range=None, source=None):
+    """Build the query get_tweet_count runs on one tweets table."""
+    source = source if source is not None else Tweet.__table__
+    return _filter_tweets(select(func.count()).select_from(source), disaster_type, time_range, source)
+
+def tweet_stats_query(time_range=None, source=None):
+    """Build the grouped count query get_tweet_stats runs on one tweets table."""
+    source = source if source is not None else Tweet.__table__
+    columns = [source.c[READ_COLUMNS[name].key].label(name) for name in STATS_DIMENSIONS]
+    query = _filter_tweets(select(*columns, func.count().label('count')), time_range=time_range, source=source)
+    return query.group_by(*columns)
+
+def old_tweets_delete(cutoff_date, source=None):
+    """Build the retention delete clear_old_tweets runs on one tweets table."""
+    source = source if source is not None else Tweet.__table__
+    return source.delete().where(source.c.created_at < cutoff_date)
+
+def rollups_query(time_range=None, disaster_type=None):
+    """Build the rollup query get_rollups runs, oldest bucket first."""
+    table = TweetRollup.__table__
+    query = select(table)
+    
+    if disaster_type and disaster_type != "All":
+        query = query.where(table.c.disaster_type == disaster_type)
+    
+    if time_range:
+        start_time, end_time = time_range
+        if start_time:
+            start_hour = pd.Timestamp(start_time).floor('h').to_pydatetime()
+            query = query.where(table.c.bucket >= start_hour)
+        if end_time:
+            query = query.where(table.c.bucket <= end_time)
+    
+    return query.order_by(table.c.bucket)
+
+def tweet_search_query(query, dialect, disaster_type=None, time_range=None, after=None, limit=100, source=None,
+                       by_score=None):
+    """
+    Build the full-text search query search_tweets runs on one tweets table
+    
+    Args:
+        query (str): Search query in the session search syntax (words, OR,
+                     prefix*, #hashtag, @user)
+        dialect (str): Database dialect name
+        disaster_type (str, optional): Filter by disaster type
+        time_range (tuple, optional): Filter by time range (start, end)
+        after (tuple, optional): Sort key of the last match of the previous
+                                 page: (score, created_at, id) by score,
+                                 (created_at, id) otherwise
+        limit (int): Maximum number of matches
+        source (sqlalchemy.Table, optional): Table to search, from tweet_sources;
+                                             defaults to the tweets table
+        by_score (bool, optional): Order by score, newest first on ties;
+                                   otherwise newest first; defaults to
+                                   SEARCH_BY_SCORE
+        
+    Returns:
+        sqlalchemy.sql.Select: Matches in the requested order, or None if the
+                               query has no searchable words
+    """
+    source = source if source is not None else Tweet.__table__
+    by_score = SEARCH_BY_SCORE if by_score is None else by_score
+    groups = parse_query(query)
+    if not groups:
+        return None
+    
+    columns = [source.c[READ_COLUMNS[name].key].label(name) for name in READ_COLUMNS]
+    
+    if dialect == 'postgresql':
+        ts_query = func.to_tsquery('simple', _pg_tsquery(groups))
+        vector = literal_column(PG_SEARCH_VECTOR)
+        matches = select(*columns, func.ts_rank_cd(vector, ts_query).label('score')).where(vector.op('@@')(ts_query))
+    else:
+        # bm25 is lower for better matches; negate it so higher is better on every database
+        fts = table(f"{source.name}_fts", column('rowid'))
+        fts_ref = literal_column(fts.name)
+        matches = select(*columns, (-func.bm25(fts_ref)).label('score')).select_from(
+            source.join(fts, fts.c.rowid == source.c.id)
+        ).where(fts_ref.op('MATCH')(_fts5_query(groups)))
+    
+    matches = _filter_tweets(matches, disaster_type, time_range, source).subquery()
+    query = select(matches)
+    
+    if not by_score:
+        if after is not None:
+            query = query.where(tuple_(matches.c.created_at, matches.c.id) < tuple_(*after))
+        return query.order_by(matches.c.created_at.desc(), matches.c.id.desc()).limit(limit)
+    
+    if after is not None:
+        score, created_at, tweet_id = after
+        query = query.where(or_(
+            matches.c.score < score,
+            and_(matches.c.score == score, matches.c.created_at < created_at),
+            and_(matches.c.score == score, matches.c.created_at == created_at, matches.c.id < tweet_id)
+        ))
+    
+    return query.order_by(matches.c.score.desc(), matches.c.created_at.desc(), matches.c.id.desc()).limit(limit)
+
+def _fts5_query(groups):
+    """Convert parsed search groups into an SQLite FTS5 MATCH expression."""
+    clauses = []
+    for group in groups:
+        terms = []
+        for field, token, prefix in group:
+            term = '"' + token.replace('"', '""') + '"' + ('*' if prefix else '')
+            terms.append(f"{FTS_FIELD_COLUMNS[field]} : {term}")
+        clauses.append('(' + ' AND '.join(terms) + ')')
+    
+    return ' OR '.join(clauses)
+
+def _pg_tsquery(groups):
+    """Convert parsed search groups into PostgreSQL to_tsquery syntax."""
+    clauses = []
+    for group in groups:
+        terms = []
+        for field, token, prefix in group:
+            # Split like the text search parser, keeping multi-part tokens as a phrase
+            parts = re.findall(r'[^\W_]+', token)
+            if not parts:
+                continue
+            weight = PG_FIELD_WEIGHTS[field]
+            labels = [f":{weight}" if weight else ''] * len(parts)
+            if prefix:
+                labels[-1] = f":*{weight}"
+            terms.append('(' + ' <-> '.join(part + label for part, label in zip(parts, labels)) + ')')
+        if terms:
+            clauses.append('(' + ' & '.join(terms) + ')')
+    
+    return ' | '.join(clauses)
+
+def _filter_tweets(query, disaster_type=None, time_range=None, source=None):
+    """Apply the disaster type and time range filters to a query on a tweets table."""
+    source = source if source is not None else Tweet.__table__
+    
+    if disaster_type and disaster_type != "All":
+        query = query.where(source.c.disaster_type == disaster_type)
+    
+    if time_range:
+        start_time, end_time = time_range
+        if start_time:
+            query = query.where(source.c.created_at >= start_time)
+        if end_time:
+            query = query.where(source.c.created_at <= end_time)
+    
+    return query
+
+def _set_read_dtypes(df):
+    """Convert columns read from the database to their pandas dtypes."""
+    if 'created_at' in df.columns:
+        df['created_at'] = pd.to_datetime(df['created_at'])
+    
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    
+    # A column holding any NULL comes back as object dtype
+    for column in FLOAT_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], errors='coerce').astype('float64')
+    
+    return df
+
+def search_tweets(query, disaster_type=None, time_range=None, limit=100, cursor=None):
+    """
+    Search all stored tweets with the database full-text index
+    
+    Matches are ranked by relevance. With SQLite daily partitioning each day
+    has its own full-text index, whose bm25 scores are not comparable with
+    another day's, so matches are returned newest first instead and 'score'
+    only ranks matches of the same day.
+    
+    Args:
+        query (str): Search query: words (all must match), OR between
+                     alternatives, prefix*, #hashtag and @user
+        disaster_type (str, optional): Filter by disaster type
+        time_range (tuple, optional): Filter by time range (start, end)
+        limit (int): Maximum number of matches per page
+        cursor (str, optional): Cursor returned with the previous page
         
-    finally:
-        session.close()
+    Returns:
+        tuple: (DataFrame of matches, best (or newest) first, with a 'score'
+                column; cursor for the next page, or None after the last page)
+    """
+    by_score = SEARCH_BY_SCORE
+    
+    after = None
+    if cursor:
+        *score, created_at, tweet_id = _decode_cursor(cursor)
+        after = (*score, datetime.fromisoformat(created_at), tweet_id)
+        if len(after) != (3 if by_score else 2):
+            raise ValueError(f"Invalid cursor: {cursor!r}")
+    
+    try:
+        rows = []
+        with engine.connect() as conn:
+            # Partitions come newest first, so newest-first matches can stop at a full page
+            for source in tweet_sources(conn, time_range):
+                remaining = limit + 1 if by_score else limit + 1 - len(rows)
+                stmt = tweet_search_query(query, conn.dialect.name, disaster_type, time_range, after, remaining, source, by_score)
+                if stmt is None:
+                    break
+                rows.extend(conn.execute(stmt).all())
+                if not by_score and len(rows) > limit:
+                    break
+        
+        page = rows[:limit]
+        
+        next_cursor = None
+        if len(rows) > limit:
+            last = page[-1]
+            key = [last.score] if by_score else []
+            next_cursor = _encode_cursor(key + [last.created_at.isoformat(), last.id])
+        
+        names = list(READ_COLUMNS) + ['score']
+        df = _set_read_dtypes(pd.DataFrame([tuple(row) for row in page], columns=names))
+        return df, next_cursor
+        
+    except Exception as e:
+        logger.error(f"Error searching tweets in database: {e}")
+        return pd.DataFrame(), None
+
+def _encode_cursor(values):
+    """Encode the sort key of the last row of a page as an opaque cursor string."""
+    return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii')
+
+def _decode_cursor(cursor):
+    """Decode a cursor from _encode_cursor back into its sort key values."""
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
 
 def get_tweet_count(disaster_type=None, time_range=None):
     """
@@ -209,63 +1272,190 @@ def get_tweet_count(disaster_type=None, time_range=None):
     Returns:
         int: Count of tweets
     """
-    session = Session()
-    
     try:
-        query = session.query(Tweet)
-        
-        # Apply filters
-        if disaster_type and disaster_type != "All":
-            query = query.filter(Tweet.disaster_type == disaster_type)
-            
-        if time_range:
-            start_time, end_time = time_range
-            if start_time:
-                query = query.filter(Tweet.created_at >= start_time)
-            if end_time:
-                query = query.filter(Tweet.created_at <= end_time)
-        
-        # Count tweets
-        count = query.count()
-        return count
+        with engine.connect() as conn:
+            return sum(conn.execute(tweet_count_query(disaster_type, time_range, source)).scalar_one()
+                       for source in tweet_sources(conn, time_range))
         
     except Exception as e:
         logger.error(f"Error counting tweets in database: {e}")
         return 0
+
+def get_tweet_stats(time_range=None, use_cache=True):
+    """
+    Get tweet counts per disaster type, sentiment and impact with one query
+    
+    Args:
+        time_range (tuple, optional): Filter by time range (start, end)
+        use_cache (bool): Reuse a result younger than STATS_CACHE_TTL seconds
         
-    finally:
-        session.close()
+    Returns:
+        dict: 'total' count; 'disaster_type', 'sentiment' and 'disaster_impact'
+              dicts mapping each value to its count; and 'groups', a DataFrame
+              with the count of every (disaster_type, sentiment, disaster_impact)
+              combination
+    """
+    key = tuple(time_range) if time_range else None
+    
+    if use_cache and STATS_CACHE_TTL > 0:
+        with _stats_lock:
+            cached = _stats_cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+    
+    dimensions = STATS_DIMENSIONS
+    
+    try:
+        with engine.connect() as conn:
+            rows = [row for source in tweet_sources(conn, time_range)
+                    for row in conn.execute(tweet_stats_query(time_range, source)).all()]
+        
+        groups = pd.DataFrame(rows, columns=dimensions + ['count'])
+        if len(groups) and groups.duplicated(subset=dimensions).any():
+            # Partitions return one row per group each
+            groups = groups.groupby(dimensions, dropna=False, as_index=False, observed=True)['count'].sum()
+    except Exception as e:
+        logger.error(f"Error getting tweet stats from database: {e}")
+        return _build_tweet_stats(pd.DataFrame(columns=dimensions + ['count']), dimensions)
+    
+    stats = _build_tweet_stats(groups, dimensions)
+    
+    if STATS_CACHE_TTL > 0:
+        with _stats_lock:
+            _stats_cache[key] = (time.monotonic() + STATS_CACHE_TTL, stats)
+    
+    return stats
+
+def _build_tweet_stats(groups, dimensions):
+    """Sum grouped counts into per-dimension totals."""
+    stats = {'total': int(groups['count'].sum()), 'groups': groups}
+    for dimension in dimensions:
+        totals = groups.groupby(groups[dimension].fillna('unknown'))['count'].sum()
+        stats[dimension] = {value: int(count) for value, count in totals.items()}
+    
+    return stats
+
+def invalidate_stats_cache():
+    """Drop cached get_tweet_stats results after the tweets table changed."""
+    with _stats_lock:
+        _stats_cache.clear()
 
 def clear_old_tweets(days=30):
     """
     Delete tweets older than specified number of days
     
+    Rollup rows of hours that are entirely older than the cutoff are dropped;
+    for the hour containing the cutoff only the deleted tweets are subtracted.
+    With daily partitioning, days entirely older than the cutoff are dropped
+    as whole partitions and only the day containing the cutoff is deleted row
+    by row, so the cost does not grow with the size of the store.
+    
     Args:
         days (int): Number of days to keep
         
     Returns:
         int: Number of tweets deleted
     """
-    session = Session()
-    
     try:
         # Calculate cutoff date
         cutoff_date = datetime.now() - pd.Timedelta(days=days)
+        cutoff_hour = cutoff_date.replace(minute=0, second=0, microsecond=0)
+        
+        with engine.begin() as conn:
+            # Subtract the expiring tweets of the partially expired hour
+            deltas = {}
+            for source in tweet_sources(conn, (cutoff_hour, cutoff_date)):
+                partial = conn.execute(_rollup_totals_query(source).where(
+                    source.c.created_at >= cutoff_hour, source.c.created_at < cutoff_date
+                )).all()
+                for row in partial:
+                    total = deltas.setdefault((cutoff_hour, *row[:3]), [0] * len(ROLLUP_MEASURES))
+                    for i, value in enumerate(row[3:]):
+                        total[i] -= value
+            if deltas:
+                _apply_rollup_deltas(conn, deltas)
+            
+            result = 0
+            if PARTITIONED:
+                # Drop the partitions of whole expired days, counting their tweets from the rollups
+                cutoff_day = cutoff_date.date()
+                day_start = datetime.combine(cutoff_day, datetime.min.time())
+                result += conn.execute(
+                    select(func.coalesce(func.sum(TweetRollup.tweet_count), 0)).where(TweetRollup.bucket < day_start)
+                ).scalar_one()
+                _drop_partitions_before(conn, cutoff_day)
+            
+            # Drop whole expired hours from the rollups
+            conn.execute(TweetRollup.__table__.delete().where(TweetRollup.bucket < cutoff_hour))
+            
+            # Delete tweets older than cutoff
+            for source in tweet_sources(conn, (None, cutoff_date)):
+                result += conn.execute(old_tweets_delete(cutoff_date, source)).rowcount
         
-        # Delete tweets older than cutoff
-        result = session.query(Tweet).filter(Tweet.created_at < cutoff_date).delete()
-        session.commit()
+        if result:
+            invalidate_stats_cache()
         
         logger.info(f"Deleted {result} tweets older than {days} days")
         return result
         
     except Exception as e:
-        session.rollback()
         logger.error(f"Error deleting old tweets: {e}")
         return 0
+
+def get_rollups(time_range=None, disaster_type=None):
+    """
+    Get hourly rollup rows with optional filtering
+    
+    Args:
+        time_range (tuple, optional): Filter by time range (start, end); hours
+                                      overlapping the range are included
+        disaster_type (str, optional): Filter by disaster type
         
-    finally:
-        session.close()
+    Returns:
+        pandas.DataFrame: One row per hour, disaster type, sentiment and impact
+                          with tweet_count and the score and engagement sums
+    """
+    try:
+        with engine.connect() as conn:
+            df = pd.DataFrame(conn.execute(rollups_query(time_range, disaster_type)).all(), columns=ROLLUP_KEYS + ROLLUP_MEASURES)
+        
+        df['bucket'] = pd.to_datetime(df['bucket'])
+        return df
+        
+    except Exception as e:
+        logger.error(f"Error retrieving tweet rollups from database: {e}")
+        return pd.DataFrame(columns=ROLLUP_KEYS + ROLLUP_MEASURES)
+
+def get_rollup_counts(time_range=None, disaster_type=None, by=None, freq='1h'):
+    """
+    Get tweet counts per time bucket from the rollup table
+    
+    The result has the same layout as TimeRollup.counts, so it can be passed
+    to the sentiment and volume charts as their counts argument.
+    
+    Args:
+        time_range (tuple, optional): Filter by time range (start, end)
+        disaster_type (str, optional): Filter by disaster type
+        by (str, optional): 'sentiment', 'disaster_impact' or 'disaster_type'
+                            to split counts into one column per value
+        freq (str): Bucket size, one hour or coarser (e.g. '1h', '6h', '1D')
+        
+    Returns:
+        pandas.DataFrame: 'bucket', 'tweet_count', one column per value of
+                          `by`, and the score and engagement sums per bucket
+    """
+    rollups = get_rollups(time_range, disaster_type)
+    if rollups.empty:
+        return pd.DataFrame()
+    
+    rollups['bucket'] = rollups['bucket'].dt.floor(freq)
+    result = rollups.groupby('bucket')[ROLLUP_MEASURES].sum()
+    
+    if by is not None:
+        split = rollups.groupby(['bucket', by])['tweet_count'].sum().unstack(fill_value=0)
+        result = result.join(split)
+    
+    return result.reset_index()
 
 # Initialize database on module import
 init_db()
\ No newline at end of file
@@ -0,0 +1,198 @@
+"""
+This module checks the query plans of the database module's queries.
+It runs EXPLAIN QUERY PLAN (SQLite) or EXPLAIN (PostgreSQL) on the statements
+database.py actually executes, built by the same query functions, and flags
+plans that scan a whole table instead of searching an index. Those queries
+get slower linearly as the tweets table grows. With SQLite daily partitioning
+the tweet queries are explained on the newest partition.
+
+Usage:
+    python db_explain.py
+    python db_explain.py --disaster-type Wildfire --hours 6 --json
+
+The database is read from DATABASE_URL like the dashboard. The exit status is
+1 when any query does a full table scan, so the check can run in CI.
+"""
+
+import sys
+import json
+import re
+import argparse
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from sqlalchemy import event, select
+from database import (
+    Tweet, engine, tweet_sources, tweets_query, tweet_count_query, tweet_stats_query,
+    tweet_search_query, old_tweets_delete, rollups_query
+)
+
+# Virtual table scan with index constraints, e.g. "VIRTUAL TABLE INDEX 0:M3" for an FTS5 MATCH;
+# an empty constraint string after the colon reads the whole table
+VIRTUAL_INDEX_PATTERN = re.compile(r'VIRTUAL TABLE INDEX \d+:\S')
+
+def build_queries(source=None, disaster_type="Hurricane", hours=24, retention_days=30):
+    """
+    Build the database module's queries with representative parameters.
+
+    Args:
+        source (sqlalchemy.Table, optional): Tweets table to query; defaults to the tweets table
+        disaster_type (str): Disaster type used by the filtered queries
+        hours (int): Length of the time range used by the filtered queries
+        retention_days (int): Days kept by the retention delete
+
+    Returns:
+        dict: Query name to SQLAlchemy statement
+    """
+    source = source if source is not None else Tweet.__table__
+    now = datetime.now()
+    time_range = (now - timedelta(hours=hours), now)
+
+    return {
+        'recent tweets': tweets_query(limit=1000, source=source),
+        'tweets by type and time': tweets_query(disaster_type=disaster_type, time_range=time_range, limit=1000, source=source),
+        'tweets by time': tweets_query(time_range=time_range, limit=1000, source=source),
+        'count by type and time': tweet_count_query(disaster_type, time_range, source),
+        'stats by time': tweet_stats_query(time_range, source),
+        'stats': tweet_stats_query(source=source),
+        'existing tweet ids': select(source.c.tweet_id).where(source.c.tweet_id.in_(['1', '2', '3'])),
+        'retention delete': old_tweets_delete(now - timedelta(days=retention_days), source),
+        'rollups by type and time': rollups_query(time_range, disaster_type),
+        'search': tweet_search_query("flood OR evac*", engine.dialect.name, disaster_type, time_range, source=source)
+    }
+
+@contextmanager
+def _explaining(conn, prefix):
+    """Prefix every statement the connection executes with an EXPLAIN command."""
+    def add_prefix(conn, cursor, statement, parameters, context, executemany):
+        return prefix + statement, parameters
+
+    event.listen(conn, 'before_cursor_execute', add_prefix, retval=True)
+    try:
+        yield conn
+    finally:
+        event.remove(conn, 'before_cursor_execute', add_prefix)
+
+def explain(conn, statement):
+    """
+    Get the query plan of a statement without running it.
+
+    Args:
+        conn (sqlalchemy.engine.Connection): Connection to the database
+        statement: SQLAlchemy statement
+
+    Returns:
+        list: Plan lines, one per plan node
+    """
+    dialect = conn.dialect.name
+    prefix = "EXPLAIN QUERY PLAN " if dialect == 'sqlite' else "EXPLAIN "
+
+    with _explaining(conn, prefix):
+        rows = conn.execute(statement).all()
+
+    if dialect == 'sqlite':
+        # Rows are (id, parent, notused, detail); indent children under their parent
+        depths = {0: -1}
+        lines = []
+        for node_id, parent, _, detail in rows:
+            depths[node_id] = depths.get(parent, -1) + 1
+            lines.append("  " * depths[node_id] + detail)
+        return lines
+
+    return [row[0] for row in rows]
+
+def find_full_scans(plan, dialect, limited=False):
+    """
+    Find the plan lines that read a whole table or a whole index.
+
+    Only index searches and scans of a covering index, which reads the index
+    instead of the table, are not reported; a plain SCAN USING INDEX still
+    visits every row. A full-text match on a virtual table uses its index
+    when the plan names index constraints. A query with a LIMIT whose index
+    scan already yields rows in ORDER BY order (no temporary B-tree for the
+    ORDER BY) stops after LIMIT rows, so that scan is not reported either.
+
+    Args:
+        plan (list): Plan lines from explain
+        dialect (str): Database dialect name
+        limited (bool): Whether the query has a LIMIT
+
+    Returns:
+        list: Plan lines doing a full table or index scan
+    """
+    if dialect == 'sqlite':
+        ordered = not any('TEMP B-TREE FOR' in line and 'ORDER BY' in line for line in plan)
+        full_scans = []
+        for line in plan:
+            detail = line.strip()
+            if not detail.startswith('SCAN ') or 'USING COVERING INDEX' in detail or 'CONSTANT ROW' in detail:
+                continue
+            if VIRTUAL_INDEX_PATTERN.search(detail):
+                continue
+            if limited and ordered and 'USING INDEX' in detail:
+                continue
+            full_scans.append(line)
+        return full_scans
+
+    return [line for line in plan if 'Seq Scan' in line]
+
+def run_checks(queries):
+    """
+    Explain every query and collect the full scans.
+
+    Args:
+        queries (dict): Query name to SQLAlchemy statement
+
+    Returns:
+        dict: Query name to a dict with the 'plan' lines and the 'full_scans' found
+    """
+    report = {}
+
+    with engine.connect() as conn:
+        dialect = conn.dialect.name
+        for name, statement in queries.items():
+            # EXPLAIN does not run the statement, but keep deletes inside a rolled back transaction
+            with conn.begin() as transaction:
+                plan = explain(conn, statement)
+                transaction.rollback()
+            limited = getattr(statement, '_limit_clause', None) is not None
+            report[name] = {'plan': plan, 'full_scans': find_full_scans(plan, dialect, limited)}
+
+    return report
+
+def format_report(report):
+    """Format query plans as plain text, marking queries with full scans."""
+    lines = [f"Database: {engine.dialect.name}", ""]
+
+    for name, result in report.items():
+        status = "FULL SCAN" if result['full_scans'] else "ok"
+        lines.append(f"{name} [{status}]")
+        lines.extend(f"    {line}" for line in result['plan'])
+        lines.append("")
+
+    flagged = [name for name, result in report.items() if result['full_scans']]
+    lines.append(f"{len(flagged)} of {len(report)} queries scan a full table" + (f": {', '.join(flagged)}" if flagged else ""))
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the query plans of the database module's queries")
+    parser.add_argument("--disaster-type", default="Hurricane", help="disaster type used by the filtered queries")
+    parser.add_argument("--hours", type=int, default=24, help="length of the time range used by the filtered queries")
+    parser.add_argument("--retention-days", type=int, default=30, help="days kept by the retention delete")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    with engine.connect() as conn:
+        sources = tweet_sources(conn)
+    source = sources[0] if sources else None
+
+    report = run_checks(build_queries(source, args.disaster_type, args.hours, args.retention_days))
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(format_report(report))
+
+    return 1 if any(result['full_scans'] for result in report.values()) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -79,21 +79,24 @@ def get_disaster_types():
 def get_impact_keywords():
     """
     Get keywords that indicate different levels of disaster impact.
+    This is the single source of impact keywords used by the sentiment analyzer.
+    Keywords are matched as lowercase substrings, so stems like "evacuat" cover
+    "evacuate", "evacuation" and "evacuated".
     
     Returns:
         dict: Dictionary with impact levels as keys and keywords as values
     """
     impact_keywords = {
         "Severe": [
-            "catastrophic", "devastating", "fatal", "death", "killed", "casualties", 
-            "destroyed", "emergency", "evacuate", "evacuation", "crisis", "danger", "severe", 
-            "tragedy", "disaster", "critical", "massive damage", "deadly", "fatalities"
+            "catastrophic", "devastat", "fatal", "death", "killed", "casualties", 
+            "destroyed", "emergency", "evacuat", "crisis", "danger", "severe", 
+            "tragedy", "disaster", "critical", "massive", "deadly"
         ],
         
         "Moderate": [
-            "damage", "injured", "wounded", "affected", "impact", "hit", "threat",
+            "damage", "injured", "wound", "affected", "impact", "hit", "threat",
             "loss", "moderate", "concern", "worried", "warning", "displacement",
-            "disruption", "power outage", "destruction", "property damage"
+            "disruption", "power outage", "destruction"
         ],
         
         "Minor": [
@@ -0,0 +1,233 @@
+"""
+This module filters tweet frames by keywords and free-text queries.
+Keyword sets are escaped and compiled into one case-insensitive pattern once,
+and each searched column is lowercased once per frame into a single string
+that the pattern scans in C. Match offsets are mapped back to rows, giving a
+boolean mask without a Python-level pass over the rows on every keystroke.
+"""
+
+import re
+import logging
+import weakref
+from collections import OrderedDict
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+# Columns searched by free-text queries
+QUERY_COLUMNS = ['text', 'username', 'hashtags']
+
+# Separates rows in a column blob; removed from values so matches stay within one row
+ROW_SEPARATOR = '\x00'
+
+# Number of frames whose lowercased columns are kept
+MAX_CACHED_FRAMES = 4
+
+_engines = OrderedDict()
+
+@lru_cache(maxsize=256)
+def compile_keywords(keywords):
+    """
+    Compile a keyword set into one pattern matching any keyword literally.
+
+    Args:
+        keywords (tuple): Keywords; regex metacharacters are matched literally
+
+    Returns:
+        re.Pattern: Compiled pattern for lowercased text, or None if no
+                    keyword is left after removing empty ones
+    """
+    terms = {keyword.lower().replace(ROW_SEPARATOR, '') for keyword in keywords if keyword}
+    terms.discard('')
+    if not terms:
+        return None
+
+    # Longest first so the alternation prefers the most specific keyword
+    return re.compile('|'.join(re.escape(term) for term in sorted(terms, key=lambda term: (-len(term), term))))
+
+class LoweredColumn:
+    def __init__(self, values):
+        """
+        Lowercase a column once and join it into a single searchable string.
+
+        Args:
+            values (iterable): Column values; lists are joined with spaces and
+                               missing values become empty strings
+        """
+        values = list(values)
+        self.blob = _join_lowered(values)
+
+        if self.blob is None:
+            values = [_to_text(value).lower().replace(ROW_SEPARATOR, '') for value in values]
+            self.blob = ROW_SEPARATOR.join(values)
+
+        lengths = np.fromiter(map(len, values), dtype=np.int64, count=len(values))
+        self.starts = np.concatenate(([0], np.cumsum(lengths + 1)[:-1])).astype(np.int64)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def match(self, pattern):
+        """
+        Find the rows that contain a match of a pattern.
+
+        Args:
+            pattern (re.Pattern): Pattern compiled for lowercased text
+
+        Returns:
+            numpy.ndarray: Boolean array with one entry per row
+        """
+        mask = np.zeros(len(self), dtype=bool)
+        if pattern is None or not len(self):
+            return mask
+
+        positions = np.fromiter((match.start() for match in pattern.finditer(self.blob)), dtype=np.int64)
+        if len(positions):
+            mask[np.searchsorted(self.starts, positions, side='right') - 1] = True
+
+        return mask
+
+class FilterEngine:
+    def __init__(self, df):
+        """
+        Initialize a filter engine for a DataFrame.
+
+        Columns are lowercased on first use and reused by later filters, so
+        the frame must not be modified in place while the engine is used.
+
+        Args:
+            df (pandas.DataFrame): DataFrame to filter
+        """
+        self.index = df.index
+        self._df = weakref.ref(df)
+        self._columns = {}
+
+    def column(self, name):
+        """Get the lowercased form of a column, building it on first use."""
+        if name not in self._columns:
+            df = self._df()
+            if df is None:
+                raise ReferenceError("The DataFrame of this filter engine no longer exists")
+            self._columns[name] = LoweredColumn(df[name])
+
+        return self._columns[name]
+
+    def keyword_mask(self, keywords, columns=('text',)):
+        """
+        Build a mask of rows containing any of the keywords.
+
+        Args:
+            keywords (list): Keywords matched case-insensitively as substrings
+            columns (list): Columns to search; columns missing from the frame are skipped
+
+        Returns:
+            pandas.Series: Boolean mask aligned with the frame
+        """
+        pattern = compile_keywords(tuple(keywords))
+        df = self._df()
+
+        mask = np.zeros(len(self.index), dtype=bool)
+        for name in columns:
+            if df is not None and name in df.columns:
+                mask |= self.column(name).match(pattern)
+
+        return pd.Series(mask, index=self.index)
+
+    def query_mask(self, query, columns=QUERY_COLUMNS):
+        """
+        Build a mask of rows containing a free-text query.
+
+        Args:
+            query (str): Text matched case-insensitively as a substring
+            columns (list): Columns to search
+
+        Returns:
+            pandas.Series: Boolean mask aligned with the frame
+        """
+        return self.keyword_mask([query], columns)
+
+def get_filter_engine(df):
+    """
+    Get the filter engine for a DataFrame, reusing it while the frame is alive.
+
+    Args:
+        df (pandas.DataFrame): DataFrame to filter
+
+    Returns:
+        FilterEngine: Engine caching the frame's lowercased columns
+    """
+    key = id(df)
+    engine = _engines.get(key)
+
+    # An id can be reused once a frame is garbage collected, so check the referent
+    if engine is not None and engine._df() is df and engine.index is df.index:
+        _engines.move_to_end(key)
+        return engine
+
+    engine = FilterEngine(df)
+    _engines[key] = engine
+    while len(_engines) > MAX_CACHED_FRAMES:
+        _engines.popitem(last=False)
+
+    return engine
+
+def keyword_mask(df, keywords, columns=('text',)):
+    """
+    Build a mask of rows whose columns contain any of the keywords.
+
+    Args:
+        df (pandas.DataFrame): DataFrame to filter
+        keywords (list): Keywords matched case-insensitively as substrings
+        columns (list): Columns to search
+
+    Returns:
+        pandas.Series: Boolean mask aligned with df
+    """
+    return get_filter_engine(df).keyword_mask(keywords, columns)
+
+def query_mask(df, query, columns=QUERY_COLUMNS):
+    """
+    Build a mask of rows whose columns contain a free-text query.
+
+    Args:
+        df (pandas.DataFrame): DataFrame to filter
+        query (str): Text matched case-insensitively as a substring
+        columns (list): Columns to search
+
+    Returns:
+        pandas.Series: Boolean mask aligned with df
+    """
+    return get_filter_engine(df).query_mask(query, columns)
+
+def _join_lowered(values):
+    """
+    Join and lowercase a column of plain strings in one pass.
+
+    Returns:
+        str: The lowercased blob, or None if the column holds non-strings,
+             contains the row separator, or lowercasing changes the length of
+             a value (so row offsets would no longer line up)
+    """
+    try:
+        blob = ROW_SEPARATOR.join(values)
+    except TypeError:
+        return None
+
+    if blob.count(ROW_SEPARATOR) != max(len(values) - 1, 0):
+        return None
+
+    lowered = blob.lower()
+    return lowered if len(lowered) == len(blob) else None
+
+def _to_text(value):
+    """Convert a column value to searchable text."""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return ' '.join(str(item) for item in value)
+    if value is None or (pd.api.types.is_scalar(value) and pd.isna(value)):
+        return ''
+    return str(value)
@@ -0,0 +1,329 @@
+"""
+This module geocodes free-text user locations with a bundled gazetteer.
+Place names in gazetteer.csv (US cities, seeded from the mock data
+coordinates, and state and country centroids) are matched after normalizing
+case, accents and punctuation, so no external geocoding service is needed.
+A trailing state or country qualifies the city before it: "Portland, Maine"
+resolves to Maine rather than to Portland, Oregon. Resolved locations are
+kept in an in-memory LRU cache and in a size-capped JSON file under the
+cache directory, and frames are geocoded one distinct location at a time.
+"""
+
+import os
+import csv
+import json
+import logging
+import unicodedata
+import re
+import threading
+from itertools import islice
+from functools import lru_cache
+import pandas as pd
+from utils import CACHE_DIR
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+GAZETTEER_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gazetteer.csv")
+GEOCODE_CACHE_FILE = os.path.join(CACHE_DIR, "geocode_cache.json")
+
+# Locations kept in the persistent cache; the oldest are dropped beyond this
+GEOCODE_CACHE_MAX_ENTRIES = int(os.environ.get('GEOCODE_CACHE_MAX_ENTRIES', 50000))
+
+# Share of GEOCODE_CACHE_MAX_ENTRIES new locations may go over the cap before
+# the oldest are dropped in one batch, so misses do not each pay for a trim
+GEOCODE_CACHE_TRIM_MARGIN = 0.1
+
+# Version of the lookup rules, part of the cache signature so results cached
+# under older rules are dropped
+LOOKUP_VERSION = 2
+
+# Trailing location parts that name the country rather than a place
+COUNTRY_SUFFIXES = {"us", "usa", "u s", "u s a", "united states", "united states of america", "america"}
+
+NON_WORD_PATTERN = re.compile(r"[^\w,]+")
+COMMA_PATTERN = re.compile(r"\s*,\s*")
+
+# Resolved locations persisted between runs, loaded on first use
+_persistent_cache = None
+_persistent_dirty = False
+_persistent_lock = threading.Lock()
+
+def normalize_location(location):
+    """
+    Normalize a location string for gazetteer lookup.
+    
+    Args:
+        location (str): Free-text location, e.g. "Houston, Texas"
+        
+    Returns:
+        str: Lowercase ASCII text with punctuation other than commas removed
+    """
+    text = unicodedata.normalize("NFKD", location).encode("ascii", "ignore").decode("ascii")
+    text = NON_WORD_PATTERN.sub(" ", text.lower().replace(".", "").replace("'", ""))
+    return COMMA_PATTERN.sub(",", " ".join(text.split())).strip(",")
+
+@lru_cache(maxsize=None)
+def _read_gazetteer(path):
+    """Read the gazetteer rows once per path."""
+    try:
+        with open(path, newline="", encoding="utf-8") as f:
+            return tuple(csv.DictReader(f))
+    except Exception as e:
+        logger.error(f"Error loading gazetteer {path}: {e}")
+        return ()
+
+def _row_names(row):
+    """Get a gazetteer row's name followed by its aliases."""
+    return [row["name"]] + [alias for alias in (row["aliases"] or "").split(";") if alias]
+
+def _index_key(name):
+    """Normalize a place name into a lookup key."""
+    return normalize_location(name).replace(",", " ")
+
+@lru_cache(maxsize=None)
+def load_gazetteer(path=GAZETTEER_FILE):
+    """
+    Load the gazetteer and index it by normalized place name.
+    
+    City rows are indexed as "city", "city st" and "city state name"; state
+    rows as their name and postal code; country rows as their name and
+    aliases. Earlier rows win when names clash, so cities are listed before
+    states and by size, and countries last.
+    
+    Args:
+        path (str): CSV file with name, state, kind, lat, lon and aliases columns
+        
+    Returns:
+        dict: Normalized place name to (lat, lon)
+    """
+    index = {}
+    rows = _read_gazetteer(path)
+    
+    state_names = {row["state"]: row["name"] for row in rows if row["kind"] == "state"}
+    
+    for row in rows:
+        coords = (float(row["lat"]), float(row["lon"]))
+        names = _row_names(row)
+        
+        if row["kind"] == "state":
+            names.append(row["state"])
+        elif row["kind"] == "city":
+            for name in list(names):
+                names.append(f"{name} {row['state']}")
+                if row["state"] in state_names:
+                    names.append(f"{name} {state_names[row['state']]}")
+        
+        for name in names:
+            index.setdefault(_index_key(name), coords)
+    
+    return index
+
+@lru_cache(maxsize=None)
+def load_regions(path=GAZETTEER_FILE):
+    """
+    Load the states and countries and the cities inside them.
+    
+    Regions are keyed by their code: the postal code of a state, the
+    ISO 3166 alpha-3 code of a country.
+    
+    Args:
+        path (str): CSV file with name, state, kind, lat, lon and aliases columns
+        
+    Returns:
+        tuple: (regions, cities) where regions maps a normalized state or
+               country name, code or alias to (region code, (lat, lon)), and
+               cities maps a normalized city name or alias to a list of
+               (region code, (lat, lon)), largest city first
+    """
+    regions = {}
+    cities = {}
+    
+    for row in _read_gazetteer(path):
+        coords = (float(row["lat"]), float(row["lon"]))
+        names = _row_names(row)
+        
+        if row["kind"] == "city":
+            for name in names:
+                cities.setdefault(_index_key(name), []).append((row["state"], coords))
+            continue
+        
+        # Country codes are not matched on their own; "CAN" is too ambiguous
+        if row["kind"] == "state":
+            names.append(row["state"])
+        for name in names:
+            regions.setdefault(_index_key(name), (row["state"], coords))
+    
+    return regions, cities
+
+def _lookup(location):
+    """
+    Resolve a normalized location against the gazetteer.
+    
+    When the last part names a state or country, only a city in that region
+    is accepted and the region's centroid is the fallback. The bare city is
+    tried only when the location has no recognizable region.
+    """
+    index = load_gazetteer()
+    regions, cities = load_regions()
+    
+    parts = [part for part in location.split(",") if part]
+    while len(parts) > 1 and parts[-1] in COUNTRY_SUFFIXES:
+        parts.pop()
+    if not parts:
+        return None
+    
+    # A single part is a place name on its own ("houston tx", "maine")
+    if len(parts) == 1:
+        return index.get(parts[0])
+    
+    region = regions.get(parts[-1])
+    if region is not None:
+        code, centroid = region
+        for part in parts[:-1]:
+            for city_code, coords in cities.get(part, []):
+                if city_code == code:
+                    return coords
+        return centroid
+    
+    # No region suffix: whole string, then the city, then the last part
+    for candidate in (" ".join(parts), parts[0], parts[-1]):
+        if candidate in index:
+            return index[candidate]
+    
+    return None
+
+def _gazetteer_signature():
+    """Identify the gazetteer version so cached results are dropped when it changes."""
+    try:
+        stat = os.stat(GAZETTEER_FILE)
+        return f"{LOOKUP_VERSION}:{stat.st_size}:{int(stat.st_mtime)}"
+    except OSError:
+        return None
+
+def _get_persistent_cache():
+    """Load the persistent geocode cache on first use; call with _persistent_lock held."""
+    global _persistent_cache
+    
+    if _persistent_cache is None:
+        _persistent_cache = {}
+        if os.path.exists(GEOCODE_CACHE_FILE):
+            try:
+                with open(GEOCODE_CACHE_FILE, encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("gazetteer") == _gazetteer_signature():
+                    _persistent_cache = data.get("locations", {})
+                    _trim_persistent_cache()
+            except Exception as e:
+                logger.error(f"Error loading geocode cache: {e}")
+    
+    return _persistent_cache
+
+def _trim_persistent_cache(margin=0):
+    """
+    Drop the oldest cached locations beyond GEOCODE_CACHE_MAX_ENTRIES.
+    
+    Nothing is dropped until the cache holds more than margin extra
+    locations; then it is cut back to the cap in one batch. Call with
+    _persistent_lock held.
+    """
+    limit = max(GEOCODE_CACHE_MAX_ENTRIES, 0)
+    overflow = len(_persistent_cache) - limit
+    if overflow <= margin:
+        return
+    
+    for location in list(islice(_persistent_cache, overflow)):
+        del _persistent_cache[location]
+
+def save_geocode_cache():
+    """
+    Write newly resolved locations to the persistent cache file.
+    
+    Returns:
+        bool: True if the cache was written (or had nothing new), False on error
+    """
+    global _persistent_dirty
+    
+    with _persistent_lock:
+        if not _persistent_dirty:
+            return True
+        
+        try:
+            # Locations beyond the cap are not written
+            _trim_persistent_cache()
+            
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            tmp_file = GEOCODE_CACHE_FILE + ".tmp"
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump({"gazetteer": _gazetteer_signature(), "locations": _persistent_cache}, f)
+            os.replace(tmp_file, GEOCODE_CACHE_FILE)
+            _persistent_dirty = False
+            return True
+        except Exception as e:
+            logger.error(f"Error saving geocode cache: {e}")
+            return False
+
+@lru_cache(maxsize=50000)
+def geocode(location):
+    """
+    Geocode a free-text location.
+    
+    Args:
+        location (str): Location as entered by the user, e.g. "Miami, FL"
+        
+    Returns:
+        tuple: (lat, lon), or None if the location is not in the gazetteer
+    """
+    global _persistent_dirty
+    
+    if not isinstance(location, str) or not location.strip():
+        return None
+    
+    with _persistent_lock:
+        cache = _get_persistent_cache()
+        if location in cache:
+            coords = cache[location]
+            return tuple(coords) if coords else None
+    
+    coords = _lookup(normalize_location(location))
+    
+    with _persistent_lock:
+        _get_persistent_cache()[location] = list(coords) if coords else None
+        _trim_persistent_cache(max(int(GEOCODE_CACHE_MAX_ENTRIES * GEOCODE_CACHE_TRIM_MARGIN), 1))
+        _persistent_dirty = True
+    
+    return coords
+
+def geocode_series(locations):
+    """
+    Geocode a Series of locations, resolving each distinct value once.
+    
+    Args:
+        locations (pandas.Series): Free-text locations
+        
+    Returns:
+        pandas.DataFrame: 'lat' and 'lon' columns aligned with the input;
+                          unresolved locations are NaN
+    """
+    codes, uniques = pd.factorize(locations)
+    
+    coords = [geocode(location) or (float("nan"), float("nan")) for location in uniques]
+    table = pd.DataFrame(coords + [(float("nan"), float("nan"))], columns=["lat", "lon"], dtype=float)
+    
+    # Missing values have code -1, which picks the trailing NaN row
+    result = table.iloc[codes].set_index(locations.index)
+    
+    save_geocode_cache()
+    return result
+
+def clear_geocode_cache():
+    """Clear the in-memory and persistent geocode caches."""
+    global _persistent_cache, _persistent_dirty
+    
+    geocode.cache_clear()
+    with _persistent_lock:
+        _persistent_cache = {}
+        _persistent_dirty = False
+        
+        if os.path.exists(GEOCODE_CACHE_FILE):
+            os.remove(GEOCODE_CACHE_FILE)
@@ -0,0 +1,99 @@
+"""
+This module measures how long the app's modules take to import.
+Each module is imported in a fresh interpreter and compared against a time
+budget; NLTK and TextBlob must not be imported eagerly at all. Run it with
+`python import_budget.py` - the exit status is 1 when a budget is exceeded.
+"""
+
+import sys
+import json
+import argparse
+import subprocess
+
+# Import time budgets in milliseconds (pandas alone accounts for most of it)
+IMPORT_BUDGETS_MS = {
+    "text_normalizer": 600,
+    "sentiment_analyzer": 700,
+    "trend_analyzer": 800,
+    "data_processor": 800,
+    "mock_data_generator": 800
+}
+
+# Heavy packages that should only load on first use
+LAZY_MODULES = ["nltk", "textblob"]
+
+MEASURE_SCRIPT = """
+import sys, time, json
+start = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - start) * 1000
+loaded = [name for name in {lazy!r} if name in sys.modules]
+print(json.dumps({{"ms": elapsed, "eager": loaded}}))
+"""
+
+def measure_import_time(module, runs=3):
+    """
+    Measure the import time of a module in fresh interpreters.
+
+    Args:
+        module (str): Module name to import
+        runs (int): Number of fresh interpreters to try; the fastest run counts
+
+    Returns:
+        dict: 'ms' with the best import time and 'eager' with the lazy
+              packages that were imported anyway
+    """
+    best = None
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", MEASURE_SCRIPT.format(module=module, lazy=LAZY_MODULES)],
+            capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        if best is None or result["ms"] < best["ms"]:
+            best = result
+
+    return best
+
+def check_import_budgets(budgets=None, runs=3):
+    """
+    Check modules against their import time budgets.
+
+    Args:
+        budgets (dict, optional): Module name to budget in ms; defaults to IMPORT_BUDGETS_MS
+        runs (int): Number of measurements per module
+
+    Returns:
+        list: One dict per module with 'module', 'ms', 'budget_ms', 'eager' and 'ok'
+    """
+    budgets = budgets or IMPORT_BUDGETS_MS
+    results = []
+
+    for module, budget in budgets.items():
+        measured = measure_import_time(module, runs)
+        results.append({
+            "module": module,
+            "ms": measured["ms"],
+            "budget_ms": budget,
+            "eager": measured["eager"],
+            "ok": measured["ms"] <= budget and not measured["eager"]
+        })
+
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Check module import times against their budgets")
+    parser.add_argument("--runs", type=int, default=3, help="measurements per module")
+    args = parser.parse_args()
+
+    results = check_import_budgets(runs=args.runs)
+
+    for result in results:
+        status = "ok" if result["ok"] else "OVER"
+        eager = f"  eager: {', '.join(result['eager'])}" if result["eager"] else ""
+        print(f"{result['module']:<22} {result['ms']:>7.0f} ms / {result['budget_ms']} ms  {status}{eager}")
+
+    return 0 if all(result["ok"] for result in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,381 @@
+"""
+This module saves processed tweets to the database in the background.
+Producers put tweet frames into a bounded in-process queue and return
+immediately; a writer thread concatenates queued frames and saves them with
+database.save_tweets once enough rows are pending or the oldest pending frame
+has waited long enough. The writer also runs the retention delete on a timer,
+so neither the dashboard's refresh nor its reruns wait on disk.
+
+When the queue is full, put blocks for a bounded time (or fails at once with
+block=False) instead of buffering without limit. A failed write is retried a
+bounded number of times with backoff before the batch is dropped and counted.
+Everything queued is written before the interpreter exits.
+"""
+
+import os
+import time
+import queue
+import atexit
+import logging
+import threading
+from collections import deque
+from functools import partial
+import numpy as np
+import pandas as pd
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+# Frames the queue holds before put blocks
+INGEST_QUEUE_SIZE = int(os.environ.get('INGEST_QUEUE_SIZE', 100))
+
+# Pending rows that trigger a write
+INGEST_BATCH_SIZE = int(os.environ.get('INGEST_BATCH_SIZE', 500))
+
+# Seconds a queued frame waits at most before it is written
+INGEST_FLUSH_INTERVAL = float(os.environ.get('INGEST_FLUSH_INTERVAL', 2.0))
+
+# Seconds put blocks on a full queue before giving up
+INGEST_PUT_TIMEOUT = float(os.environ.get('INGEST_PUT_TIMEOUT', 5.0))
+
+# Retries of a failed write before its batch is dropped
+INGEST_MAX_RETRIES = int(os.environ.get('INGEST_MAX_RETRIES', 3))
+
+# Seconds before the first retry of a failed write; doubled for each retry
+INGEST_RETRY_DELAY = float(os.environ.get('INGEST_RETRY_DELAY', 1.0))
+
+# Seconds between retention runs of the writer
+INGEST_RETENTION_INTERVAL = float(os.environ.get('INGEST_RETENTION_INTERVAL', 300))
+
+# Seconds the exit handler waits for the queue to be written
+INGEST_SHUTDOWN_TIMEOUT = float(os.environ.get('INGEST_SHUTDOWN_TIMEOUT', 30))
+
+_queue = None
+_queue_lock = threading.Lock()
+
+class _Request:
+    """Flush or stop request passed through the queue behind the frames queued before it."""
+    
+    def __init__(self, stop=False):
+        self.stop = stop
+        self.done = threading.Event()
+        self.written = True  # False if a batch was dropped since the previous request
+
+class WriteBehindQueue:
+    """
+    Bounded queue of tweet frames written to the database by a background thread.
+    
+    Frames are written in queue order; a write covers every frame pending at
+    that point, concatenated into one save call.
+    """
+    
+    def __init__(self, write_fn=None, retention_fn=None, retention_days=None, max_frames=None,
+                 batch_size=None, flush_interval=None, retention_interval=None, max_retries=None, retry_delay=None):
+        """
+        Initialize the queue and start the writer thread.
+        
+        Args:
+            write_fn (callable, optional): Saves a DataFrame and returns the
+                                           number of rows saved, raising on
+                                           failure; defaults to
+                                           database.save_tweets with raise_errors
+            retention_fn (callable, optional): Deletes tweets older than a number
+                                               of days; defaults to
+                                               database.clear_old_tweets
+            retention_days (int, optional): Days of tweets to keep; None disables
+                                            retention in the writer
+            max_frames (int, optional): Queue capacity in frames
+            batch_size (int, optional): Pending rows that trigger a write
+            flush_interval (float, optional): Seconds a frame waits at most
+            retention_interval (float, optional): Seconds between retention runs
+            max_retries (int, optional): Retries of a failed write before its batch is dropped
+            retry_delay (float, optional): Seconds before the first retry, doubled for each retry
+        """
+        if write_fn is None or retention_fn is None:
+            from database import save_tweets, clear_old_tweets
+            write_fn = write_fn or partial(save_tweets, raise_errors=True)
+            retention_fn = retention_fn or clear_old_tweets
+        
+        self.write_fn = write_fn
+        self.retention_fn = retention_fn
+        self.retention_days = retention_days
+        self.batch_size = max(1, batch_size or INGEST_BATCH_SIZE)
+        self.flush_interval = flush_interval if flush_interval is not None else INGEST_FLUSH_INTERVAL
+        self.retention_interval = retention_interval if retention_interval is not None else INGEST_RETENTION_INTERVAL
+        self.max_retries = max(0, max_retries if max_retries is not None else INGEST_MAX_RETRIES)
+        self.retry_delay = retry_delay if retry_delay is not None else INGEST_RETRY_DELAY
+        
+        self._queue = queue.Queue(maxsize=max_frames or INGEST_QUEUE_SIZE)
+        self._lock = threading.Lock()
+        self._put_lock = threading.Lock()  # orders puts against close; separate so a full queue never stalls the writer
+        self._closed = False
+        self._latencies = deque(maxlen=1000)
+        self._metrics = {
+            'queued_rows': 0,
+            'pending_rows': 0,
+            'enqueued_frames': 0,
+            'rejected_frames': 0,
+            'flushes': 0,
+            'failed_flushes': 0,
+            'saved_rows': 0,
+            'dropped_rows': 0,
+            'retention_runs': 0,
+            'deleted_rows': 0,
+            'last_flush_at': None
+        }
+        
+        self._thread = threading.Thread(target=self._run, name='tweet-writer', daemon=True)
+        self._thread.start()
+    
+    def put(self, df, block=True, timeout=None):
+        """
+        Queue a frame of tweets for saving.
+        
+        Args:
+            df (pandas.DataFrame): Processed tweets
+            block (bool): Wait for room when the queue is full
+            timeout (float, optional): Seconds to wait; defaults to INGEST_PUT_TIMEOUT
+        
+        Returns:
+            bool: True if the frame was queued, False if the queue stayed full,
+                  has been closed or its writer has stopped
+        """
+        if df is None or df.empty:
+            return True
+        
+        with self._put_lock:
+            if self._closed or not self._thread.is_alive():
+                logger.warning(f"Tweet writer is {'closed' if self._closed else 'not running'}; dropped {len(df)} tweets")
+                queued = False
+            else:
+                try:
+                    self._queue.put(df, block=block, timeout=timeout if timeout is not None else INGEST_PUT_TIMEOUT)
+                    queued = True
+                except queue.Full:
+                    logger.warning(f"Tweet writer queue is full; dropped {len(df)} tweets")
+                    queued = False
+        
+        if not queued:
+            with self._lock:
+                self._metrics['rejected_frames'] += 1
+            return False
+        
+        with self._lock:
+            self._metrics['enqueued_frames'] += 1
+            self._metrics['queued_rows'] += len(df)
+        return True
+    
+    def flush(self, timeout=None):
+        """
+        Write every frame queued so far, without waiting for the batch size or interval.
+        
+        Args:
+            timeout (float, optional): Seconds to wait for the write
+        
+        Returns:
+            bool: True if the frames were written within the timeout, False
+                  on timeout or if a batch was dropped after failed writes
+        """
+        if not self._thread.is_alive():
+            return self._queue.empty()
+        
+        request = _Request()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            self._queue.put(request, timeout=timeout)
+        except queue.Full:
+            logger.warning("Tweet writer queue is full; flush timed out")
+            return False
+        
+        remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+        return request.done.wait(remaining) and request.written
+    
+    def close(self, timeout=None):
+        """
+        Write the remaining frames and stop the writer thread.
+        
+        Args:
+            timeout (float, optional): Seconds to wait for the writer
+        
+        Returns:
+            bool: True if everything queued was written
+        """
+        request = _Request(stop=True)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        
+        with self._put_lock:
+            if self._closed:
+                return not self._thread.is_alive()
+            self._closed = True
+            
+            if not self._thread.is_alive():
+                return self._queue.empty()
+            
+            try:
+                self._queue.put(request, timeout=timeout)
+            except queue.Full:
+                logger.error(f"Tweet writer queue stayed full; {self.metrics()['queued_rows']} queued tweets were not saved")
+                return False
+        
+        finished = request.done.wait(None if deadline is None else max(deadline - time.monotonic(), 0))
+        self._thread.join(None if deadline is None else max(deadline - time.monotonic(), 0))
+        
+        if not finished:
+            logger.error(f"Tweet writer did not finish; {self.metrics()['queued_rows']} queued tweets were not saved")
+        return finished and request.written
+    
+    def metrics(self):
+        """
+        Get queue depth and flush statistics.
+        
+        Returns:
+            dict: 'depth' (frames waiting in the queue), 'queued_rows' and
+                  'pending_rows' (rows taken by the writer but not yet
+                  written), counts of frames, flushes and rows,
+                  'failed_flushes' (write attempts that raised),
+                  'dropped_rows' (rows given up after the last retry), and the
+                  average, p95 and maximum flush latency in milliseconds
+        """
+        with self._lock:
+            stats = dict(self._metrics)
+            latencies = list(self._latencies)
+        
+        stats['depth'] = self._queue.qsize()
+        stats['flush_avg_ms'] = float(np.mean(latencies)) * 1000 if latencies else 0.0
+        stats['flush_p95_ms'] = float(np.percentile(latencies, 95)) * 1000 if latencies else 0.0
+        stats['flush_max_ms'] = float(np.max(latencies)) * 1000 if latencies else 0.0
+        return stats
+    
+    def _run(self):
+        """Writer loop: collect frames and write them by size, age or request."""
+        pending = []
+        deadline = None
+        dropped = False
+        next_retention = time.monotonic() + self.retention_interval
+        
+        while True:
+            # Wake for the oldest pending frame's deadline or the next retention run
+            wake = min(deadline or float('inf'), next_retention if self.retention_days else float('inf'))
+            timeout = None if wake == float('inf') else max(wake - time.monotonic(), 0)
+            
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            
+            if isinstance(item, pd.DataFrame):
+                pending.append(item)
+                with self._lock:
+                    self._metrics['queued_rows'] -= len(item)
+                    self._metrics['pending_rows'] += len(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+                
+                pending_rows = sum(len(frame) for frame in pending)
+                if pending_rows < self.batch_size and time.monotonic() < deadline:
+                    continue
+            
+            if pending and (item is not None or time.monotonic() >= deadline):
+                dropped = not self._write(pending) or dropped
+                pending = []
+                deadline = None
+            
+            if self.retention_days and time.monotonic() >= next_retention:
+                self._run_retention()
+                next_retention = time.monotonic() + self.retention_interval
+            
+            if isinstance(item, _Request):
+                item.written = not dropped
+                dropped = False
+                item.done.set()
+                if item.stop:
+                    return
+    
+    def _write(self, frames):
+        """
+        Save pending frames as one batch and record the flush.
+        
+        A failed write is retried after a delay that doubles with each retry;
+        after the last retry the batch is dropped.
+        
+        Returns:
+            bool: True if the batch was written, False if it was dropped
+        """
+        attempts = self.max_retries + 1
+        
+        try:
+            batch = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        except Exception as e:
+            # Frames that cannot be combined fail the same way on every retry
+            rows = sum(len(frame) for frame in frames)
+            logger.error(f"Error combining {rows} queued tweets; dropped them: {e}")
+            with self._lock:
+                self._metrics['failed_flushes'] += 1
+                self._metrics['pending_rows'] -= rows
+                self._metrics['dropped_rows'] += rows
+            return False
+        
+        for attempt in range(attempts):
+            if attempt:
+                time.sleep(self.retry_delay * 2 ** (attempt - 1))
+            
+            start = time.perf_counter()
+            try:
+                saved = self.write_fn(batch)
+            except Exception as e:
+                logger.error(f"Error writing {len(batch)} queued tweets (attempt {attempt + 1} of {attempts}): {e}")
+                with self._lock:
+                    self._metrics['failed_flushes'] += 1
+                continue
+            
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._latencies.append(elapsed)
+                self._metrics['pending_rows'] -= len(batch)
+                self._metrics['flushes'] += 1
+                self._metrics['saved_rows'] += saved or 0
+                self._metrics['last_flush_at'] = pd.Timestamp.now()
+            
+            logger.info(f"Flushed {len(batch)} queued tweets ({saved} new) in {elapsed * 1000:.1f} ms")
+            return True
+        
+        with self._lock:
+            self._metrics['pending_rows'] -= len(batch)
+            self._metrics['dropped_rows'] += len(batch)
+        
+        logger.error(f"Dropped {len(batch)} queued tweets after {attempts} failed writes")
+        return False
+    
+    def _run_retention(self):
+        """Delete tweets past the retention period."""
+        try:
+            deleted = self.retention_fn(self.retention_days)
+        except Exception as e:
+            logger.error(f"Error running retention from the tweet writer: {e}")
+            return
+        
+        with self._lock:
+            self._metrics['retention_runs'] += 1
+            self._metrics['deleted_rows'] += deleted or 0
+
+def get_ingest_queue(retention_days=30):
+    """
+    Get the process-wide write-behind queue, starting it on first use.
+    
+    The queue is written out when the interpreter exits.
+    
+    Args:
+        retention_days (int, optional): Days of tweets the writer keeps when
+                                        it is first started; None disables retention
+    
+    Returns:
+        WriteBehindQueue: The shared queue
+    """
+    global _queue
+    
+    with _queue_lock:
+        if _queue is None:
+            _queue = WriteBehindQueue(retention_days=retention_days)
+            atexit.register(_queue.close, INGEST_SHUTDOWN_TIMEOUT)
+    
+    return _queue
@@ -8,7 +8,9 @@ import random
 import uuid
 from datetime import datetime, timedelta
 import numpy as np
-from sentiment_analyzer import analyze_sentiment, analyze_disaster_impact
+from sentiment_analyzer import (
+    analyze_sentiment, analyze_sentiment_batch, analyze_disaster_impact, analyze_disaster_impact_batch
+)
 
 # Sample usernames
 USERNAMES = [
@@ -150,6 +152,18 @@ STATUS_UPDATES = [
 
 def generate_mock_tweet(disaster_type, time_range=None):
     """Generate a mock tweet based on disaster type and time range."""
+    tweet = _build_mock_tweet(disaster_type, time_range)
+    
+    # Generate sentiment
+    tweet["sentiment"], tweet["sentiment_score"] = analyze_sentiment(tweet["clean_text"])
+    
+    # Generate impact level
+    tweet["disaster_impact"] = analyze_disaster_impact(tweet["clean_text"])
+    
+    return tweet
+
+def _build_mock_tweet(disaster_type, time_range=None):
+    """Generate a mock tweet without running sentiment analysis on it."""
     # Set time range (default to last 7 days)
     if time_range is None:
         end_time = datetime.now()
@@ -215,12 +229,6 @@ def generate_mock_tweet(disaster_type, time_range=None):
     # Clean text for analysis
     clean_text = tweet_text.replace("#", " ")
     
-    # Generate sentiment
-    sentiment, sentiment_score = analyze_sentiment(clean_text)
-    
-    # Generate impact level
-    impact_level = analyze_disaster_impact(clean_text)
-    
     # Generate user info
     username = random.choice(USERNAMES)
     display_name = username
@@ -253,9 +261,9 @@ def generate_mock_tweet(disaster_type, time_range=None):
         "reply_count": reply_count,
         "hashtags": hashtags,
         "mentions": mentions,
-        "sentiment": sentiment,
-        "sentiment_score": sentiment_score,
-        "disaster_impact": impact_level,
+        "sentiment": None,  # filled in by the caller
+        "sentiment_score": None,
+        "disaster_impact": None,  # filled in by the caller
         "disaster_type": disaster_type if disaster_type != "All" else random.choice(list(TWEET_TEMPLATES.keys())),
         "lat": lat,
         "lon": lon
@@ -263,15 +271,21 @@ def generate_mock_tweet(disaster_type, time_range=None):
     
     return tweet
 
-def generate_mock_tweets(count=100, disaster_type="All", time_range=None):
-    """Generate a list of mock tweets for testing."""
+def generate_mock_tweets(count=100, disaster_type="All", time_range=None, sentiment_method="combined"):
+    """Generate a list of mock tweets for testing, scored with the given sentiment scorer."""
     tweets = []
     for _ in range(count):
-        tweet = generate_mock_tweet(disaster_type, time_range)
+        tweet = _build_mock_tweet(disaster_type, time_range)
         tweets.append(tweet)
     
     # Convert to DataFrame
     df = pd.DataFrame(tweets)
+    
+    # Generate sentiment and impact level for all tweets in one batch
+    if not df.empty:
+        df["sentiment"], df["sentiment_score"] = analyze_sentiment_batch(df["clean_text"], method=sentiment_method)
+        df["disaster_impact"] = analyze_disaster_impact_batch(df["clean_text"])
+    
     return df
 
 def get_mock_tweet_trends(df):
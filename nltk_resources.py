@@ -0,0 +1,87 @@
+"""
+This module resolves NLTK resources lazily and without network access.
+Resources are looked up in the local NLTK data path the first time they are
+needed and loaded once per process. Set NLTK_AUTO_DOWNLOAD=1 to allow the
+downloader as a fallback on hosts that have outbound network.
+"""
+
+import os
+import logging
+from functools import lru_cache
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+# Locations of the resources used by the app inside the NLTK data path
+RESOURCE_PATHS = {
+    'vader_lexicon': 'sentiment/vader_lexicon.zip',
+    'stopwords': 'corpora/stopwords'
+}
+
+@lru_cache(maxsize=None)
+def has_resource(name):
+    """
+    Check whether an NLTK resource is installed locally.
+
+    Args:
+        name (str): Resource name, e.g. 'vader_lexicon' or 'stopwords'
+
+    Returns:
+        bool: True if the resource can be loaded
+    """
+    import nltk
+
+    try:
+        nltk.data.find(RESOURCE_PATHS.get(name, name))
+        return True
+    except LookupError:
+        pass
+
+    if os.environ.get('NLTK_AUTO_DOWNLOAD') == '1':
+        try:
+            if nltk.download(name, quiet=True):
+                return True
+        except Exception as e:
+            logger.warning(f"Failed to download NLTK resource {name}: {e}")
+
+    logger.warning(f"NLTK resource '{name}' not found in {nltk.data.path}")
+    return False
+
+@lru_cache(maxsize=None)
+def get_vader_analyzer():
+    """
+    Get the process-wide VADER analyzer, creating it on first use.
+
+    Returns:
+        SentimentIntensityAnalyzer: The analyzer, or None if the lexicon is missing
+    """
+    if not has_resource('vader_lexicon'):
+        return None
+
+    try:
+        from nltk.sentiment.vader import SentimentIntensityAnalyzer
+        return SentimentIntensityAnalyzer()
+    except Exception as e:
+        logger.error(f"Failed to initialize SentimentIntensityAnalyzer: {e}")
+        return None
+
+@lru_cache(maxsize=None)
+def get_stopwords(language='english'):
+    """
+    Get the NLTK stopword list for a language.
+
+    Args:
+        language (str): Stopword list to load
+
+    Returns:
+        frozenset: Stopwords, or an empty set if the corpus is missing
+    """
+    if not has_resource('stopwords'):
+        return frozenset()
+
+    try:
+        from nltk.corpus import stopwords
+        return frozenset(stopwords.words(language))
+    except Exception as e:
+        logger.warning(f"Failed to load NLTK stopwords: {e}")
+        return frozenset()
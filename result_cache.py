@@ -0,0 +1,232 @@
+"""
+This module provides a bounded, content-addressed cache for text analysis results.
+Entries are keyed by a hash of the analyzed text plus the analysis method, so
+retweets and templated alerts are only scored once. The key also includes
+CACHE_VERSION, so results persisted by an older scorer are never returned.
+"""
+
+import os
+import json
+import hashlib
+import sqlite3
+import threading
+import logging
+from collections import OrderedDict
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+# Number of pending disk writes before they are committed
+DISK_COMMIT_INTERVAL = 100
+
+# Version of the cached results; bump it whenever a scorer, lexicon or keyword
+# list changes what a method returns, so old entries in the on-disk tier miss
+CACHE_VERSION = 1
+
+def make_key(text, method):
+    """
+    Build a cache key from a text and the method used to analyze it.
+
+    Args:
+        text (str): Text that was analyzed (already cleaned/normalized)
+        method (str): Name of the analysis method
+
+    Returns:
+        str: Hex digest identifying the (version, method, text) triple
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"v{CACHE_VERSION}".encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(method.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(text.encode('utf-8'))
+    return digest.hexdigest()
+
+def fingerprint(value):
+    """
+    Hash the settings a method depends on, e.g. its keyword list.
+
+    Including the fingerprint in the method name passed to make_key makes
+    cached results miss as soon as the settings change.
+
+    Args:
+        value: JSON-serializable settings; order is significant
+
+    Returns:
+        str: Short hex digest of the settings
+    """
+    return hashlib.blake2b(json.dumps(value).encode('utf-8'), digest_size=8).hexdigest()
+
+class ResultCache:
+    def __init__(self, maxsize=100000, path=None):
+        """
+        Initialize an LRU result cache with an optional on-disk tier.
+
+        Args:
+            maxsize (int): Maximum number of entries kept in memory
+            path (str, optional): SQLite file for the persistent tier; entries
+                                  evicted from memory stay available there
+        """
+        self.maxsize = maxsize
+        self.path = path
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pending_writes = 0
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """
+        Look up a cached value.
+
+        Args:
+            key (str): Key from make_key()
+
+        Returns:
+            The cached value, or None if the key is not cached
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+            value = self._disk_get(key)
+            if value is not None:
+                self.disk_hits += 1
+                self._store(key, value)
+                return value
+
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        """
+        Store a value in the cache.
+
+        Args:
+            key (str): Key from make_key()
+            value: JSON-serializable result to cache
+        """
+        with self._lock:
+            self._store(key, value)
+            self._disk_put([(key, value)])
+
+    def put_many(self, items):
+        """
+        Store several values at once, writing them to disk in one transaction.
+
+        Args:
+            items (list): List of (key, value) pairs
+        """
+        with self._lock:
+            for key, value in items:
+                self._store(key, value)
+            self._disk_put(items)
+
+    def stats(self):
+        """
+        Get cache statistics.
+
+        Returns:
+            dict: Hit, miss and eviction counts plus current size
+        """
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0
+            }
+
+    def clear(self):
+        """Remove all in-memory entries and reset statistics."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.disk_hits = self.misses = self.evictions = 0
+
+    def close(self):
+        """Commit pending disk writes and close the persistent tier."""
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._conn.commit()
+                    self._conn.close()
+                except Exception as e:
+                    logger.error(f"Error closing result cache: {e}")
+                self._conn = None
+                self._pending_writes = 0
+
+    def _store(self, key, value):
+        """Insert into the in-memory LRU, evicting the oldest entries if full."""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _connect(self):
+        """Open the on-disk tier on first use."""
+        if self._conn is None and self.path:
+            try:
+                directory = os.path.dirname(self.path)
+                if directory and not os.path.exists(directory):
+                    os.makedirs(directory)
+
+                self._conn = sqlite3.connect(self.path, check_same_thread=False)
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+                )
+                self._conn.commit()
+            except Exception as e:
+                logger.error(f"Error opening result cache at {self.path}: {e}")
+                self.path = None
+                self._conn = None
+
+        return self._conn
+
+    def _disk_get(self, key):
+        """Read a value from the on-disk tier."""
+        conn = self._connect()
+        if conn is None:
+            return None
+
+        try:
+            row = conn.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row:
+                value = json.loads(row[0])
+                # JSON turns tuples into lists
+                return tuple(value) if isinstance(value, list) else value
+        except Exception as e:
+            logger.error(f"Error reading result cache: {e}")
+
+        return None
+
+    def _disk_put(self, items):
+        """Write values to the on-disk tier, committing in batches."""
+        conn = self._connect()
+        if conn is None or not items:
+            return
+
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)",
+                [(key, json.dumps(value)) for key, value in items]
+            )
+            self._pending_writes += len(items)
+
+            if self._pending_writes >= DISK_COMMIT_INTERVAL or len(items) > 1:
+                conn.commit()
+                self._pending_writes = 0
+        except Exception as e:
+            logger.error(f"Error writing result cache: {e}")
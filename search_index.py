@@ -0,0 +1,243 @@
+"""
+This module provides an in-memory inverted index for searching session tweets.
+Text tokens, hashtags and usernames map to posting lists of row ids. Tweets
+are appended as they arrive and the oldest can be dropped from the front, so
+the index stays aligned with a session frame that grows at the end and is
+trimmed at the start.
+
+Query syntax:
+    flood rescue        tweets containing both words
+    flood OR fire       tweets containing either word
+    evac*               words starting with "evac"
+    #hurricane          tweets with the hashtag
+    @redcross           tweets posted by the user
+"""
+
+import logging
+from bisect import bisect_left
+import numpy as np
+from text_normalizer import tokenize
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+# Query prefixes selecting a field other than the text tokens
+FIELD_PREFIXES = {'#': 'hashtags', '@': 'username'}
+
+EMPTY_IDS = np.empty(0, dtype=np.int64)
+
+class InvertedIndex:
+    def __init__(self):
+        """Initialize an empty index."""
+        self._postings = {'text': {}, 'hashtags': {}, 'username': {}}
+        self._arrays = {}
+        self._vocabulary = {}
+        self._next_id = 0
+        self._offset = 0
+        self._dropped_since_compaction = 0
+
+    @classmethod
+    def from_frame(cls, df):
+        """
+        Build an index over a DataFrame.
+
+        Args:
+            df (pandas.DataFrame): Tweets to index
+
+        Returns:
+            InvertedIndex: Index whose positions match df's rows
+        """
+        index = cls()
+        index.add(df)
+        return index
+
+    def __len__(self):
+        """Number of rows currently indexed."""
+        return self._next_id - self._offset
+
+    def add(self, df):
+        """
+        Append tweets to the index.
+
+        Rows get consecutive positions after the rows already indexed, so the
+        frame searched must have the same rows appended in the same order.
+
+        Args:
+            df (pandas.DataFrame): Tweets with 'text' and optionally
+                                   'username' and 'hashtags' columns
+
+        Returns:
+            int: Number of rows added
+        """
+        if df is None or df.empty:
+            return 0
+
+        count = len(df)
+        doc_ids = range(self._next_id, self._next_id + count)
+        texts = df['text'] if 'text' in df.columns else [''] * count
+        hashtags = df['hashtags'] if 'hashtags' in df.columns else [[]] * count
+        usernames = df['username'] if 'username' in df.columns else [''] * count
+
+        for doc_id, text, tags, username in zip(doc_ids, texts, hashtags, usernames):
+            tokens = set(tokenize(text)) if isinstance(text, str) else set()
+            tags = {tag.lower() for tag in tags if isinstance(tag, str)} if isinstance(tags, (list, tuple)) else set()
+            users = {username.lower()} if isinstance(username, str) and username else set()
+
+            # Hashtags and usernames are also searchable as plain words
+            for field, values in (('text', tokens | tags), ('hashtags', tags), ('username', users)):
+                postings = self._postings[field]
+                for value in values:
+                    if value in postings:
+                        postings[value].append(doc_id)
+                    else:
+                        postings[value] = [doc_id]
+                        self._vocabulary.pop(field, None)
+
+        self._next_id += count
+        return count
+
+    def drop_first(self, count):
+        """
+        Drop the oldest rows from the index.
+
+        Args:
+            count (int): Number of rows removed from the front of the frame
+        """
+        count = min(count, len(self))
+        if count <= 0:
+            return
+
+        self._offset += count
+        self._dropped_since_compaction += count
+
+        # Dropped ids are skipped at query time; prune them once they outnumber the live rows
+        if self._dropped_since_compaction > len(self):
+            self._compact()
+
+    def clear(self):
+        """Remove all rows."""
+        self._postings = {field: {} for field in self._postings}
+        self._arrays = {}
+        self._vocabulary = {}
+        self._next_id = 0
+        self._offset = 0
+        self._dropped_since_compaction = 0
+
+    def search(self, query):
+        """
+        Find the rows matching a query.
+
+        Args:
+            query (str): Space-separated terms (all must match), optionally
+                         split into alternatives with OR; terms may be
+                         #hashtags, @usernames or end in * for a prefix match
+
+        Returns:
+            numpy.ndarray: Sorted row positions for slicing the frame with iloc
+        """
+        matches = []
+        for group in parse_query(query):
+            group_matches = None
+
+            # Intersect the shortest posting arrays first
+            for ids in sorted((self._match_term(field, term, prefix) for field, term, prefix in group), key=len):
+                group_matches = ids if group_matches is None else np.intersect1d(group_matches, ids, assume_unique=True)
+                if not len(group_matches):
+                    break
+
+            matches.append(group_matches)
+
+        positions = _union(matches)
+        return positions[np.searchsorted(positions, self._offset):] - self._offset
+
+    def _match_term(self, field, term, prefix):
+        """Get the sorted ids of rows matching one term."""
+        if not prefix:
+            return self._get_array(field, term)
+
+        vocabulary = self._get_vocabulary(field)
+        arrays = []
+        for i in range(bisect_left(vocabulary, term), len(vocabulary)):
+            if not vocabulary[i].startswith(term):
+                break
+            arrays.append(self._get_array(field, vocabulary[i]))
+
+        return _union(arrays)
+
+    def _get_array(self, field, token):
+        """Get a posting list as an array, cached until the list changes."""
+        ids = self._postings[field].get(token)
+        if not ids:
+            return EMPTY_IDS
+
+        key = (field, token)
+        array = self._arrays.get(key)
+        if array is None or len(array) != len(ids):
+            array = np.array(ids, dtype=np.int64)
+            self._arrays[key] = array
+
+        return array
+
+    def _get_vocabulary(self, field):
+        """Get the sorted tokens of a field, rebuilt after new tokens were added."""
+        if field not in self._vocabulary:
+            self._vocabulary[field] = sorted(self._postings[field])
+        return self._vocabulary[field]
+
+    def _compact(self):
+        """Remove dropped ids from the posting lists."""
+        for field, postings in self._postings.items():
+            for token in list(postings):
+                ids = postings[token]
+                start = bisect_left(ids, self._offset)
+                if start == len(ids):
+                    del postings[token]
+                elif start:
+                    del ids[:start]
+            self._vocabulary.pop(field, None)
+
+        self._arrays = {}
+        self._dropped_since_compaction = 0
+
+def parse_query(query):
+    """
+    Parse a search query into OR groups of terms.
+
+    Args:
+        query (str): Query in the syntax described in the module docstring
+
+    Returns:
+        list: One list per OR group of (field, token, prefix) tuples, where
+              field is 'text', 'hashtags' or 'username' and prefix is True
+              for a trailing * match
+    """
+    groups = [[]]
+
+    for word in query.split():
+        if word == 'OR':
+            groups.append([])
+            continue
+
+        field = FIELD_PREFIXES.get(word[0], 'text')
+        if field != 'text':
+            word = word[1:]
+
+        prefix = word.endswith('*')
+        tokens = tokenize(word.rstrip('*'))
+        if field != 'text' and tokens:
+            # Hashtags and usernames are single tokens
+            tokens = [''.join(tokens)]
+
+        for i, token in enumerate(tokens):
+            groups[-1].append((field, token, prefix and i == len(tokens) - 1))
+
+    return [group for group in groups if group]
+
+def _union(arrays):
+    """Merge sorted id arrays into one sorted array without duplicates."""
+    arrays = [array for array in arrays if array is not None and len(array)]
+    if not arrays:
+        return EMPTY_IDS
+    if len(arrays) == 1:
+        return arrays[0]
+    return np.unique(np.concatenate(arrays))
@@ -1,26 +1,43 @@
-import nltk
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
-from textblob import TextBlob
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from nltk_resources import get_vader_analyzer
+from vader_array import get_compiled_lexicon
+from result_cache import ResultCache, make_key, fingerprint
+from disaster_keywords import get_impact_keywords
+from text_normalizer import normalize_text, strip_special_chars
+import numpy as np
+import atexit
+import os
 import re
 import logging
 
 # Initialize logger
 logger = logging.getLogger(__name__)
 
-# Try to download NLTK resources - only needed first time
-try:
-    nltk.download('vader_lexicon', quiet=True)
-    nltk.download('punkt', quiet=True)
-    nltk.download('stopwords', quiet=True)
-except Exception as e:
-    logger.warning(f"Failed to download NLTK resources: {e}")
-
-# Initialize VADER sentiment analyzer
-try:
-    sid = SentimentIntensityAnalyzer()
-except Exception as e:
-    logger.error(f"Failed to initialize SentimentIntensityAnalyzer: {e}")
-    sid = None
+# Default number of distinct texts sent to a worker process at a time
+DEFAULT_CHUNK_SIZE = 2000
+
+# VADER compound scores inside this band are ambiguous enough for the cascade
+# method to also consult TextBlob; outside it VADER's answer is used as is
+CASCADE_BAND = (-0.3, 0.3)
+
+# How often the cascade method needed its TextBlob fallback
+_cascade_stats = {'calls': 0, 'fallbacks': 0}
+
+# Registered sentiment scorers: method name -> function scoring a list of cleaned texts
+SCORERS = {}
+
+# Worker pool for parallel batch scoring, created on first use
+_process_pool = None
+_process_pool_workers = 0
+
+# Memo cache for sentiment and impact results, keyed by cleaned text and method.
+# Set SENTIMENT_CACHE_PATH to keep results across restarts.
+result_cache = ResultCache(
+    maxsize=int(os.environ.get('SENTIMENT_CACHE_SIZE', 100000)),
+    path=os.environ.get('SENTIMENT_CACHE_PATH')
+)
+atexit.register(result_cache.close)
 
 def clean_tweet(tweet_text):
     """
@@ -32,26 +49,11 @@ def clean_tweet(tweet_text):
     Returns:
         str: Cleaned tweet text
     """
-    # Convert to lowercase
-    text = tweet_text.lower()
-    
-    # Remove URLs
-    text = re.sub(r'https?://\S+|www\.\S+', '', text)
-    
-    # Remove mentions and hashtags
-    text = re.sub(r'@\w+', '', text)
-    text = re.sub(r'#\w+', '', text)
-    
-    # Remove RT indicator
-    text = re.sub(r'^rt\s+', '', text)
-    
-    # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
+    # Remove URLs, mentions, hashtags, RT indicator and extra whitespace
+    text = normalize_text(tweet_text)
     
     # Remove special characters
-    text = re.sub(r'[^\w\s]', '', text)
-    
-    return text
+    return strip_special_chars(text)
 
 def analyze_sentiment(text, method="combined"):
     """
@@ -59,52 +61,288 @@ def analyze_sentiment(text, method="combined"):
     
     Args:
         text (str): Text to analyze
-        method (str): Method to use - 'vader', 'textblob', or 'combined' (default)
+        method (str): Name of a registered scorer - 'vader', 'vader_array',
+                      'textblob', 'cascade' or 'combined' (default)
         
     Returns:
         tuple: (sentiment_label, sentiment_score) 
                sentiment_label is one of 'positive', 'negative', 'neutral'
                sentiment_score is a float between -1 and 1
+        
+    Raises:
+        ValueError: If no scorer is registered under the method name
     """
-    if not text:
+    scorer = get_scorer(method)
+    
+    # Missing and non-text values are neutral, as in analyze_sentiment_batch
+    if not isinstance(text, str) or not text:
         return "neutral", 0.0
     
     # Clean the text
     cleaned_text = clean_tweet(text)
     
-    if method == "vader":
-        return _vader_sentiment(cleaned_text)
-    elif method == "textblob":
-        return _textblob_sentiment(cleaned_text)
-    else:  # combined approach
-        return _combined_sentiment(cleaned_text)
+    # Reuse the result for text we have already scored
+    key = make_key(cleaned_text, _cache_method(method))
+    result = result_cache.get(key)
+    if result is None:
+        result = scorer([cleaned_text])[0]
+        result_cache.put(key, result)
+    
+    return result
+
+def analyze_sentiment_batch(texts, method="combined", workers=1, chunk_size=DEFAULT_CHUNK_SIZE,
+                            normalized=False):
+    """
+    Analyze the sentiment of many texts in one call.
+    
+    Each distinct text is cleaned and scored only once, so retweets and
+    templated alerts that repeat across the batch share the same work. The
+    VADER analyzer and the TextBlob lexicon are reused for the whole batch.
+    
+    With workers > 1 the distinct texts are split into chunks and scored in a
+    pool of worker processes. Workers run the same scoring functions as the
+    serial path, so the results are identical.
+    
+    Args:
+        texts (list or pandas.Series): Texts to analyze
+        method (str): Name of a registered scorer - 'vader', 'vader_array',
+                      'textblob', 'cascade' or 'combined' (default)
+        workers (int): Number of worker processes; 1 (default) scores in-process
+        chunk_size (int): Number of distinct texts per worker task
+        normalized (bool): True if texts already went through
+                           text_normalizer.normalize_text, so only
+                           special characters are left to strip
+        
+    Returns:
+        tuple: (labels, scores) numpy arrays aligned with the input order
+               labels holds 'positive', 'negative' or 'neutral' strings
+               scores holds floats between -1 and 1
+        
+    Raises:
+        ValueError: If no scorer is registered under the method name
+    """
+    # Fail on an unknown method even when every text is cached or empty
+    get_scorer(method)
+    
+    texts = list(texts)
+    labels = np.full(len(texts), "neutral", dtype=object)
+    scores = np.zeros(len(texts), dtype=float)
+    
+    clean = strip_special_chars if normalized else clean_tweet
+    
+    # Group input positions by cleaned text so duplicates are cleaned and scored once
+    cleaned = {}
+    positions = {}
+    for i, text in enumerate(texts):
+        if isinstance(text, str) and text:
+            if text not in cleaned:
+                cleaned[text] = clean(text)
+            positions.setdefault(cleaned[text], []).append(i)
+    
+    # Only score texts the memo cache has not seen before
+    results = {}
+    missing = []
+    for cleaned_text in positions:
+        cached = result_cache.get(make_key(cleaned_text, _cache_method(method)))
+        if cached is None:
+            missing.append(cleaned_text)
+        else:
+            results[cleaned_text] = cached
+    
+    if workers > 1 and len(missing) > chunk_size:
+        scored = _score_parallel(missing, method, workers, chunk_size)
+    else:
+        scored = _score_chunk(missing, method)
+    
+    results.update(zip(missing, scored))
+    result_cache.put_many([(make_key(text, _cache_method(method)), result) for text, result in zip(missing, scored)])
+    
+    for cleaned_text, idx in positions.items():
+        label, score = results[cleaned_text]
+        labels[idx] = label
+        scores[idx] = score
+    
+    return labels, scores
+
+def register_scorer(name, score_batch):
+    """
+    Register a sentiment scoring backend under a method name.
+    
+    Parallel batch scoring looks scorers up inside the worker processes, so
+    backends should be registered when their module is imported.
+    
+    Args:
+        name (str): Method name callers pass as `method`
+        score_batch (callable): Function taking a list of cleaned texts and
+                                returning a list of (label, score) tuples
+    """
+    SCORERS[name] = score_batch
+
+def register_text_scorer(name, score_text):
+    """
+    Register a backend that scores one text at a time.
+    
+    Args:
+        name (str): Method name callers pass as `method`
+        score_text (callable): Function taking a cleaned text and returning
+                               a (label, score) tuple
+    """
+    register_scorer(name, lambda texts: [score_text(text) for text in texts])
+
+def get_scorer(method):
+    """
+    Get the batch scoring function registered for a method.
+    
+    Args:
+        method (str): Method name
+        
+    Returns:
+        callable: Function scoring a list of cleaned texts
+        
+    Raises:
+        ValueError: If no scorer is registered under the method name
+    """
+    if method not in SCORERS:
+        raise ValueError(f"Unknown sentiment method '{method}'; registered: {', '.join(SCORERS)}")
+    
+    return SCORERS[method]
+
+def get_scorer_names():
+    """
+    Get the names of all registered sentiment scorers.
+    
+    Returns:
+        list: Registered method names
+    """
+    return list(SCORERS)
+
+def _cache_method(method):
+    """Name a method for the memo cache, including settings that change its output."""
+    if method == "cascade":
+        low, high = CASCADE_BAND
+        return f"cascade:{low}:{high}"
+    return method
+
+def _score_chunk(cleaned_texts, method):
+    """Score a list of already cleaned texts."""
+    return get_scorer(method)(cleaned_texts)
+
+def _score_chunk_in_worker(cleaned_texts, method, cascade_band):
+    """
+    Score a chunk in a worker process.
+    
+    Returns the results together with the worker's cascade counters for the
+    chunk so the parent process can keep its statistics complete.
+    """
+    global CASCADE_BAND
+    CASCADE_BAND = cascade_band
+    
+    calls, fallbacks = _cascade_stats['calls'], _cascade_stats['fallbacks']
+    results = _score_chunk(cleaned_texts, method)
+    
+    return results, _cascade_stats['calls'] - calls, _cascade_stats['fallbacks'] - fallbacks
+
+def _score_parallel(cleaned_texts, method, workers, chunk_size):
+    """Score cleaned texts in chunks across the worker process pool."""
+    chunks = [cleaned_texts[i:i + chunk_size] for i in range(0, len(cleaned_texts), chunk_size)]
+    
+    try:
+        pool = _get_process_pool(workers)
+        chunk_results = pool.map(
+            _score_chunk_in_worker, chunks, [method] * len(chunks), [CASCADE_BAND] * len(chunks)
+        )
+        
+        results = []
+        for chunk, calls, fallbacks in chunk_results:
+            results.extend(chunk)
+            _cascade_stats['calls'] += calls
+            _cascade_stats['fallbacks'] += fallbacks
+        return results
+    except Exception as e:
+        logger.error(f"Parallel sentiment scoring failed, falling back to serial: {e}")
+        shutdown_process_pool()
+        return _score_chunk(cleaned_texts, method)
+
+def _init_worker():
+    """Load the scoring models once when a worker process starts."""
+    get_vader_analyzer()
+    get_compiled_lexicon()
+    _get_pattern_sentiment()
+
+def _get_process_pool(workers):
+    """Get the shared worker pool, recreating it if the worker count changed."""
+    global _process_pool, _process_pool_workers
+    
+    if _process_pool is None or _process_pool_workers != workers:
+        shutdown_process_pool()
+        _process_pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+        _process_pool_workers = workers
+        logger.info(f"Started sentiment worker pool with {workers} processes")
+    
+    return _process_pool
+
+def shutdown_process_pool():
+    """Stop the worker pool used for parallel batch scoring, if running."""
+    global _process_pool, _process_pool_workers
+    
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=True)
+        _process_pool = None
+        _process_pool_workers = 0
+
+atexit.register(shutdown_process_pool)
+
+@lru_cache(maxsize=None)
+def _get_pattern_sentiment():
+    """Load TextBlob's pattern sentiment lexicon on first use."""
+    from textblob.en import sentiment as pattern_sentiment
+    return pattern_sentiment
 
 def _vader_sentiment(text):
     """Use VADER sentiment analyzer to determine sentiment."""
+    sid = get_vader_analyzer()
     if not sid:
         logger.warning("VADER SentimentIntensityAnalyzer not initialized, falling back to TextBlob")
         return _textblob_sentiment(text)
     
     try:
         sentiment_scores = sid.polarity_scores(text)
-        compound_score = sentiment_scores['compound']
-        
-        # Determine sentiment label based on compound score
-        if compound_score >= 0.05:
-            return "positive", compound_score
-        elif compound_score <= -0.05:
-            return "negative", compound_score
-        else:
-            return "neutral", compound_score
+        return _vader_label(sentiment_scores['compound'])
     except Exception as e:
         logger.error(f"Error in VADER sentiment analysis: {e}")
         return "neutral", 0.0
 
+def _vader_array_sentiment_batch(texts):
+    """
+    Use the compiled, array-backed VADER lexicon to score a batch of texts.
+    Gives the same labels and scores as _vader_sentiment for every text.
+    """
+    lexicon = get_compiled_lexicon()
+    if lexicon is None:
+        logger.warning("VADER lexicon not available, falling back to TextBlob")
+        return [_textblob_sentiment(text) for text in texts]
+    
+    try:
+        compound_scores = lexicon.polarity_scores_batch(texts)['compound']
+        return [_vader_label(float(score)) for score in compound_scores]
+    except Exception as e:
+        logger.error(f"Error in array VADER sentiment analysis: {e}")
+        return [("neutral", 0.0)] * len(texts)
+
+def _vader_label(compound_score):
+    """Determine sentiment label based on a VADER compound score."""
+    if compound_score >= 0.05:
+        return "positive", compound_score
+    elif compound_score <= -0.05:
+        return "negative", compound_score
+    else:
+        return "neutral", compound_score
+
 def _textblob_sentiment(text):
     """Use TextBlob to determine sentiment."""
     try:
-        analysis = TextBlob(text)
-        polarity = analysis.sentiment.polarity
+        # Same lexicon TextBlob(text).sentiment uses, without building a blob per text
+        polarity = _get_pattern_sentiment()(text)[0]
         
         # Determine sentiment label based on polarity
         if polarity > 0.1:
@@ -125,6 +363,28 @@ def _combined_sentiment(text):
     vader_label, vader_score = _vader_sentiment(text)
     textblob_label, textblob_score = _textblob_sentiment(text)
     
+    return _merge_sentiment(vader_label, vader_score, textblob_label, textblob_score)
+
+def _cascade_sentiment(text):
+    """
+    Cascade approach: VADER first, TextBlob only when VADER is ambiguous.
+    When the compound score falls inside CASCADE_BAND the result is the same
+    as the combined method; otherwise the VADER result is returned directly.
+    """
+    vader_label, vader_score = _vader_sentiment(text)
+    _cascade_stats['calls'] += 1
+    
+    low, high = CASCADE_BAND
+    if not low < vader_score < high:
+        return vader_label, vader_score
+    
+    _cascade_stats['fallbacks'] += 1
+    textblob_label, textblob_score = _textblob_sentiment(text)
+    
+    return _merge_sentiment(vader_label, vader_score, textblob_label, textblob_score)
+
+def _merge_sentiment(vader_label, vader_score, textblob_label, textblob_score):
+    """Merge VADER and TextBlob results into a single label and score."""
     # If both agree, use that sentiment
     if vader_label == textblob_label:
         return vader_label, (vader_score + textblob_score) / 2
@@ -135,6 +395,12 @@ def _combined_sentiment(text):
     else:
         return textblob_label, textblob_score
 
+register_text_scorer("vader", _vader_sentiment)
+register_scorer("vader_array", _vader_array_sentiment_batch)
+register_text_scorer("textblob", _textblob_sentiment)
+register_text_scorer("combined", _combined_sentiment)
+register_text_scorer("cascade", _cascade_sentiment)
+
 def analyze_disaster_impact(text):
     """
     Analyze the text to determine the severity of disaster impact mentioned.
@@ -145,37 +411,128 @@ def analyze_disaster_impact(text):
     Returns:
         str: Impact level - 'severe', 'moderate', 'minor', or 'unknown'
     """
-    # Keywords indicating severity levels
-    severe_keywords = [
-        'catastrophic', 'devastat', 'fatal', 'death', 'killed', 'casualties', 
-        'destroyed', 'emergency', 'evacuat', 'crisis', 'danger', 'severe', 
-        'tragedy', 'disaster', 'critical', 'massive'
-    ]
+    text_lower = text.lower()
     
-    moderate_keywords = [
-        'damage', 'injured', 'wound', 'affected', 'impact', 'hit', 'threat',
-        'loss', 'moderate', 'concern', 'worried', 'warning'
-    ]
+    # Reuse the result for text we have already classified
+    key = make_key(text_lower, IMPACT_CACHE_METHOD)
+    impact = result_cache.get(key)
+    if impact is None:
+        impact = _classify_impact(text_lower)
+        result_cache.put(key, impact)
     
-    minor_keywords = [
-        'minor', 'small', 'limited', 'contained', 'controlled', 'restored',
-        'recovery', 'stable', 'manageable', 'relief'
-    ]
+    return impact
+
+def analyze_disaster_impact_batch(texts):
+    """
+    Determine the disaster impact level of many texts in one call.
     
-    # Check for keyword presence
-    text_lower = text.lower()
+    Args:
+        texts (list or pandas.Series): Texts to analyze
+        
+    Returns:
+        numpy.ndarray: Impact levels aligned with the input order
+    """
+    texts = list(texts)
+    impacts = np.full(len(texts), "unknown", dtype=object)
     
-    # Count keyword occurrences
-    severe_count = sum(1 for keyword in severe_keywords if keyword in text_lower)
-    moderate_count = sum(1 for keyword in moderate_keywords if keyword in text_lower)
-    minor_count = sum(1 for keyword in minor_keywords if keyword in text_lower)
-    
-    # Determine impact level based on keyword counts
-    if severe_count > 0:
-        return "severe"
-    elif moderate_count > 0:
-        return "moderate"
-    elif minor_count > 0:
-        return "minor"
-    else:
-        return "unknown"
+    # Group input positions by lowercased text so duplicates are classified once
+    positions = {}
+    for i, text in enumerate(texts):
+        if isinstance(text, str) and text:
+            positions.setdefault(text.lower(), []).append(i)
+    
+    results = []
+    for text_lower, idx in positions.items():
+        key = make_key(text_lower, IMPACT_CACHE_METHOD)
+        impact = result_cache.get(key)
+        if impact is None:
+            impact = _classify_impact(text_lower)
+            results.append((key, impact))
+        impacts[idx] = impact
+    
+    result_cache.put_many(results)
+    
+    return impacts
+
+def _compile_impact_matcher():
+    """
+    Build one regex that finds every impact keyword in a single scan.
+    
+    The alternation sits inside a lookahead so a match is attempted at every
+    position, like a substring test per keyword. Keywords are ordered from
+    severe to minor, so at any position the most severe keyword wins.
+    """
+    keyword_levels = {}
+    impact_keywords = get_impact_keywords()
+    
+    for level in ["Severe", "Moderate", "Minor"]:
+        for keyword in impact_keywords[level]:
+            keyword_levels.setdefault(keyword.lower(), level.lower())
+    
+    alternation = '|'.join(re.escape(keyword) for keyword in keyword_levels)
+    return re.compile(f'(?=({alternation}))'), keyword_levels
+
+def _impact_cache_method(keyword_levels):
+    """Name the impact classifier for the memo cache, including a fingerprint of its keywords."""
+    return f"impact:{fingerprint(list(keyword_levels.items()))}"
+
+IMPACT_PATTERN, IMPACT_KEYWORD_LEVELS = _compile_impact_matcher()
+
+# Results cached before a keyword change miss, as the fingerprint differs
+IMPACT_CACHE_METHOD = _impact_cache_method(IMPACT_KEYWORD_LEVELS)
+
+def _classify_impact(text_lower):
+    """Determine the impact level of already lowercased text."""
+    impact = "unknown"
+    
+    for match in IMPACT_PATTERN.finditer(text_lower):
+        level = IMPACT_KEYWORD_LEVELS[match.group(1)]
+        
+        # Nothing outranks severe, so stop scanning
+        if level == "severe":
+            return level
+        if level == "moderate" or impact == "unknown":
+            impact = level
+    
+    return impact
+
+def get_cache_stats():
+    """
+    Get hit, miss and eviction statistics of the result memo cache.
+    
+    Returns:
+        dict: Cache statistics
+    """
+    return result_cache.stats()
+
+def set_cascade_band(low, high):
+    """
+    Set the VADER compound score band in which the cascade method falls back
+    to TextBlob. A wider band trades speed for agreement with 'combined'.
+    
+    Args:
+        low (float): Lower bound of the ambiguity band (exclusive)
+        high (float): Upper bound of the ambiguity band (exclusive)
+    """
+    global CASCADE_BAND
+    
+    if low > high:
+        raise ValueError(f"Invalid cascade band ({low}, {high})")
+    
+    CASCADE_BAND = (low, high)
+
+def get_cascade_stats():
+    """
+    Get how often the cascade method needed its TextBlob fallback.
+    
+    Returns:
+        dict: Number of cascade scorings, fallbacks and the fallback rate
+    """
+    calls = _cascade_stats['calls']
+    fallbacks = _cascade_stats['fallbacks']
+    
+    return {
+        'calls': calls,
+        'fallbacks': fallbacks,
+        'fallback_rate': fallbacks / calls if calls else 0.0
+    }
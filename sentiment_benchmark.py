@@ -0,0 +1,175 @@
+"""
+This module benchmarks the registered sentiment scorers against each other.
+For every backend it reports throughput (tweets/sec), per-tweet latency
+percentiles and how often its labels agree with the corpus labels and with
+the other backends.
+
+Usage:
+    python sentiment_benchmark.py --corpus labelled.csv
+    python sentiment_benchmark.py --mock 5000 --scorers vader,vader_array,cascade
+
+A labelled corpus is a CSV file with 'text' and 'label' columns, where label
+is 'positive', 'negative' or 'neutral'. Without one, mock tweets are labelled
+by the reference scorer (--reference, default 'combined').
+"""
+
+import sys
+import time
+import json
+import argparse
+import numpy as np
+import pandas as pd
+from sentiment_analyzer import clean_tweet, get_scorer, get_scorer_names
+
+def load_labelled_corpus(path):
+    """
+    Load a labelled corpus from a CSV file.
+
+    Args:
+        path (str): CSV file with 'text' and 'label' columns
+
+    Returns:
+        pandas.DataFrame: DataFrame with 'text' and 'label' columns
+    """
+    df = pd.read_csv(path)
+    if 'label' not in df.columns and 'sentiment' in df.columns:
+        df = df.rename(columns={'sentiment': 'label'})
+
+    df = df.dropna(subset=['text', 'label'])
+    df['label'] = df['label'].str.lower()
+    return df[['text', 'label']].reset_index(drop=True)
+
+def make_mock_corpus(count, reference="combined"):
+    """
+    Build a corpus from mock tweets labelled by a reference scorer.
+
+    Args:
+        count (int): Number of mock tweets
+        reference (str): Scorer whose labels are used as ground truth
+
+    Returns:
+        pandas.DataFrame: DataFrame with 'text' and 'label' columns
+    """
+    from mock_data_generator import generate_mock_tweets
+
+    df = generate_mock_tweets(count=count, sentiment_method=reference)
+    return pd.DataFrame({'text': df['text'], 'label': df['sentiment']})
+
+def benchmark_scorer(name, cleaned_texts, latency_sample=500):
+    """
+    Measure one scorer's throughput and per-tweet latency.
+
+    The memo cache is bypassed so every text is actually scored.
+
+    Args:
+        name (str): Registered scorer name
+        cleaned_texts (list): Texts already passed through clean_tweet
+        latency_sample (int): Number of texts scored one at a time for latency
+
+    Returns:
+        dict: 'labels' plus 'tweets_per_sec', 'p50_ms' and 'p99_ms'
+    """
+    scorer = get_scorer(name)
+
+    # Warm up: load models and compile lexicons outside the timed region
+    scorer(cleaned_texts[:50])
+
+    start = time.perf_counter()
+    results = scorer(cleaned_texts)
+    elapsed = time.perf_counter() - start
+
+    latencies = []
+    for text in cleaned_texts[:latency_sample]:
+        start = time.perf_counter()
+        scorer([text])
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    return {
+        'labels': np.array([label for label, _ in results], dtype=object),
+        'tweets_per_sec': len(cleaned_texts) / elapsed if elapsed else float('inf'),
+        'p50_ms': float(np.percentile(latencies, 50)) if latencies else 0.0,
+        'p99_ms': float(np.percentile(latencies, 99)) if latencies else 0.0
+    }
+
+def run_benchmark(corpus, scorers=None, latency_sample=500):
+    """
+    Benchmark scorers on a labelled corpus.
+
+    Args:
+        corpus (pandas.DataFrame): DataFrame with 'text' and 'label' columns
+        scorers (list, optional): Scorer names; defaults to all registered scorers
+        latency_sample (int): Number of texts scored one at a time for latency
+
+    Returns:
+        dict: 'scorers' with per-backend metrics and 'agreement' with the
+              pairwise label agreement between backends
+    """
+    scorers = scorers or get_scorer_names()
+    cleaned_texts = [clean_tweet(text) for text in corpus['text']]
+    labels = corpus['label'].to_numpy(dtype=object)
+
+    metrics = {}
+    predictions = {}
+    for name in scorers:
+        result = benchmark_scorer(name, cleaned_texts, latency_sample)
+        predictions[name] = result.pop('labels')
+        result['accuracy'] = float((predictions[name] == labels).mean()) if len(labels) else 0.0
+        metrics[name] = result
+
+    agreement = {
+        first: {second: float((predictions[first] == predictions[second]).mean()) if len(labels) else 0.0
+                for second in scorers}
+        for first in scorers
+    }
+
+    return {'scorers': metrics, 'agreement': agreement}
+
+def format_report(report, corpus_size):
+    """Format benchmark results as a plain-text table."""
+    lines = [f"Corpus: {corpus_size} tweets", ""]
+    lines.append(f"{'scorer':<14}{'tweets/sec':>12}{'p50 ms':>10}{'p99 ms':>10}{'accuracy':>10}")
+
+    for name, metrics in report['scorers'].items():
+        lines.append(
+            f"{name:<14}{metrics['tweets_per_sec']:>12.0f}{metrics['p50_ms']:>10.3f}"
+            f"{metrics['p99_ms']:>10.3f}{metrics['accuracy']:>10.3f}"
+        )
+
+    names = list(report['agreement'])
+    lines.extend(["", "Label agreement", " " * 14 + "".join(f"{name:>13}" for name in names)])
+    for first in names:
+        lines.append(f"{first:<14}" + "".join(f"{report['agreement'][first][second]:>13.3f}" for second in names))
+
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark registered sentiment scorers")
+    parser.add_argument("--corpus", help="CSV file with 'text' and 'label' columns")
+    parser.add_argument("--mock", type=int, default=2000, help="mock tweets to use when no corpus is given")
+    parser.add_argument("--reference", default="combined", help="scorer that labels the mock corpus")
+    parser.add_argument("--scorers", help="comma-separated scorer names (default: all registered)")
+    parser.add_argument("--latency-sample", type=int, default=500, help="texts scored one at a time for latency")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    if args.corpus:
+        corpus = load_labelled_corpus(args.corpus)
+    else:
+        corpus = make_mock_corpus(args.mock, args.reference)
+
+    scorers = args.scorers.split(",") if args.scorers else None
+    unknown = [name for name in scorers or [] if name not in get_scorer_names()]
+    if unknown:
+        parser.error(f"unknown scorers: {', '.join(unknown)}")
+
+    report = run_benchmark(corpus, scorers, args.latency_sample)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(format_report(report, len(corpus)))
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+import os
+import sys
+import importlib
+import tempfile
+from datetime import datetime
+import pytest
+
+# The modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Never touch the working copy's tweets.db, even if a test imports database directly
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'tweets.db')}"
+
+@pytest.fixture
+def load_database(tmp_path, monkeypatch):
+    """
+    Import a fresh database module on a temporary SQLite file.
+
+    The module reads its settings when imported, so each call re-imports it;
+    calling it again with other settings reopens the same file.
+    """
+    modules = []
+
+    def load(partitioning='none', **settings):
+        for module in modules:
+            module.engine.dispose()
+        monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'tweets.db'}")
+        monkeypatch.setenv('TWEET_PARTITIONING', partitioning)
+        for name, value in settings.items():
+            monkeypatch.setenv(name, str(value))
+
+        sys.modules.pop('database', None)
+        module = importlib.import_module('database')
+        modules.append(module)
+        return module
+
+    yield load
+
+    for module in modules:
+        module.engine.dispose()
+    sys.modules.pop('database', None)
+
+@pytest.fixture(scope='session')
+def now():
+    """Current time without microseconds, shared by the whole test run."""
+    return datetime.now().replace(microsecond=0)
+
+@pytest.fixture(params=['none', 'daily'])
+def database(request, load_database):
+    """
+    Import the database module on an empty temporary file, once per partitioning mode.
+
+    Test modules override this fixture to add their tweets.
+    """
+    return load_database(request.param)
+
+@pytest.fixture
+def make_tweets():
+    """Build processed tweets like the mock data generator, at given times."""
+    import pandas as pd
+
+    def make(times, texts=None, disaster_type='Flood', sentiment='negative', start_id=0):
+        texts = texts or ['Flood waters rising downtown'] * len(times)
+        return pd.DataFrame({
+            'id': [str(start_id + i) for i in range(len(times))],
+            'text': texts,
+            'username': [f'user{start_id + i}' for i in range(len(times))],
+            'created_at': pd.to_datetime(times),
+            'hashtags': [['FloodWatch']] * len(times),
+            'sentiment': sentiment,
+            'sentiment_score': -0.5,
+            'disaster_type': disaster_type,
+            'disaster_impact': 'moderate',
+            'retweet_count': 1,
+            'like_count': 2,
+            'reply_count': 0
+        })
+
+    return make
@@ -0,0 +1,139 @@
+import re
+import asyncio
+import threading
+import pandas as pd
+import pytest
+import data_processor
+import sentiment_analyzer
+from data_processor import TWEET_COLUMNS, aprocess_tweet_stream, process_tweets
+from result_cache import ResultCache
+from sentiment_analyzer import analyze_sentiment, analyze_disaster_impact
+
+RAW_TWEETS = [
+    {
+        'id': '101', 'text': 'RT @NWS: Flash flood warning, evacuate now! #FloodWatch https://t.co/x',
+        'created_at': '2024-05-01T10:00:00',
+        'user': {'username': 'weatherfan', 'name': 'Weather Fan', 'location': 'Houston, TX'},
+        'public_metrics': {'retweet_count': 5, 'like_count': 10, 'reply_count': 1},
+        'entities': {'hashtags': [{'tag': 'FloodWatch'}], 'mentions': [{'username': 'NWS'}]}
+    },
+    {'id': '102', 'text': 'Shelters are safe, thank you volunteers', 'created_at': '2024-05-01T11:30:00'},
+    {
+        'id': '103', 'text': 'Deadly fire near the ridge', 'created_at': '2024-05-02T08:15:00',
+        'user': {'username': 'ranger'}, 'entities': {'mentions': []}
+    },
+]
+
+def collect(stream):
+    async def run():
+        return [batch async for batch in stream]
+    return asyncio.run(run())
+
+def fake_process(batch, sentiment_method="combined"):
+    return pd.DataFrame({'id': batch})
+
+def test_batches_yielded_in_order(monkeypatch):
+    monkeypatch.setattr(data_processor, "process_tweets", fake_process)
+
+    batches = collect(aprocess_tweet_stream(range(7), batch_size=3))
+
+    assert [list(batch['id']) for batch in batches] == [[0, 1, 2], [3, 4, 5], [6]]
+
+def test_records_output(monkeypatch):
+    monkeypatch.setattr(data_processor, "process_tweets", fake_process)
+
+    batches = collect(aprocess_tweet_stream(range(2), batch_size=2, as_records=True))
+
+    assert batches == [[{'id': 0}, {'id': 1}]]
+
+def test_receiving_overlaps_analysis(monkeypatch):
+    second_batch_received = threading.Event()
+    overlapped = []
+
+    def slow_process(batch, sentiment_method="combined"):
+        if batch[0] == 0:
+            # Analysis of the first batch waits for the source to deliver the second
+            overlapped.append(second_batch_received.wait(timeout=5))
+        return fake_process(batch)
+
+    async def source():
+        for i in range(4):
+            await asyncio.sleep(0)
+            if i == 3:
+                second_batch_received.set()
+            yield i
+
+    monkeypatch.setattr(data_processor, "process_tweets", slow_process)
+
+    batches = collect(aprocess_tweet_stream(source(), batch_size=2))
+
+    assert overlapped == [True]
+    assert [list(batch['id']) for batch in batches] == [[0, 1], [2, 3]]
+
+@pytest.fixture
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(sentiment_analyzer, "result_cache", ResultCache(maxsize=1000))
+
+def legacy_process_tweets(tweets):
+    """Row-at-a-time processing as done before the columnar rewrite."""
+    rows = []
+    for tweet in tweets:
+        try:
+            user = tweet.get('user', {})
+            metrics = tweet.get('public_metrics', {})
+            entities = tweet.get('entities', {})
+            text = tweet.get('text', '')
+            clean = text.lower()
+            for pattern in (r'https?://\S+|www\.\S+', r'@\w+', r'#\w+', r'^rt\s+'):
+                clean = re.sub(pattern, '', clean)
+            clean = re.sub(r'\s+', ' ', clean).strip()
+            label, score = analyze_sentiment(text)
+            rows.append({
+                'id': tweet.get('id', ''), 'text': text, 'clean_text': clean,
+                'created_at': tweet.get('created_at', None),
+                'username': user.get('username', ''), 'display_name': user.get('name', ''),
+                'location': user.get('location', ''),
+                'retweet_count': metrics.get('retweet_count', 0), 'like_count': metrics.get('like_count', 0),
+                'reply_count': metrics.get('reply_count', 0),
+                'hashtags': [tag.get('tag', '') for tag in entities.get('hashtags', [])],
+                'mentions': [mention.get('username', '') for mention in entities.get('mentions', [])],
+                'sentiment': label, 'sentiment_score': score,
+                'disaster_impact': analyze_disaster_impact(text)
+            })
+        except Exception:
+            continue
+    df = pd.DataFrame(rows)
+    df['created_at'] = pd.to_datetime(df['created_at'])
+    return df
+
+def test_process_tweets_schema(fresh_cache):
+    df = process_tweets(RAW_TWEETS)
+
+    assert list(df.columns) == TWEET_COLUMNS
+    assert pd.api.types.is_datetime64_any_dtype(df['created_at'])
+    assert df['created_at'].iloc[2] == pd.Timestamp('2024-05-02 08:15:00')
+    assert df.loc[1, ['username', 'retweet_count', 'hashtags', 'mentions']].tolist() == ['', 0, [], []]
+    assert df.loc[0, 'clean_text'] == ': flash flood warning, evacuate now!'
+
+def test_process_tweets_matches_row_at_a_time(fresh_cache):
+    tweets = RAW_TWEETS + [{'id': '104', 'text': 'Power outage across the county', 'created_at': '2024-05-02T09:00:00'}]
+
+    pd.testing.assert_frame_equal(process_tweets(tweets), legacy_process_tweets(tweets)[TWEET_COLUMNS])
+
+def test_malformed_tweets_skipped(fresh_cache):
+    malformed = [
+        None, "not a tweet", 42,
+        {'id': '201', 'text': 'Bad user', 'user': 'nobody'},
+        {'id': '202', 'text': 'Bad hashtags', 'entities': {'hashtags': [None]}},
+    ]
+    tweets = [RAW_TWEETS[0], *malformed[:3], RAW_TWEETS[1], *malformed[3:], RAW_TWEETS[2]]
+
+    df = process_tweets(tweets)
+
+    assert df['id'].tolist() == ['101', '102', '103']
+    pd.testing.assert_frame_equal(df, process_tweets(RAW_TWEETS))
+
+def test_no_valid_tweets():
+    assert process_tweets([]).empty
+    assert process_tweets([None, "x"]).empty
+    assert process_tweets([{'id': '1', 'text': 'x', 'user': 'nobody'}]).empty
@@ -0,0 +1,48 @@
+import threading
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool
+
+def test_sqlite_file_uses_wal_and_pool(load_database, tmp_path):
+    db = load_database(SQLITE_BUSY_TIMEOUT_MS=1234)
+    engine = db.create_db_engine(f"sqlite:///{tmp_path / 'other.db'}")
+
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == 'wal'
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 1234
+
+    assert isinstance(engine.pool, db.TimedQueuePool)
+    engine.dispose()
+
+def test_in_memory_sqlite_keeps_default_pool(load_database):
+    db = load_database()
+    engine = db.create_db_engine("sqlite://")
+
+    assert not isinstance(engine.pool, QueuePool)
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+
+def test_pool_stats_record_checkouts(load_database):
+    db = load_database()
+    before = db.get_pool_stats()['checkouts']
+
+    threads = [threading.Thread(target=db.get_tweet_count) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = db.get_pool_stats()
+    assert stats['checkouts'] >= before + 8
+    assert stats['checked_out'] == 0
+    assert stats['wait_max_ms'] >= stats['wait_p95_ms'] >= 0
+
+def test_wait_stats_snapshot(load_database):
+    stats = load_database().PoolWaitStats(window=10)
+    for seconds in (0.001, 0.002, 0.010):
+        stats.record(seconds)
+
+    snapshot = stats.snapshot()
+    assert snapshot['checkouts'] == 3
+    assert abs(snapshot['wait_avg_ms'] - 13 / 3) < 1e-9
+    assert abs(snapshot['wait_max_ms'] - 10) < 1e-9
@@ -0,0 +1,70 @@
+from datetime import timedelta
+import pandas as pd
+import pytest
+
+@pytest.fixture
+def database(database, make_tweets, now):
+    # Several tweets share each time, so pages split created_at ties
+    times = [now - timedelta(hours=(i // 3) * 5) for i in range(40)]
+    database.save_tweets(make_tweets(times))
+    return database
+
+def read_pages(db, limit, **filters):
+    pages, cursor = [], None
+    while True:
+        page, cursor = db.get_tweet_page(limit, cursor=cursor, **filters)
+        pages.append(page)
+        if cursor is None:
+            return pages
+
+def test_pages_match_single_read(database):
+    pages = read_pages(database, 7)
+
+    assert [len(page) for page in pages] == [7, 7, 7, 7, 7, 5]
+    assert pd.concat(pages)['id'].tolist() == database.get_tweets(limit=100)['id'].tolist()
+
+def test_pages_with_filters(database, now):
+    time_range = (now - timedelta(days=1), None)
+    pages = read_pages(database, 4, time_range=time_range, columns=['id', 'created_at'])
+
+    expected = database.get_tweets(limit=100, time_range=time_range, columns=['id', 'created_at'])
+    assert pd.concat(pages)['id'].tolist() == expected['id'].tolist()
+    assert list(pages[0].columns) == ['id', 'created_at']
+
+def test_new_tweets_do_not_shift_pages(database, make_tweets, now):
+    first, cursor = database.get_tweet_page(10)
+    database.save_tweets(make_tweets([now + timedelta(minutes=1)] * 3, start_id=1000))
+
+    second, _ = database.get_tweet_page(10, cursor=cursor)
+    expected = database.get_tweets(limit=100)['id'].tolist()
+
+    assert second['id'].tolist() == expected[expected.index(first['id'].iloc[-1]) + 1:][:10]
+
+def test_exact_last_page_has_no_cursor(database):
+    page, cursor = database.get_tweet_page(40)
+
+    assert len(page) == 40
+    assert cursor is None
+
+def test_invalid_cursor(database):
+    with pytest.raises(ValueError):
+        database.get_tweet_page(10, cursor="bogus")
+
+def test_iter_tweets_exports_undated_tweets(load_database, make_tweets, tmp_path, monkeypatch, now):
+    from utils import export_data_chunks
+
+    db = load_database('none')
+    tweets = make_tweets([now - timedelta(hours=i) for i in range(8)])
+    tweets.loc[[2, 5, 7], 'created_at'] = pd.NaT
+    db.save_tweets(tweets)
+
+    chunks = list(db.iter_tweets(chunk_size=3))
+    ids = pd.concat(chunks)['id'].tolist()
+    assert sorted(ids) == sorted(tweets['id'])
+    assert ids[-3:] == ['7', '5', '2']
+    assert sum(len(chunk) for chunk in db.iter_tweets(limit=6, chunk_size=4)) == 6
+
+    monkeypatch.chdir(tmp_path)
+    filename, count = export_data_chunks(db.iter_tweets(limit=100))
+    assert count == 8
+    assert sorted(pd.read_csv(filename, dtype={'id': str})['id']) == sorted(tweets['id'])
@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+import pandas as pd
+from sqlalchemy import select, func
+
+def partition_days(db):
+    with db.engine.connect() as conn:
+        return db._list_partitions(conn)
+
+def rollup_total(db):
+    with db.engine.connect() as conn:
+        return conn.execute(select(func.coalesce(func.sum(db.TweetRollup.tweet_count), 0))).scalar_one()
+
+def test_tweets_stored_by_day(load_database, make_tweets, now):
+    db = load_database('daily')
+    times = [now - timedelta(days=i) for i in range(3)]
+
+    assert db.save_tweets(make_tweets(times)) == 3
+    assert partition_days(db) == sorted({time.date() for time in times})
+    assert db.get_tweet_count() == 3
+    assert rollup_total(db) == 3
+
+def test_undated_tweet_saved_once(load_database, make_tweets, now):
+    db = load_database('daily')
+    db.save_tweets(make_tweets([now - timedelta(days=2)]))
+
+    # The same tweet without a time must not be filed again under today
+    undated = make_tweets([now]).assign(created_at=pd.NaT)
+    assert db.save_tweets(undated) == 0
+    assert db.get_tweet_count() == 1
+
+    # A new undated tweet is filed under the time it is saved
+    assert db.save_tweets(make_tweets([now], start_id=5).assign(created_at=pd.NaT)) == 1
+    assert db.get_tweet_count() == 2
+    assert partition_days(db)[-1] == datetime.now().date()
+
+    assert db.save_tweets(make_tweets([now], start_id=5).assign(created_at=pd.NaT)) == 0
+    assert db.get_tweet_count() == 2
+
+def test_existing_tweets_moved_into_partitions(load_database, make_tweets, now):
+    times = [now - timedelta(days=i, hours=1) for i in range(4)]
+    db = load_database('none')
+    db.save_tweets(make_tweets(times))
+    before = db.get_tweets(limit=10)
+
+    db = load_database('daily')
+
+    assert partition_days(db) == sorted({time.date() for time in times})
+    with db.engine.connect() as conn:
+        assert conn.execute(select(func.count()).select_from(db.Tweet.__table__)).scalar_one() == 0
+    after = db.get_tweets(limit=10)
+    assert after['id'].tolist() == before['id'].tolist()
+    assert rollup_total(db) == 4
+
+    # Moved tweets are searchable in their partitions
+    results, _ = db.search_tweets("flood", limit=10)
+    assert len(results) == 4
+
+def test_retention_drops_whole_days(load_database, make_tweets, now):
+    db = load_database('daily')
+    times = [now - timedelta(days=i) for i in range(6)]
+    db.save_tweets(make_tweets(times))
+
+    deleted = db.clear_old_tweets(days=3)
+
+    assert deleted == 3
+    assert db.get_tweet_count() == 3
+    assert partition_days(db)[0] >= (now - timedelta(days=3)).date()
+    assert rollup_total(db) == 3
@@ -0,0 +1,57 @@
+from datetime import timedelta
+import pandas as pd
+
+def test_get_tweets_newest_first_with_typed_columns(load_database, make_tweets, now):
+    db = load_database()
+    db.save_tweets(make_tweets([now - timedelta(minutes=i) for i in range(5)]))
+
+    tweets = db.get_tweets(limit=3)
+
+    assert tweets['id'].tolist() == ['0', '1', '2']
+    assert pd.api.types.is_datetime64_any_dtype(tweets['created_at'])
+    for column in db.CATEGORICAL_COLUMNS:
+        assert isinstance(tweets[column].dtype, pd.CategoricalDtype)
+
+def test_get_tweets_selected_columns_and_filters(load_database, make_tweets, now):
+    db = load_database()
+    db.save_tweets(make_tweets([now - timedelta(hours=i) for i in range(4)], disaster_type='Flood'))
+    db.save_tweets(make_tweets([now], disaster_type='Wildfire', start_id=10))
+
+    tweets = db.get_tweets(columns=['id', 'created_at'], disaster_type='Flood',
+                           time_range=(now - timedelta(hours=2, minutes=30), None))
+
+    assert list(tweets.columns) == ['id', 'created_at']
+    assert tweets['id'].tolist() == ['0', '1', '2']
+
+def test_unknown_column_read_fails_safely(load_database, make_tweets, now):
+    db = load_database()
+    db.save_tweets(make_tweets([now]))
+
+    assert db.get_tweets(columns=['id', 'password']).empty
+
+def test_iter_tweets_chunks_cover_every_tweet(load_database, make_tweets, now):
+    db = load_database()
+    db.save_tweets(make_tweets([now - timedelta(minutes=i) for i in range(23)]))
+
+    chunks = list(db.iter_tweets(chunk_size=5))
+
+    assert [len(chunk) for chunk in chunks] == [5, 5, 5, 5, 3]
+    assert pd.concat(chunks)['id'].tolist() == db.get_tweets(limit=100)['id'].tolist()
+    assert sum(len(chunk) for chunk in db.iter_tweets(limit=12, chunk_size=5)) == 12
+
+def test_get_tweets_float_columns_with_nulls(load_database, make_tweets, now):
+    db = load_database()
+    tweets = make_tweets([now - timedelta(minutes=i) for i in range(3)])
+    tweets['lat'] = [29.76, None, 30.27]
+    tweets['lon'] = [None, None, None]
+    db.save_tweets(tweets)
+
+    stored = db.get_tweets(limit=3)
+    for column in db.FLOAT_COLUMNS:
+        assert stored[column].dtype == 'float64'
+    assert stored['lat'].isna().tolist() == [False, True, False]
+    assert stored['lon'].isna().all()
+
+    # Every chunk gets the same dtypes, also when a chunk is all NULL
+    for chunk in db.iter_tweets(chunk_size=1):
+        assert chunk['lat'].dtype == 'float64'
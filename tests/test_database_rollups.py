@@ -0,0 +1,45 @@
+from datetime import timedelta
+import pandas as pd
+import pytest
+
+def rollup_rows(db):
+    rollups = db.get_rollups()
+    return rollups.sort_values(db.ROLLUP_KEYS).reset_index(drop=True)
+
+@pytest.fixture
+def database(database, make_tweets, now):
+    times = [now - timedelta(hours=i * 7, minutes=i) for i in range(12)]
+    database.save_tweets(make_tweets(times, disaster_type='Flood'))
+    database.save_tweets(make_tweets(times[:5], disaster_type='Wildfire', sentiment='positive', start_id=100))
+    return database
+
+def test_incremental_rollups_match_rebuild(database, make_tweets, now):
+    # Saving stored tweets again must not count them twice
+    database.save_tweets(make_tweets([now], disaster_type='Flood'))
+    incremental = rollup_rows(database)
+
+    assert database.rebuild_rollups()
+    rebuilt = rollup_rows(database)
+
+    pd.testing.assert_frame_equal(incremental, rebuilt, check_dtype=False)
+    assert incremental['tweet_count'].sum() == 17
+
+def test_retention_keeps_rollups_consistent(database):
+    deleted = database.clear_old_tweets(days=2)
+    remaining = rollup_rows(database)
+
+    assert deleted > 0
+    assert remaining['tweet_count'].sum() == database.get_tweet_count()
+
+    database.rebuild_rollups()
+    pd.testing.assert_frame_equal(remaining, rollup_rows(database), check_dtype=False)
+
+def test_rollup_counts_layout(database, now):
+    counts = database.get_rollup_counts(time_range=(now - timedelta(hours=20), None), disaster_type='Flood', by='sentiment')
+
+    assert {'bucket', 'tweet_count', 'negative'} <= set(counts.columns)
+    assert counts['bucket'].is_monotonic_increasing
+    assert counts['tweet_count'].sum() == 3
+
+    daily = database.get_rollup_counts(freq='1D')
+    assert daily['tweet_count'].sum() == 17
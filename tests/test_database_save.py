@@ -0,0 +1,34 @@
+from datetime import timedelta
+import pandas as pd
+
+def test_duplicates_in_batch_saved_once(load_database, make_tweets, now):
+    db = load_database()
+    tweets = make_tweets([now, now - timedelta(minutes=1)])
+
+    assert db.save_tweets(pd.concat([tweets, tweets])) == 2
+    assert db.get_tweet_count() == 2
+
+def test_stored_tweets_skipped(load_database, make_tweets, now):
+    db = load_database()
+    db.save_tweets(make_tweets([now - timedelta(minutes=i) for i in range(3)]))
+
+    more = make_tweets([now - timedelta(minutes=i) for i in range(5)])
+    assert db.save_tweets(more) == 2
+    assert db.get_tweet_count() == 5
+
+def test_chunked_inserts(load_database, make_tweets, now):
+    db = load_database()
+    tweets = make_tweets([now - timedelta(seconds=i) for i in range(25)])
+
+    assert db.save_tweets(tweets, chunk_size=4) == 25
+    assert sorted(db.get_tweets(limit=100)['id'], key=int) == tweets['id'].tolist()
+
+def test_missing_columns_get_defaults(load_database, now):
+    db = load_database()
+    tweets = pd.DataFrame({'id': ['1'], 'text': ['Storm'], 'created_at': [pd.Timestamp(now)]})
+
+    assert db.save_tweets(tweets) == 1
+    stored = db.get_tweets(limit=1)
+    assert stored['disaster_type'].tolist() == ['General']
+    assert stored['disaster_impact'].tolist() == ['unknown']
+    assert stored['hashtags'].tolist() == [[]]
@@ -0,0 +1,82 @@
+from datetime import timedelta
+import pandas as pd
+import pytest
+
+@pytest.fixture
+def database(database, make_tweets, now):
+    times = [now - timedelta(days=i % 3, minutes=i) for i in range(30)]
+    texts = [f"Flood update {i}" if i % 2 else f"Wildfire evacuation {i}" for i in range(30)]
+    database.save_tweets(make_tweets(times, texts))
+    return database
+
+def test_plain_words_match_text_and_hashtags(database):
+    flood, _ = database.search_tweets("flood", limit=100)
+    hashtag, _ = database.search_tweets("floodwatch", limit=100)
+
+    assert len(flood) == 15
+    assert len(hashtag) == 30
+
+def test_plain_words_do_not_match_usernames(database):
+    plain, _ = database.search_tweets("user3", limit=100)
+    user, _ = database.search_tweets("@user3", limit=100)
+
+    assert plain.empty
+    assert user['username'].tolist() == ['user3']
+
+def test_prefix_and_or(database):
+    evac, _ = database.search_tweets("evac*", limit=100)
+    either, _ = database.search_tweets("flood OR wildfire", limit=100)
+
+    assert len(evac) == 15
+    assert len(either) == 30
+
+def test_pages_match_single_read(database):
+    full, cursor = database.search_tweets("flood OR evac*", limit=100)
+    assert cursor is None
+
+    pages, cursor = [], None
+    while True:
+        page, cursor = database.search_tweets("flood OR evac*", limit=7, cursor=cursor)
+        pages.append(page)
+        if cursor is None:
+            break
+
+    assert pd.concat(pages)['id'].tolist() == full['id'].tolist()
+
+def test_partitioned_results_newest_first(load_database, make_tweets, now):
+    db = load_database('daily')
+    times = [now - timedelta(days=i) for i in range(4)]
+    # The oldest tweet is the best match, but days are not ranked against each other
+    texts = ["flood", "flood warning issued", "flood warning for the river", "flood flood flood"]
+    db.save_tweets(make_tweets(times, texts))
+
+    results, _ = db.search_tweets("flood", limit=10)
+
+    assert not db.SEARCH_BY_SCORE
+    assert results['created_at'].is_monotonic_decreasing
+    assert len(results) == 4
+
+def test_invalid_cursor(database):
+    with pytest.raises(ValueError):
+        database.search_tweets("flood", cursor="not-a-cursor")
+
+def test_search_order_follows_partitioning_downgrade(load_database, make_tweets, monkeypatch, now):
+    db = load_database('none')
+    db.save_tweets(make_tweets([now - timedelta(days=1), now], ["flood flood flood", "flood warning"]))
+
+    # As if TWEET_PARTITIONING=daily on PostgreSQL found a tweets table created without partitions
+    monkeypatch.setattr(db, 'PARTITIONED', True)
+    monkeypatch.setattr(db, 'NATIVE_PARTITIONING', True)
+    # Start from a value that disagrees with the downgraded flags to see it recomputed
+    monkeypatch.setattr(db, 'SEARCH_BY_SCORE', False)
+    monkeypatch.setattr(db, '_is_partitioned_table', lambda conn: False)
+    db.init_db()
+
+    assert (db.PARTITIONED, db.NATIVE_PARTITIONING, db.SEARCH_BY_SCORE) == (False, False, True)
+
+    # Searches are ranked by relevance again, also in queries built without an explicit order
+    default_query = db.tweet_search_query("flood", 'sqlite')
+    assert str(default_query) == str(db.tweet_search_query("flood", 'sqlite', by_score=True))
+    results, cursor = db.search_tweets("flood", limit=1)
+    assert results['id'].tolist() == ['0']
+    assert len(db._decode_cursor(cursor)) == 3
@@ -0,0 +1,30 @@
+from datetime import timedelta
+import pytest
+
+@pytest.fixture
+def database(database, make_tweets, now):
+    database.save_tweets(make_tweets([now - timedelta(days=i) for i in range(3)], disaster_type='Flood'))
+    database.save_tweets(make_tweets([now - timedelta(days=i) for i in range(2)], disaster_type='Wildfire',
+                                     sentiment='positive', start_id=10))
+    return database
+
+def test_stats_totals_per_dimension(database):
+    stats = database.get_tweet_stats(use_cache=False)
+
+    assert stats['total'] == 5
+    assert stats['disaster_type'] == {'Flood': 3, 'Wildfire': 2}
+    assert stats['sentiment'] == {'negative': 3, 'positive': 2}
+    assert stats['disaster_impact'] == {'moderate': 5}
+    assert len(stats['groups']) == 2
+
+def test_stats_time_range(database, now):
+    stats = database.get_tweet_stats(time_range=(now - timedelta(hours=12), None), use_cache=False)
+
+    assert stats['total'] == 2
+
+def test_stats_cache_invalidated_by_save(database, make_tweets, now):
+    assert database.get_tweet_stats()['total'] == 5
+
+    database.save_tweets(make_tweets([now], start_id=20))
+
+    assert database.get_tweet_stats()['total'] == 6
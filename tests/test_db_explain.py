@@ -0,0 +1,51 @@
+import sys
+import importlib
+from datetime import timedelta
+import pytest
+
+@pytest.fixture
+def db_explain(database, make_tweets, now):
+    database.save_tweets(make_tweets([now - timedelta(hours=i) for i in range(50)]))
+
+    # db_explain binds the database module's engine when imported
+    sys.modules.pop('db_explain', None)
+    module = importlib.import_module('db_explain')
+    yield module
+    sys.modules.pop('db_explain', None)
+
+def test_queries_use_indexes(db_explain):
+    with db_explain.engine.connect() as conn:
+        source = db_explain.tweet_sources(conn)[0]
+
+    report = db_explain.run_checks(db_explain.build_queries(source))
+
+    assert set(report) >= {'recent tweets', 'tweets by type and time', 'search', 'retention delete'}
+    assert {name: result['full_scans'] for name, result in report.items() if result['full_scans']} == {}
+
+def test_full_scans_detected(db_explain):
+    plan = ["SCAN tweets", "SEARCH tweets USING INDEX ix_tweets_created_at (created_at>?)",
+            "SCAN tweets USING COVERING INDEX ix_tweets_disaster_type_created_at",
+            "SCAN tweets USING INDEX ix_tweets_disaster_type_created_at",
+            "SCAN tweets_fts VIRTUAL TABLE INDEX 0:M3", "SCAN tweets_fts VIRTUAL TABLE INDEX 0:"]
+
+    assert db_explain.find_full_scans(plan, 'sqlite') == [
+        "SCAN tweets", "SCAN tweets USING INDEX ix_tweets_disaster_type_created_at", "SCAN tweets_fts VIRTUAL TABLE INDEX 0:"
+    ]
+    assert db_explain.find_full_scans(["Seq Scan on tweets", "Index Scan using ix"], 'postgresql') == ["Seq Scan on tweets"]
+
+def test_limited_index_scan_in_order_not_flagged(db_explain):
+    ordered = ["SCAN tweets USING INDEX ix_tweets_created_at"]
+    sorted_after = ordered + ["USE TEMP B-TREE FOR ORDER BY"]
+
+    assert db_explain.find_full_scans(ordered, 'sqlite', limited=True) == []
+    assert db_explain.find_full_scans(ordered, 'sqlite') == ordered
+    assert db_explain.find_full_scans(sorted_after, 'sqlite', limited=True) == ordered
+
+def test_report_marks_full_scans(db_explain):
+    report = {'good': {'plan': ['SEARCH t'], 'full_scans': []}, 'bad': {'plan': ['SCAN t'], 'full_scans': ['SCAN t']}}
+
+    text = db_explain.format_report(report)
+
+    assert "bad [FULL SCAN]" in text
+    assert "good [ok]" in text
+    assert text.endswith("1 of 2 queries scan a full table: bad")
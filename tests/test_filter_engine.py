@@ -0,0 +1,56 @@
+import pandas as pd
+import pytest
+from filter_engine import keyword_mask, query_mask, compile_keywords
+from data_processor import filter_by_keywords
+
+TWEETS = pd.DataFrame({
+    'text': [
+        "Learning C++ while the FLOOD waters rise",
+        "Evacuation (flood) zone A.B is closed",
+        "aXb marks the spot, cpp is not c++",
+        "Fire spreading near the ridge",
+        None,
+        "Hurricane İrma-style winds, stay safe",
+        "Flooding in town",
+    ],
+    'username': ['coder', 'cityalerts', 'x', 'ranger', 'ghost', 'storm', 'Flood_Watcher'],
+    'hashtags': [['Code'], ['Flood'], [], ['Wildfire'], None, ['HurricaneIrma'], ['FLOODS']],
+}, index=[10, 11, 12, 13, 14, 15, 16])
+
+def test_metacharacters_matched_literally():
+    assert keyword_mask(TWEETS, ['c++']).tolist() == [True, False, True, False, False, False, False]
+    assert keyword_mask(TWEETS, ['(flood)']).tolist() == [False, True, False, False, False, False, False]
+    # As a regex "a.b" would also match "aXb"
+    assert keyword_mask(TWEETS, ['a.b']).tolist() == [False, True, False, False, False, False, False]
+    assert keyword_mask(TWEETS, ['[', '*', '?']).sum() == 0
+
+def test_filter_by_keywords_literal():
+    assert filter_by_keywords(TWEETS, ['c++', 'a.b']).index.tolist() == [10, 11, 12]
+    assert filter_by_keywords(TWEETS, []).equals(TWEETS)
+    assert filter_by_keywords(TWEETS.iloc[:0], ['flood']).empty
+
+def test_case_insensitive():
+    assert keyword_mask(TWEETS, ['FLOOD']).equals(keyword_mask(TWEETS, ['flood']))
+    assert keyword_mask(TWEETS, ['Flood']).tolist() == [True, True, False, False, False, False, True]
+    assert keyword_mask(TWEETS, ['floods'], columns=['hashtags']).tolist() == [False] * 6 + [True]
+
+@pytest.mark.parametrize("keywords", [['flood'], ['fire', 'safe'], ['the', 'zone', 'hurricane'], ['missing']])
+def test_plain_words_match_str_contains(keywords):
+    expected = TWEETS['text'].str.contains('|'.join(keywords), case=False, regex=True, na=False)
+
+    assert keyword_mask(TWEETS, keywords).equals(expected)
+
+def test_mask_aligned_with_index():
+    mask = keyword_mask(TWEETS, ['ridge'])
+
+    assert mask.index.equals(TWEETS.index)
+    assert TWEETS[mask].index.tolist() == [13]
+
+def test_query_mask_searches_text_username_and_hashtags():
+    assert query_mask(TWEETS, 'flood').tolist() == [True, True, False, False, False, False, True]
+    assert query_mask(TWEETS, 'wildfire').tolist() == [False, False, False, True, False, False, False]
+    assert query_mask(TWEETS, 'CODER').tolist() == [True] + [False] * 6
+
+def test_empty_keywords():
+    assert compile_keywords(('', None)) is None
+    assert not keyword_mask(TWEETS, ['']).any()
@@ -0,0 +1,71 @@
+import pytest
+import pandas as pd
+import geocoder
+from geocoder import geocode, geocode_series, load_gazetteer, load_regions
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    """Keep the persistent cache in a temporary directory."""
+    monkeypatch.setattr(geocoder, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(geocoder, "GEOCODE_CACHE_FILE", str(tmp_path / "geocode_cache.json"))
+    geocoder.clear_geocode_cache()
+    yield
+    geocoder.clear_geocode_cache()
+
+def centroid(name):
+    regions, _ = load_regions()
+    return regions[name][1]
+
+def test_city_with_matching_state():
+    assert geocode("Portland, OR") == load_gazetteer()["portland or"]
+    assert geocode("Portland, Oregon") == load_gazetteer()["portland or"]
+    assert geocode("Houston, Texas, USA") == load_gazetteer()["houston"]
+
+@pytest.mark.parametrize("location, region", [
+    ("Portland, ME", "maine"),
+    ("Portland, Maine", "maine"),
+    ("Columbus, GA", "georgia"),
+    ("Birmingham, England", "united kingdom"),
+    ("Somewhere, Texas", "texas"),
+])
+def test_region_suffix_overrides_bare_city(location, region):
+    assert geocode(location) == centroid(region)
+
+def test_bare_city_without_region():
+    assert geocode("Portland") == load_gazetteer()["portland"]
+    assert geocode("Columbus, Downtown") == load_gazetteer()["columbus"]
+
+def test_unknown_location():
+    assert geocode("Middle of nowhere") is None
+    assert geocode("") is None
+
+def test_persistent_cache_is_capped(monkeypatch):
+    monkeypatch.setattr(geocoder, "GEOCODE_CACHE_MAX_ENTRIES", 2)
+    geocode_series(pd.Series(["Miami, FL", "Portland, ME", "Columbus, GA"]))
+
+    assert list(geocoder._persistent_cache) == ["Portland, ME", "Columbus, GA"]
+
+def test_persistent_cache_trimmed_in_batches(monkeypatch):
+    monkeypatch.setattr(geocoder, "GEOCODE_CACHE_MAX_ENTRIES", 20)
+    locations = [f"Nowhere {i}" for i in range(24)]
+
+    # Up to 10% over the cap is kept until the next save
+    for location in locations[:22]:
+        geocode(location)
+    assert len(geocoder._persistent_cache) == 22
+
+    geocode(locations[22])
+    assert list(geocoder._persistent_cache) == locations[3:23]
+
+    geocode(locations[23])
+    assert geocoder.save_geocode_cache()
+    assert list(geocoder._persistent_cache) == locations[4:]
+
+def test_cache_written_only_when_changed(monkeypatch):
+    geocode_series(pd.Series(["Miami, FL"]))
+    assert not geocoder._persistent_dirty
+
+    writes = []
+    monkeypatch.setattr(geocoder.json, "dump", lambda *args, **kwargs: writes.append(args))
+    assert geocoder.save_geocode_cache()
+    assert writes == []
@@ -0,0 +1,131 @@
+import time
+import threading
+import pandas as pd
+from ingest_queue import WriteBehindQueue, _Request
+
+def make_frame(ids):
+    return pd.DataFrame({'id': [str(i) for i in ids], 'text': ['flood'] * len(ids)})
+
+class FlakyWriter:
+    """Write function that raises for its first failures calls."""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.calls = 0
+        self.saved = []
+
+    def __call__(self, df):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RuntimeError("database is locked")
+        self.saved.extend(df['id'])
+        return len(df)
+
+def make_queue(writer, **kwargs):
+    options = dict(retention_fn=lambda days: 0, batch_size=1000, flush_interval=60, retry_delay=0)
+    options.update(kwargs)
+    return WriteBehindQueue(write_fn=writer, **options)
+
+def test_frames_written_in_one_batch_on_flush():
+    writer = FlakyWriter()
+    writer_queue = make_queue(writer)
+
+    assert writer_queue.put(make_frame([1, 2]))
+    assert writer_queue.put(make_frame([3]))
+    assert writer_queue.flush(timeout=5)
+
+    assert writer.calls == 1
+    assert writer.saved == ['1', '2', '3']
+    assert writer_queue.metrics()['saved_rows'] == 3
+    assert writer_queue.close(timeout=5)
+
+def test_failed_write_is_retried():
+    writer = FlakyWriter(failures=2)
+    writer_queue = make_queue(writer, max_retries=3)
+
+    writer_queue.put(make_frame([1, 2]))
+    assert writer_queue.flush(timeout=5)
+
+    metrics = writer_queue.metrics()
+    assert writer.saved == ['1', '2']
+    assert metrics['failed_flushes'] == 2
+    assert metrics['flushes'] == 1
+    assert metrics['dropped_rows'] == 0
+    assert metrics['pending_rows'] == 0
+    writer_queue.close(timeout=5)
+
+def test_batch_dropped_after_last_retry():
+    writer = FlakyWriter(failures=10)
+    writer_queue = make_queue(writer, max_retries=2)
+
+    writer_queue.put(make_frame([1, 2, 3]))
+    assert not writer_queue.flush(timeout=5)
+
+    metrics = writer_queue.metrics()
+    assert writer.calls == 3
+    assert metrics['failed_flushes'] == 3
+    assert metrics['dropped_rows'] == 3
+    assert metrics['pending_rows'] == 0
+
+    # The writer keeps going after a dropped batch
+    writer.failures = 0
+    writer_queue.put(make_frame([4]))
+    assert writer_queue.flush(timeout=5)
+    assert writer.saved == ['4']
+    writer_queue.close(timeout=5)
+
+def test_put_rejected_after_close():
+    writer = FlakyWriter()
+    writer_queue = make_queue(writer)
+
+    writer_queue.put(make_frame([1]))
+    assert writer_queue.close(timeout=5)
+    assert writer.saved == ['1']
+    assert not writer_queue.put(make_frame([2]))
+
+def test_flush_and_close_time_out_on_full_queue():
+    release = threading.Event()
+    writer = FlakyWriter()
+    writer_queue = make_queue(lambda df: release.wait() and writer(df), max_frames=1, batch_size=1)
+
+    # The writer blocks on the first frame; the second fills the queue
+    assert writer_queue.put(make_frame([1]))
+    deadline = time.monotonic() + 5
+    while writer_queue.metrics()['pending_rows'] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert writer_queue.put(make_frame([2]))
+
+    assert not writer_queue.put(make_frame([3]), timeout=0.05)
+    assert not writer_queue.flush(timeout=0.05)
+    assert not writer_queue.close(timeout=0.05)
+
+    release.set()
+    assert writer_queue.flush(timeout=5)
+    assert writer.saved == ['1', '2']
+
+def test_failed_concat_does_not_stop_the_writer(monkeypatch):
+    writer = FlakyWriter()
+    writer_queue = make_queue(writer)
+
+    def fail_concat(*args, **kwargs):
+        raise ValueError("cannot combine frames")
+
+    monkeypatch.setattr(pd, 'concat', fail_concat)
+    writer_queue.put(make_frame([1]))
+    writer_queue.put(make_frame([2]))
+    assert not writer_queue.flush(timeout=5)
+    assert writer_queue._thread.is_alive()
+    assert writer_queue.metrics()['dropped_rows'] == 2
+
+    writer_queue.put(make_frame([3]))
+    assert writer_queue.flush(timeout=5)
+    assert writer.saved == ['3']
+    assert writer_queue.close(timeout=5)
+
+def test_put_rejected_when_writer_stopped():
+    writer_queue = make_queue(FlakyWriter())
+    writer_queue._queue.put(_Request(stop=True))
+    writer_queue._thread.join(5)
+
+    assert not writer_queue.put(make_frame([1]))
+    assert writer_queue.metrics()['rejected_frames'] == 1
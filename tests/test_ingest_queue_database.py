@@ -0,0 +1,58 @@
+import time
+from datetime import timedelta
+import pandas as pd
+import pytest
+from ingest_queue import WriteBehindQueue
+
+def test_save_tweets_raises_on_request(load_database):
+    db = load_database()
+    broken = pd.DataFrame({'id': ['1'], 'text': ['Storm'], 'created_at': ['not a time']})
+
+    assert db.save_tweets(broken) == 0
+    with pytest.raises(Exception):
+        db.save_tweets(broken, raise_errors=True)
+    assert db.get_tweet_count() == 0
+
+def test_queued_tweets_saved_to_database(load_database, make_tweets, now):
+    db = load_database()
+    writer_queue = WriteBehindQueue(batch_size=1000, flush_interval=60)
+
+    writer_queue.put(make_tweets([now - timedelta(minutes=i) for i in range(5)]))
+    writer_queue.put(make_tweets([now - timedelta(minutes=i) for i in range(8)]))
+    assert writer_queue.close(timeout=10)
+
+    metrics = writer_queue.metrics()
+    assert db.get_tweet_count() == 8
+    assert metrics['saved_rows'] == 8
+    assert metrics['flushes'] == 1
+
+def test_failed_database_write_counted(load_database, make_tweets, now):
+    db = load_database()
+    writer_queue = WriteBehindQueue(batch_size=1000, flush_interval=60, max_retries=1, retry_delay=0)
+
+    writer_queue.put(pd.DataFrame({'id': ['1'], 'text': ['Storm'], 'created_at': ['not a time']}))
+    assert not writer_queue.flush(timeout=10)
+
+    metrics = writer_queue.metrics()
+    assert metrics['failed_flushes'] == 2
+    assert metrics['dropped_rows'] == 1
+
+    # Later batches are still written
+    writer_queue.put(make_tweets([now]))
+    assert writer_queue.close(timeout=10)
+    assert db.get_tweet_count() == 1
+
+def test_writer_runs_retention(load_database, make_tweets, now):
+    db = load_database()
+    db.save_tweets(make_tweets([now - timedelta(days=40), now]))
+    writer_queue = WriteBehindQueue(retention_days=30, retention_interval=0.01, flush_interval=60)
+
+    writer_queue.put(make_tweets([now], start_id=10))
+    deadline = time.monotonic() + 10
+    while writer_queue.metrics()['retention_runs'] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert writer_queue.close(timeout=10)
+
+    assert writer_queue.metrics()['retention_runs'] >= 1
+    assert writer_queue.metrics()['deleted_rows'] == 1
+    assert db.get_tweet_count() == 2
@@ -0,0 +1,60 @@
+import os
+import pytest
+import nltk
+import nltk_resources
+import import_budget
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.fixture
+def fresh_resources():
+    for function in (nltk_resources.has_resource, nltk_resources.get_vader_analyzer, nltk_resources.get_stopwords):
+        function.cache_clear()
+    yield
+    for function in (nltk_resources.has_resource, nltk_resources.get_vader_analyzer, nltk_resources.get_stopwords):
+        function.cache_clear()
+
+@pytest.mark.parametrize("module", ["sentiment_analyzer", "trend_analyzer"])
+def test_import_does_not_load_nltk(module, monkeypatch):
+    monkeypatch.chdir(ROOT)
+
+    assert import_budget.measure_import_time(module, runs=1)["eager"] == []
+
+def test_resource_found_only_on_first_use(fresh_resources, monkeypatch):
+    lookups = []
+    find = nltk.data.find
+    monkeypatch.setattr(nltk.data, "find", lambda path: lookups.append(path) or find(path))
+
+    first = nltk_resources.get_vader_analyzer()
+    # The analyzer loads its lexicon from inside the resource found first
+    assert lookups[0] == "sentiment/vader_lexicon.zip"
+    found = list(lookups)
+
+    assert nltk_resources.get_vader_analyzer() is first
+    assert nltk_resources.has_resource("vader_lexicon")
+    assert lookups == found
+
+def test_missing_resource_without_download(fresh_resources, monkeypatch):
+    downloads = []
+    monkeypatch.delenv("NLTK_AUTO_DOWNLOAD", raising=False)
+    monkeypatch.setattr(nltk, "download", lambda *args, **kwargs: downloads.append(args))
+
+    assert nltk_resources.has_resource("no_such_resource") is False
+    assert downloads == []
+
+def test_missing_resource_downloads_once_when_allowed(fresh_resources, monkeypatch):
+    downloads = []
+    monkeypatch.setenv("NLTK_AUTO_DOWNLOAD", "1")
+    monkeypatch.setattr(nltk, "download", lambda name, quiet=False: downloads.append(name) or True)
+
+    assert nltk_resources.has_resource("no_such_resource") is True
+    assert nltk_resources.has_resource("no_such_resource") is True
+    assert downloads == ["no_such_resource"]
+
+def test_import_budgets(monkeypatch):
+    monkeypatch.chdir(ROOT)
+
+    results = import_budget.check_import_budgets(runs=1)
+
+    assert [result["module"] for result in results] == list(import_budget.IMPORT_BUDGETS_MS)
+    assert [result for result in results if not result["ok"]] == []
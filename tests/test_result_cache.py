@@ -0,0 +1,37 @@
+import result_cache
+from result_cache import ResultCache, make_key
+
+def test_key_depends_on_method_and_text():
+    assert make_key("flood", "vader") == make_key("flood", "vader")
+    assert make_key("flood", "vader") != make_key("flood", "textblob")
+    assert make_key("flood", "vader") != make_key("fire", "vader")
+
+def test_key_changes_with_cache_version(monkeypatch):
+    key = make_key("flood", "vader")
+    monkeypatch.setattr(result_cache, "CACHE_VERSION", result_cache.CACHE_VERSION + 1)
+
+    assert make_key("flood", "vader") != key
+
+def test_lru_eviction():
+    cache = ResultCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()['evictions'] == 1
+
+def test_disk_tier_misses_after_version_bump(tmp_path, monkeypatch):
+    path = str(tmp_path / "results.sqlite")
+    cache = ResultCache(maxsize=10, path=path)
+    cache.put(make_key("flood", "vader"), ("negative", -0.5))
+    cache.close()
+
+    reopened = ResultCache(maxsize=10, path=path)
+    assert reopened.get(make_key("flood", "vader")) == ("negative", -0.5)
+
+    monkeypatch.setattr(result_cache, "CACHE_VERSION", result_cache.CACHE_VERSION + 1)
+    assert reopened.get(make_key("flood", "vader")) is None
+    reopened.close()
@@ -0,0 +1,136 @@
+import random
+import pandas as pd
+import pytest
+from search_index import InvertedIndex, parse_query
+from text_normalizer import tokenize
+
+TWEETS = pd.DataFrame({
+    'text': [
+        "Flood rescue teams deployed downtown",
+        "Wildfire evacuation ordered for the valley",
+        "Evacuees reach the flood shelter",
+        "Rescue boats needed, flooding everywhere",
+        None,
+        "Fire crews contain the blaze",
+    ],
+    'username': ['RedCross', 'calfire', 'redcross', 'boater', 'ghost', 'CalFire'],
+    'hashtags': [['FloodWatch'], ['Wildfire', 'Evac'], [], ['Flood'], None, ['wildfire']],
+})
+
+@pytest.fixture
+def index():
+    return InvertedIndex.from_frame(TWEETS)
+
+def test_and_query(index):
+    assert index.search("flood rescue").tolist() == [0, 3]
+    assert index.search("the").tolist() == [1, 2, 5]
+    assert index.search("flood nothing").tolist() == []
+
+def test_or_query(index):
+    assert index.search("shelter OR blaze").tolist() == [2, 5]
+    assert index.search("flood rescue OR fire").tolist() == [0, 3, 5]
+    assert index.search("OR").tolist() == []
+
+def test_prefix_query(index):
+    assert index.search("evac*").tolist() == [1, 2]
+    assert index.search("flood*").tolist() == [0, 2, 3]
+    assert index.search("res* boat*").tolist() == [3]
+
+def test_field_queries(index):
+    assert index.search("#wildfire").tolist() == [1, 5]
+    assert index.search("@redcross").tolist() == [0, 2]
+    assert index.search("@calfire fire").tolist() == [5]
+    # Hashtags are plain words too; usernames are not
+    assert index.search("floodwatch").tolist() == [0]
+    assert index.search("boater").tolist() == []
+
+def test_parse_query():
+    assert parse_query("Flood evac* OR #Wild-Fire @Red_Cross") == [
+        [('text', 'flood', False), ('text', 'evac', True)],
+        [('hashtags', 'wildfire', False), ('username', 'red_cross', False)]
+    ]
+
+def test_drop_first_keeps_positions_aligned(index):
+    index.drop_first(2)
+
+    assert len(index) == 4
+    assert index.search("flood*").tolist() == [0, 1]
+    assert index.search("@redcross").tolist() == [0]
+    assert index.search("evac*").tolist() == [0]
+
+    index.drop_first(10)
+    assert len(index) == 0
+    assert index.search("fire").tolist() == []
+
+def test_add_after_drop(index):
+    index.drop_first(3)
+    index.add(TWEETS.iloc[:2])
+
+    assert len(index) == 5
+    assert index.search("rescue").tolist() == [0, 3]
+    assert index.search("evac*").tolist() == [4]
+
+def search_by_scan(df, query):
+    """Answer a query by checking every row, as the reference for the index."""
+    rows = []
+    for position, (text, username, tags) in enumerate(zip(df['text'], df['username'], df['hashtags'])):
+        fields = {
+            'text': set(tokenize(text or '')) | {tag.lower() for tag in tags or []},
+            'hashtags': {tag.lower() for tag in tags or []},
+            'username': {username.lower()}
+        }
+        if any(all(any(value == token or (prefix and value.startswith(token)) for value in fields[field])
+                   for field, token, prefix in group) for group in parse_query(query)):
+            rows.append(position)
+    return rows
+
+def test_compaction_keeps_postings_consistent():
+    rng = random.Random(7)
+    words = ["flood", "fire", "rescue", "shelter", "evacuate", "storm", "power", "road"]
+    index = InvertedIndex()
+    compactions = []
+    compact = index._compact
+    index._compact = lambda: compactions.append(len(index)) or compact()
+    frame = TWEETS.iloc[:0]
+    queries = ["flood", "fire OR storm", "res* shelter", "#tag3", "@user2", "evac* OR power road"]
+
+    for step in range(60):
+        new = pd.DataFrame({
+            'text': [" ".join(rng.sample(words, 3)) for _ in range(rng.randint(1, 6))],
+        })
+        new['username'] = [f"user{rng.randint(0, 4)}" for _ in range(len(new))]
+        new['hashtags'] = [[f"Tag{rng.randint(0, 5)}"] for _ in range(len(new))]
+        index.add(new)
+        frame = pd.concat([frame, new], ignore_index=True)
+
+        dropped = rng.randint(0, len(frame) - 1)
+        index.drop_first(dropped)
+        frame = frame.iloc[dropped:].reset_index(drop=True)
+
+        assert len(index) == len(frame)
+        for query in queries:
+            assert index.search(query).tolist() == search_by_scan(frame, query), (step, query)
+
+    # Compaction ran and left only ids of rows still indexed or dropped since
+    assert compactions
+    assert index._dropped_since_compaction <= len(index)
+    for postings in index._postings.values():
+        for ids in postings.values():
+            assert ids == sorted(ids)
+            assert ids and ids[-1] < index._next_id
+
+def test_compaction_prunes_dropped_ids(index):
+    index.drop_first(4)
+
+    assert index._dropped_since_compaction == 0
+    assert all(ids[0] >= 4 for postings in index._postings.values() for ids in postings.values())
+    assert 'shelter' not in index._postings['text']
+    assert index.search("fire").tolist() == [1]
+
+def test_clear(index):
+    index.clear()
+
+    assert len(index) == 0
+    assert index.search("flood").tolist() == []
+    assert index.add(TWEETS.iloc[:1]) == 1
+    assert index.search("flood").tolist() == [0]
@@ -0,0 +1,185 @@
+import pytest
+import sentiment_analyzer
+from result_cache import ResultCache, make_key
+from sentiment_analyzer import (
+    IMPACT_CACHE_METHOD, IMPACT_KEYWORD_LEVELS, _impact_cache_method,
+    analyze_disaster_impact, analyze_disaster_impact_batch,
+    analyze_sentiment, analyze_sentiment_batch, get_scorer_names
+)
+
+SENTIMENT_TEXTS = [
+    "RT @fema: Shelters are OPEN and safe, thank you volunteers! #HurricaneRelief https://t.co/x1",
+    "Terrible flooding, homes destroyed and people missing :(",
+    "Road closed near the bridge",
+    "",
+    None,
+    float("nan"),
+    42,
+    "   ",
+    "!!!",
+    "Terrible flooding, homes destroyed and people missing :(",
+    "Not bad at all, the rescue teams are doing great",
+]
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    cache = ResultCache(maxsize=1000)
+    monkeypatch.setattr(sentiment_analyzer, "result_cache", cache)
+    return cache
+
+def test_impact_levels():
+    assert analyze_disaster_impact("Deadly storm leaves town in crisis") == "severe"
+    assert analyze_disaster_impact("Power outage across the county") == "moderate"
+    assert analyze_disaster_impact("Fire is now contained") == "minor"
+    assert analyze_disaster_impact("Nice weather today") == "unknown"
+
+def test_batch_matches_single():
+    texts = ["Massive flooding downtown", "Minor damage reported", "", None, "Massive flooding downtown"]
+
+    assert list(analyze_disaster_impact_batch(texts)) == ["severe", "moderate", "unknown", "unknown", "severe"]
+
+def test_keyword_change_changes_cache_method():
+    levels = dict(IMPACT_KEYWORD_LEVELS)
+    levels["landslide"] = "severe"
+    assert _impact_cache_method(levels) != IMPACT_CACHE_METHOD
+
+    levels = dict(IMPACT_KEYWORD_LEVELS)
+    levels["deadly"] = "moderate"
+    assert _impact_cache_method(levels) != IMPACT_CACHE_METHOD
+
+    assert _impact_cache_method(dict(IMPACT_KEYWORD_LEVELS)) == IMPACT_CACHE_METHOD
+
+def test_results_cached_under_old_keywords_are_ignored(fresh_cache):
+    text = "massive flooding downtown"
+    # Before "massive" became a severe keyword this text was moderate at best
+    fresh_cache.put(make_key(text, "impact"), "unknown")
+
+    assert analyze_disaster_impact(text) == "severe"
+    assert list(analyze_disaster_impact_batch([text])) == ["severe"]
+
+@pytest.mark.parametrize("method", get_scorer_names())
+def test_batch_sentiment_matches_single(method, monkeypatch):
+    labels, scores = analyze_sentiment_batch(SENTIMENT_TEXTS, method=method)
+
+    # Score each text again without the results the batch cached
+    monkeypatch.setattr(sentiment_analyzer, "result_cache", ResultCache(maxsize=1000))
+    expected = [analyze_sentiment(text, method=method) for text in SENTIMENT_TEXTS]
+
+    assert list(zip(labels, scores)) == expected
+    assert [label for label, _ in expected[3:9]] == ["neutral"] * 6
+
+@pytest.fixture
+def process_pool():
+    yield
+    sentiment_analyzer.shutdown_process_pool()
+
+@pytest.mark.parametrize("method", ["cascade", "vader_array"])
+def test_parallel_scoring_matches_serial(method, process_pool, monkeypatch):
+    texts = [f"{word} conditions reported in zone {i}" for i, word in
+             enumerate(["Terrible", "Great", "Calm", "Awful", "Safe", "Dangerous", "Okay"] * 3)]
+    texts = texts + texts[::-1]
+
+    cascade_stats = {'calls': 0, 'fallbacks': 0}
+    monkeypatch.setattr(sentiment_analyzer, "_cascade_stats", cascade_stats)
+    labels, scores = analyze_sentiment_batch(texts, method=method, workers=2, chunk_size=4)
+    parallel_stats = dict(cascade_stats)
+    # A failed pool falls back to serial scoring and is shut down
+    assert sentiment_analyzer._process_pool is not None
+
+    monkeypatch.setattr(sentiment_analyzer, "result_cache", ResultCache(maxsize=1000))
+    cascade_stats.update(calls=0, fallbacks=0)
+    serial_labels, serial_scores = analyze_sentiment_batch(texts, method=method)
+
+    assert list(labels) == list(serial_labels)
+    assert list(scores) == list(serial_scores)
+    assert list(zip(labels, scores))[:3] == [analyze_sentiment(text, method=method) for text in texts[:3]]
+
+    # Worker counters are summed into the parent's statistics
+    assert parallel_stats == cascade_stats
+    if method == "cascade":
+        assert parallel_stats['calls'] == len(set(texts))
+        assert 0 < parallel_stats['fallbacks'] < parallel_stats['calls']
+
+@pytest.fixture
+def cascade_stats(monkeypatch):
+    stats = {'calls': 0, 'fallbacks': 0}
+    monkeypatch.setattr(sentiment_analyzer, "_cascade_stats", stats)
+    monkeypatch.setattr(sentiment_analyzer, "CASCADE_BAND", sentiment_analyzer.CASCADE_BAND)
+    return stats
+
+def test_cascade_paths(cascade_stats):
+    # VADER compound 0.2023 is inside the default band, 0.6249 and -0.8176 are outside
+    ambiguous, clear, negative = "we are fine", "hope everyone is ok", "Terrible flooding, homes destroyed"
+
+    assert analyze_sentiment(ambiguous, "cascade") == analyze_sentiment(ambiguous, "combined")
+    assert analyze_sentiment(clear, "cascade") == analyze_sentiment(clear, "vader")
+    assert analyze_sentiment(clear, "cascade") != analyze_sentiment(clear, "combined")
+    assert analyze_sentiment(negative, "cascade") == analyze_sentiment(negative, "vader")
+
+    assert sentiment_analyzer.get_cascade_stats() == {'calls': 3, 'fallbacks': 1, 'fallback_rate': 1 / 3}
+
+def test_cascade_batch_counts_distinct_texts(cascade_stats):
+    labels, _ = analyze_sentiment_batch(["we are fine", "hope everyone is ok", "we are fine", "", None], "cascade")
+
+    assert list(labels) == ["positive", "positive", "positive", "neutral", "neutral"]
+    assert cascade_stats == {'calls': 2, 'fallbacks': 1}
+
+    # Cached results are not scored again
+    analyze_sentiment_batch(["we are fine", "hope everyone is ok"], "cascade")
+    assert cascade_stats == {'calls': 2, 'fallbacks': 1}
+
+def test_cascade_band_changes_path(cascade_stats):
+    sentiment_analyzer.set_cascade_band(-0.7, 0.7)
+
+    assert analyze_sentiment("hope everyone is ok", "cascade") == analyze_sentiment("hope everyone is ok", "combined")
+    assert cascade_stats == {'calls': 1, 'fallbacks': 1}
+    assert sentiment_analyzer._cache_method("cascade") == "cascade:-0.7:0.7"
+
+    with pytest.raises(ValueError):
+        sentiment_analyzer.set_cascade_band(0.5, -0.5)
+
+def test_cascade_stats_without_calls(cascade_stats):
+    assert sentiment_analyzer.get_cascade_stats() == {'calls': 0, 'fallbacks': 0, 'fallback_rate': 0.0}
+
+@pytest.fixture
+def constant_scorer(monkeypatch):
+    scored = []
+    monkeypatch.setitem(sentiment_analyzer.SCORERS, "constant", lambda texts: scored.extend(texts) or [("positive", 0.5)] * len(texts))
+    return scored
+
+def test_registered_scorer_is_used(constant_scorer):
+    assert "constant" in get_scorer_names()
+    assert sentiment_analyzer.get_scorer("constant") is sentiment_analyzer.SCORERS["constant"]
+
+    assert analyze_sentiment("Water everywhere", "constant") == ("positive", 0.5)
+    labels, scores = analyze_sentiment_batch(["Water everywhere", "Roads closed", ""], "constant")
+
+    assert list(labels) == ["positive", "positive", "neutral"]
+    assert list(scores) == [0.5, 0.5, 0.0]
+    assert constant_scorer == ["water everywhere", "roads closed"]
+
+def test_register_text_scorer(monkeypatch):
+    monkeypatch.setattr(sentiment_analyzer, "SCORERS", dict(sentiment_analyzer.SCORERS))
+    sentiment_analyzer.register_text_scorer("length", lambda text: ("neutral", float(len(text))))
+
+    assert analyze_sentiment("Three words here", "length") == ("neutral", 16.0)
+
+def test_unknown_method_raises():
+    with pytest.raises(ValueError, match="no_such_method"):
+        sentiment_analyzer.get_scorer("no_such_method")
+    with pytest.raises(ValueError):
+        analyze_sentiment("Flooding downtown", "no_such_method")
+    with pytest.raises(ValueError):
+        analyze_sentiment_batch(["", None], "no_such_method")
+
+def test_process_tweets_dispatches_sentiment_method(constant_scorer):
+    from data_processor import process_tweets
+
+    tweets = [{'id': '1', 'text': 'Flooding downtown #help', 'created_at': '2024-05-01T10:00:00'}]
+
+    df = process_tweets(tweets, sentiment_method="constant")
+
+    assert df[['sentiment', 'sentiment_score']].values.tolist() == [['positive', 0.5]]
+    assert constant_scorer == ["flooding downtown"]
+    with pytest.raises(ValueError):
+        process_tweets(tweets, sentiment_method="no_such_method")
@@ -0,0 +1,43 @@
+import json
+import pandas as pd
+import pytest
+import sentiment_benchmark
+
+CORPUS = pd.DataFrame({
+    'text': ["Terrible flooding, homes destroyed", "Shelters are safe, thank you", "Road closed near the bridge"] * 4,
+    'label': ["negative", "positive", "neutral"] * 4
+})
+
+def test_run_benchmark():
+    report = sentiment_benchmark.run_benchmark(CORPUS, ["vader", "vader_array"], latency_sample=3)
+
+    assert set(report['scorers']) == {"vader", "vader_array"}
+    for metrics in report['scorers'].values():
+        assert set(metrics) == {'tweets_per_sec', 'p50_ms', 'p99_ms', 'accuracy'}
+        assert metrics['accuracy'] == 1.0
+    assert report['agreement']['vader']['vader_array'] == 1.0
+
+    text = sentiment_benchmark.format_report(report, len(CORPUS))
+    assert text.startswith("Corpus: 12 tweets")
+    assert "Label agreement" in text
+
+def test_load_labelled_corpus(tmp_path):
+    path = tmp_path / "corpus.csv"
+    pd.DataFrame({'text': ["Flood", None, "Fire"], 'sentiment': ["Negative", "neutral", "POSITIVE"]}).to_csv(path, index=False)
+
+    corpus = sentiment_benchmark.load_labelled_corpus(path)
+
+    assert corpus.to_dict('list') == {'text': ["Flood", "Fire"], 'label': ["negative", "positive"]}
+
+def test_main_with_mock_corpus(monkeypatch, capsys):
+    monkeypatch.setattr("sys.argv", ["sentiment_benchmark.py", "--mock", "20", "--scorers", "vader,cascade",
+                                     "--latency-sample", "3", "--json"])
+
+    assert sentiment_benchmark.main() == 0
+    assert set(json.loads(capsys.readouterr().out)['scorers']) == {"vader", "cascade"}
+
+def test_main_rejects_unknown_scorer(monkeypatch):
+    monkeypatch.setattr("sys.argv", ["sentiment_benchmark.py", "--mock", "5", "--scorers", "no_such_method"])
+
+    with pytest.raises(SystemExit):
+        sentiment_benchmark.main()
@@ -0,0 +1,77 @@
+import re
+import pandas as pd
+import pytest
+from sentiment_analyzer import clean_tweet
+from text_normalizer import normalize_text, normalize_tweet, normalize_series, strip_special_chars
+
+TWEETS = [
+    "RT @RedCross: Shelters open at https://t.co/abc123 #HurricaneIan #Relief",
+    "rt   @NWS  Flash flood WARNING until 9pm!!! www.weather.gov/alerts",
+    "Stay safe everyone 🙏🌊 #FloodWatch @CityOfHouston",
+    "Évacuation en cours près de la côte... #Séisme",
+    "Check http://news.example.com/a?b=1 and https://www.fema.gov/disaster now",
+    "Not a retweet: RT is only stripped at the start",
+    "@user1 @user2 water at my door 😱😱 #help#now",
+    "Mixed CASE Words and   extra\tspaces\n here",
+    "",
+]
+
+def legacy_clean_text(text):
+    """Tweet cleaning as done before text_normalizer, without stripping special characters."""
+    text = text.lower()
+    text = re.sub(r'https?://\S+|www\.\S+', '', text)
+    text = re.sub(r'@\w+', '', text)
+    text = re.sub(r'#\w+', '', text)
+    text = re.sub(r'^rt\s+', '', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+def legacy_domains(text):
+    domains = []
+    for url in re.findall(r'https?://(?:[-\w.]|(?:%[\da-fA-F]{2}))+', text):
+        domains.append(re.search(r'https?://(?:www\.)?([^/]+)', url).group(1).lower())
+    return domains
+
+@pytest.mark.parametrize("text", TWEETS)
+def test_normalize_text_matches_legacy_cleaning(text):
+    assert normalize_text(text) == legacy_clean_text(text)
+    assert clean_tweet(text) == re.sub(r'[^\w\s]', '', legacy_clean_text(text))
+    assert strip_special_chars(normalize_text(text)) == clean_tweet(text)
+
+@pytest.mark.parametrize("text", TWEETS)
+def test_entities_match_legacy_extraction(text):
+    _, entities = normalize_tweet(text)
+
+    assert entities['hashtags'] == [tag.lower() for tag in re.findall(r'#(\w+)', text)]
+    assert entities['mentions'] == [user.lower() for user in re.findall(r'@(\w+)', text)]
+    assert entities['domains'] == legacy_domains(text)
+
+def test_entities_examples():
+    clean, entities = normalize_tweet(TWEETS[0])
+
+    assert clean == ": shelters open at"
+    assert entities == {
+        'hashtags': ['hurricaneian', 'relief'],
+        'mentions': ['redcross'],
+        'domains': ['t.co'],
+        'tokens': ['shelters', 'open', 'at']
+    }
+    assert normalize_tweet(TWEETS[2])[0] == "stay safe everyone 🙏🌊"
+    assert normalize_tweet(TWEETS[4])[1]['domains'] == ['news.example.com', 'fema.gov']
+
+def test_normalize_series_matches_normalize_tweet():
+    texts = pd.Series(TWEETS + [None, float('nan'), TWEETS[0]], index=range(10, 10 + len(TWEETS) + 3))
+
+    result = normalize_series(texts)
+
+    assert result.index.equals(texts.index)
+    assert list(result.columns) == ['clean_text', 'hashtags', 'mentions', 'domains', 'tokens']
+    for text, row in zip(texts, result.itertuples(index=False)):
+        clean, entities = normalize_tweet(text if isinstance(text, str) else '')
+        assert row.clean_text == clean
+        assert (row.hashtags, row.mentions, row.domains, row.tokens) == (
+            entities['hashtags'], entities['mentions'], entities['domains'], entities['tokens']
+        )
+
+    # Repeated texts get their own lists, so editing one row leaves the other alone
+    result['hashtags'].iloc[0].append('edited')
+    assert result['hashtags'].iloc[-1] == ['hurricaneian', 'relief']
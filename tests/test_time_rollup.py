@@ -0,0 +1,44 @@
+import pandas as pd
+from time_rollup import TimeRollup
+
+def make_tweets(ids, times, sentiment='negative'):
+    return pd.DataFrame({
+        'id': ids,
+        'created_at': pd.to_datetime(times),
+        'sentiment': sentiment,
+        'disaster_type': 'Flood'
+    })
+
+def test_apply_skips_seen_tweets():
+    rollup = TimeRollup()
+    tweets = make_tweets(['1', '2'], ['2026-10-18 10:05', '2026-10-18 10:50'])
+
+    assert rollup.apply(tweets) == 2
+    assert rollup.apply(tweets) == 0
+
+    counts = rollup.counts('1h', by='sentiment')
+    assert counts['tweet_count'].tolist() == [2]
+    assert counts['negative'].tolist() == [2]
+
+def test_remove_subtracts_counts():
+    rollup = TimeRollup()
+    tweets = make_tweets(['1', '2'], ['2026-10-18 10:05', '2026-10-18 11:05'])
+    rollup.apply(tweets)
+
+    assert rollup.remove(tweets.iloc[:1]) == 1
+    assert rollup.counts('1h')['bucket'].tolist() == [pd.Timestamp('2026-10-18 11:00')]
+
+def test_evict_before_bounds_seen_ids():
+    rollup = TimeRollup()
+    rollup.apply(make_tweets(['old', 'early', 'late'], ['2026-10-17 08:00', '2026-10-18 10:05', '2026-10-18 10:45']))
+
+    rollup.evict_before(pd.Timestamp('2026-10-18 10:30'))
+
+    # The 10:00 hour is kept, so its tweets stay tracked; the day before is gone
+    assert len(rollup) == 2
+    assert rollup.counts('1h')['tweet_count'].tolist() == [2]
+    assert rollup.counts('1min')['tweet_count'].tolist() == [1]
+
+    # A tweet still counted in a kept bucket can be removed
+    assert rollup.remove(make_tweets(['early'], ['2026-10-18 10:05'])) == 1
+    assert rollup.counts('1h')['tweet_count'].tolist() == [1]
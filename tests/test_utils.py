@@ -0,0 +1,38 @@
+import pandas as pd
+from utils import keep_newest
+
+def make_tweets(ids, times):
+    return pd.DataFrame({'id': ids, 'created_at': pd.to_datetime(times)})
+
+def test_keep_newest_drops_oldest_rows():
+    # Stored tweets arrive newest first
+    df = make_tweets(['c', 'b', 'a'], ['2026-10-18 12:00', '2026-10-18 11:00', '2026-10-18 10:00'])
+
+    kept, dropped = keep_newest(df, 2)
+
+    assert list(kept['id']) == ['b', 'c']
+    assert list(dropped['id']) == ['a']
+
+def test_keep_newest_keeps_appended_order():
+    df = make_tweets(['a', 'b', 'c'], ['2026-10-18 10:00', '2026-10-18 11:00', '2026-10-18 12:00'])
+
+    kept, dropped = keep_newest(df, 2)
+
+    assert list(kept.index) == [1, 2]
+    assert list(dropped.index) == [0]
+
+def test_keep_newest_drops_undated_first():
+    df = make_tweets(['a', 'b', 'c'], ['2026-10-18 10:00', None, '2026-10-18 12:00'])
+
+    kept, dropped = keep_newest(df, 2)
+
+    assert list(kept['id']) == ['a', 'c']
+    assert list(dropped['id']) == ['b']
+
+def test_keep_newest_under_limit():
+    df = make_tweets(['a', 'b'], ['2026-10-18 11:00', '2026-10-18 10:00'])
+
+    kept, dropped = keep_newest(df, 5)
+
+    assert list(kept['id']) == ['b', 'a']
+    assert dropped.empty
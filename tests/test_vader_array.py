@@ -0,0 +1,56 @@
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from vader_array import CompiledVaderLexicon, get_compiled_lexicon
+
+TEXTS = [
+    "Massive flooding downtown, people are scared and need help",
+    "I don't like this storm at all",
+    "It is NOT good!!!",
+    "never so happy to see the rescue team",
+    "This is the least bad outcome",
+    "at least the shelter is open",
+    "Good good GOOD Good but the damage is bad",
+    "GREAT news, FEMA couldn't reach us",
+    "The flood isn't terrible??",
+    "kind of sad about the evacuation",
+    "wasn't good Good GoOd gOOD",
+    "HELP NEEDED NOW",
+    "",
+]
+
+@pytest.fixture
+def lexicon():
+    compiled = get_compiled_lexicon()
+    if compiled is None:
+        pytest.skip("VADER lexicon is not available")
+    return CompiledVaderLexicon(compiled.analyzer)
+
+def assert_matches_reference(lexicon, texts, scores):
+    for i, text in enumerate(texts):
+        expected = lexicon.analyzer.polarity_scores(text)
+        assert scores['compound'][i] == pytest.approx(expected['compound'], abs=1e-4), text
+        for name in ('neg', 'neu', 'pos'):
+            assert scores[name][i] == pytest.approx(expected[name], abs=1.001e-3), text
+
+def test_scores_match_polarity_scores(lexicon):
+    assert_matches_reference(lexicon, TEXTS, lexicon.polarity_scores_batch(TEXTS))
+
+def test_unknown_tokens_do_not_grow_the_vocabulary(lexicon):
+    lexicon.polarity_scores_batch(TEXTS)
+    size = len(lexicon.token_ids)
+
+    texts = [f"Shelter{i} at Location{i} REF{i} isn{i}'t open" for i in range(500)]
+    scores = lexicon.polarity_scores_batch(texts)
+
+    # "at" and "open" are the only new known words
+    assert len(lexicon.token_ids) <= size + 2
+    assert_matches_reference(lexicon, texts[:20], {name: values[:20] for name, values in scores.items()})
+
+def test_concurrent_batches(lexicon):
+    batches = [[f"{text} {word}" for text in TEXTS] for word in ("great", "AWFUL", "Sad", "calm", "LOVE", "hate")] * 4
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lexicon.polarity_scores_batch, batches))
+
+    for texts, scores in zip(batches, results):
+        assert_matches_reference(lexicon, texts, scores)
@@ -0,0 +1,122 @@
+"""
+This module provides the shared tweet text normalizer.
+It strips URLs, mentions, hashtags, the RT marker and extra whitespace with
+precompiled patterns and collects the entities it removes along the way, so
+sentiment analysis, tweet processing and trend analysis clean each tweet once.
+"""
+
+import re
+import pandas as pd
+
+# URLs, mentions and hashtags in one alternation. A mention or hashtag stops
+# before an embedded URL so the result matches removing URLs first.
+ENTITY_PATTERN = re.compile(
+    r'(?P<url>https?://\S+|www\.\S+)'
+    r'|(?P<entity>[@#](?:(?!https?://\S|www\.\S)\w)+)'
+)
+DOMAIN_PATTERN = re.compile(r'https?://(?:www\.)?((?:[-\w.]|%[\da-fA-F]{2})+)')
+RT_PATTERN = re.compile(r'^rt\s+')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+SPECIAL_CHAR_PATTERN = re.compile(r'[^\w\s]')
+TOKEN_PATTERN = re.compile(r"\w+(?:'\w+)*")
+
+ENTITY_COLUMNS = ['hashtags', 'mentions', 'domains', 'tokens']
+
+def normalize_tweet(text):
+    """
+    Clean tweet text and extract its entities in one pass.
+
+    Args:
+        text (str): The raw tweet text
+
+    Returns:
+        tuple: (clean_text, entities)
+               clean_text is lowercased text without URLs, mentions, hashtags,
+               RT marker and extra whitespace
+               entities is a dict with 'hashtags', 'mentions', 'domains' and
+               'tokens' lists (all lowercase)
+    """
+    hashtags = []
+    mentions = []
+    domains = []
+
+    def collect(match):
+        url = match.group('url')
+        if url:
+            domains.extend(domain.lower() for domain in DOMAIN_PATTERN.findall(url))
+        else:
+            entity = match.group('entity')
+            if entity[0] == '#':
+                hashtags.append(entity[1:])
+            else:
+                mentions.append(entity[1:])
+        return ''
+
+    clean_text = ENTITY_PATTERN.sub(collect, text.lower())
+    clean_text = RT_PATTERN.sub('', clean_text)
+    clean_text = WHITESPACE_PATTERN.sub(' ', clean_text).strip()
+
+    entities = {
+        'hashtags': hashtags,
+        'mentions': mentions,
+        'domains': domains,
+        'tokens': TOKEN_PATTERN.findall(clean_text)
+    }
+
+    return clean_text, entities
+
+def normalize_text(text):
+    """
+    Clean tweet text without keeping the extracted entities.
+
+    Args:
+        text (str): The raw tweet text
+
+    Returns:
+        str: Cleaned tweet text
+    """
+    return normalize_tweet(text)[0]
+
+def strip_special_chars(text):
+    """Remove punctuation and other non-word characters from normalized text."""
+    return SPECIAL_CHAR_PATTERN.sub('', text)
+
+def tokenize(text):
+    """
+    Split text into lowercase word tokens.
+
+    Args:
+        text (str): Text to tokenize
+
+    Returns:
+        list: Word tokens; contractions like "don't" stay one token
+    """
+    return TOKEN_PATTERN.findall(text.lower())
+
+def normalize_series(texts):
+    """
+    Normalize a Series of tweet texts, processing each distinct text once.
+
+    Args:
+        texts (pandas.Series or list): Raw tweet texts
+
+    Returns:
+        pandas.DataFrame: DataFrame aligned with the input with 'clean_text',
+                          'hashtags', 'mentions', 'domains' and 'tokens' columns;
+                          missing texts give an empty string and empty lists
+    """
+    if not isinstance(texts, pd.Series):
+        texts = pd.Series(list(texts), dtype=object)
+
+    normalized = {}
+    rows = []
+    for text in texts:
+        if not isinstance(text, str):
+            text = ''
+        if text not in normalized:
+            normalized[text] = normalize_tweet(text)
+
+        clean_text, entities = normalized[text]
+        rows.append((clean_text, *(list(entities[column]) for column in ENTITY_COLUMNS)))
+
+    return pd.DataFrame(rows, index=texts.index, columns=['clean_text'] + ENTITY_COLUMNS)
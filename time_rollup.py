@@ -0,0 +1,219 @@
+"""
+This module keeps incremental per-time-bucket tweet counts for the dashboard.
+A TimeRollup counts tweets by bucket, sentiment, impact and disaster type at
+several granularities. New tweets are applied as deltas (tweets already seen
+are skipped by id), late arrivals simply update their older bucket, and the
+charts read the counts instead of regrouping every tweet on each refresh.
+"""
+
+import logging
+import pandas as pd
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+# Bucket sizes kept by default, as pandas frequency strings
+DEFAULT_GRANULARITIES = ['1min', '5min', '1h']
+
+# Columns counted within each bucket
+DIMENSIONS = ['sentiment', 'disaster_impact', 'disaster_type']
+
+# Value counted for tweets missing a dimension column
+MISSING_VALUE = 'unknown'
+
+class TimeRollup:
+    """
+    Incremental tweet counts per time bucket and dimension values.
+
+    Counts are stored per granularity as a dict keyed by
+    (bucket, sentiment, disaster_impact, disaster_type), so applying a batch
+    only touches the buckets the batch falls into.
+    """
+
+    def __init__(self, granularities=None):
+        """
+        Initialize an empty rollup.
+
+        Args:
+            granularities (list, optional): pandas frequency strings such as
+                                            '1min', '5min' or '1h'
+        """
+        self.granularities = list(granularities or DEFAULT_GRANULARITIES)
+        self._counts = {granularity: {} for granularity in self.granularities}
+        self._seen = {}
+
+    @classmethod
+    def from_frame(cls, df, granularities=None):
+        """
+        Build a rollup from a DataFrame of tweets.
+
+        Args:
+            df (pandas.DataFrame): Tweets with a 'created_at' column
+            granularities (list, optional): pandas frequency strings
+
+        Returns:
+            TimeRollup: Rollup containing the tweets in df
+        """
+        rollup = cls(granularities)
+        rollup.apply(df)
+        return rollup
+
+    def __len__(self):
+        """Number of distinct tweets counted (tweets without an id are not tracked)."""
+        return len(self._seen)
+
+    def apply(self, df):
+        """
+        Add tweets to the rollup, skipping tweets that were already counted.
+
+        Args:
+            df (pandas.DataFrame): Tweets with a 'created_at' column and
+                                   optionally 'id' and the dimension columns
+
+        Returns:
+            int: Number of tweets added
+        """
+        rows = self._prepare(df)
+        if rows.empty:
+            return 0
+
+        if 'id' in rows.columns:
+            rows = rows.drop_duplicates(subset=['id'])
+            rows = rows[~rows['id'].isin(self._seen)]
+            self._seen.update(zip(rows['id'], rows['created_at']))
+
+        self._add(rows, 1)
+        return len(rows)
+
+    def remove(self, df):
+        """
+        Subtract previously applied tweets from the rollup.
+
+        Args:
+            df (pandas.DataFrame): Tweets to remove; only tweets whose id was
+                                   applied are subtracted
+
+        Returns:
+            int: Number of tweets removed
+        """
+        rows = self._prepare(df)
+        if rows.empty or 'id' not in rows.columns:
+            return 0
+
+        rows = rows.drop_duplicates(subset=['id'])
+        rows = rows[rows['id'].isin(self._seen)]
+        for tweet_id in rows['id']:
+            del self._seen[tweet_id]
+
+        self._add(rows, -1)
+        return len(rows)
+
+    def evict_before(self, cutoff):
+        """
+        Drop buckets that end at or before a cutoff time.
+
+        Tweets stay tracked while a kept bucket still counts them, so they
+        can be removed later.
+
+        Args:
+            cutoff (datetime): Buckets entirely older than this are dropped
+
+        Returns:
+            int: Number of bucket entries dropped across all granularities
+        """
+        cutoff = pd.Timestamp(cutoff)
+        dropped = 0
+        seen_cutoff = min(cutoff.floor(granularity) for granularity in self.granularities) if self.granularities else cutoff
+
+        for granularity, table in self._counts.items():
+            width = pd.tseries.frequencies.to_offset(granularity)
+            stale = [key for key in table if key[0] + width <= cutoff]
+            for key in stale:
+                del table[key]
+            dropped += len(stale)
+
+        self._seen = {tweet_id: created_at for tweet_id, created_at in self._seen.items()
+                      if created_at >= seen_cutoff}
+        return dropped
+
+    def clear(self):
+        """Remove all counts."""
+        self._counts = {granularity: {} for granularity in self.granularities}
+        self._seen = {}
+
+    def counts(self, granularity='1h', by=None, start=None, end=None, disaster_type=None, fill_gaps=False):
+        """
+        Read tweet counts per bucket.
+
+        Args:
+            granularity (str): One of the rollup's granularities
+            by (str, optional): Dimension to split counts into columns, e.g. 'sentiment'
+            start (datetime, optional): Only buckets starting at or after this time
+            end (datetime, optional): Only buckets starting at or before this time
+            disaster_type (str, optional): Only tweets of this disaster type ("All" for every type)
+            fill_gaps (bool): Include empty buckets between the first and last one
+
+        Returns:
+            pandas.DataFrame: 'bucket' and 'tweet_count' columns, plus one
+                              column per value of `by`, sorted by bucket
+        """
+        if granularity not in self._counts:
+            raise ValueError(f"Unknown granularity '{granularity}', expected one of {self.granularities}")
+        if by is not None and by not in DIMENSIONS:
+            raise ValueError(f"Unknown dimension '{by}', expected one of {DIMENSIONS}")
+
+        table = self._counts[granularity]
+        frame = pd.DataFrame(list(table), columns=['bucket'] + DIMENSIONS)
+        frame['count'] = list(table.values())
+
+        if start is not None:
+            frame = frame[frame['bucket'] >= pd.Timestamp(start)]
+        if end is not None:
+            frame = frame[frame['bucket'] <= pd.Timestamp(end)]
+        if disaster_type and disaster_type != "All":
+            frame = frame[frame['disaster_type'] == disaster_type]
+
+        result = frame.groupby('bucket')['count'].sum().rename('tweet_count').to_frame()
+        if by is not None:
+            split = frame.groupby(['bucket', by])['count'].sum().unstack(fill_value=0)
+            result = result.join(split)
+
+        if fill_gaps and not result.empty:
+            full_range = pd.date_range(result.index.min(), result.index.max(), freq=granularity)
+            result = result.reindex(full_range, fill_value=0)
+
+        result.index.name = 'bucket'
+        return result.reset_index().astype({'tweet_count': int})
+
+    def _prepare(self, df):
+        """Select the columns the rollup needs, with created_at as datetimes."""
+        if df is None or df.empty or 'created_at' not in df.columns:
+            return pd.DataFrame()
+
+        rows = pd.DataFrame({'created_at': pd.to_datetime(df['created_at'])}, index=df.index)
+        if 'id' in df.columns:
+            rows['id'] = df['id'].astype(str)
+        for dimension in DIMENSIONS:
+            if dimension in df.columns:
+                rows[dimension] = df[dimension].astype(object).fillna(MISSING_VALUE).astype(str)
+            else:
+                rows[dimension] = MISSING_VALUE
+
+        return rows.dropna(subset=['created_at'])
+
+    def _add(self, rows, sign):
+        """Add (sign=1) or subtract (sign=-1) rows from every granularity."""
+        if rows.empty:
+            return
+
+        for granularity, table in self._counts.items():
+            grouped = rows.assign(bucket=rows['created_at'].dt.floor(granularity)).groupby(
+                ['bucket'] + DIMENSIONS
+            ).size()
+
+            for key, count in grouped.items():
+                total = table.get(key, 0) + sign * count
+                if total > 0:
+                    table[key] = total
+                else:
+                    table.pop(key, None)
@@ -1,19 +1,11 @@
 import pandas as pd
-import re
 from collections import Counter
-import nltk
-from nltk.util import ngrams
 import logging
+from text_normalizer import normalize_series, tokenize
 
 # Initialize logger
 logger = logging.getLogger(__name__)
 
-# Try to download NLTK resources if needed
-try:
-    nltk.download('punkt', quiet=True)
-except Exception as e:
-    logger.warning(f"Failed to download NLTK punkt: {e}")
-
 def analyze_trends(df, top_n=10):
     """
     Analyze tweet data to identify trending topics, hashtags, and more.
@@ -93,10 +85,8 @@ def extract_hashtags(df):
     
     # If no pre-parsed hashtags or empty list, extract from text
     if not hashtags and 'text' in df.columns:
-        for text in df['text'].dropna():
-            # Extract hashtags using regex
-            tags = re.findall(r'#(\w+)', text)
-            hashtags.extend([tag.lower() for tag in tags])
+        for tags in normalize_series(df['text'].dropna())['hashtags']:
+            hashtags.extend(tags)
     
     return hashtags
 
@@ -122,10 +112,8 @@ def extract_mentions(df):
     
     # If no pre-parsed mentions or empty list, extract from text
     if not mentions and 'text' in df.columns:
-        for text in df['text'].dropna():
-            # Extract mentions using regex
-            users = re.findall(r'@(\w+)', text)
-            mentions.extend([user.lower() for user in users])
+        for users in normalize_series(df['text'].dropna())['mentions']:
+            mentions.extend(users)
     
     return mentions
 
@@ -151,7 +139,7 @@ def extract_terms(df):
         
         for text in df[text_col].dropna():
             # Tokenize and convert to lowercase
-            words = nltk.word_tokenize(text.lower())
+            words = tokenize(text)
             
             # Filter out stopwords and short words
             filtered_words = [
@@ -167,13 +155,15 @@ def extract_phrases(df):
     """Extract common phrases (bigrams and trigrams) from tweets."""
     phrases = []
     
+    from nltk.util import ngrams
+    
     # Use 'clean_text' if available, otherwise use 'text'
     text_col = 'clean_text' if 'clean_text' in df.columns else 'text'
     
     if text_col in df.columns:
         for text in df[text_col].dropna():
             # Tokenize and convert to lowercase
-            words = nltk.word_tokenize(text.lower())
+            words = tokenize(text)
             
             # Filter out non-alpha and short words
             filtered_words = [word for word in words if word.isalpha() and len(word) > 2]
@@ -196,16 +186,9 @@ def extract_domains(df):
     domains = []
     
     if 'text' in df.columns:
-        for text in df['text'].dropna():
-            # Extract URLs using regex
-            urls = re.findall(r'https?://(?:[-\w.]|(?:%[\da-fA-F]{2}))+', text)
-            
-            for url in urls:
-                # Extract domain from URL
-                domain_match = re.search(r'https?://(?:www\.)?([^/]+)', url)
-                if domain_match:
-                    domain = domain_match.group(1).lower()
-                    domains.append(domain)
+        # Domains are collected while the normalizer strips URLs
+        for urls in normalize_series(df['text'].dropna())['domains']:
+            domains.extend(urls)
     
     return domains
 
@@ -3,6 +3,7 @@ import json
 import os
 from datetime import datetime
 import logging
+from filter_engine import query_mask
 
 # Initialize logger
 logger = logging.getLogger(__name__)
@@ -11,13 +12,16 @@ logger = logging.getLogger(__name__)
 CACHE_DIR = "cache"
 CACHE_FILE = os.path.join(CACHE_DIR, "tweets_cache.csv")
 
-def filter_dataframe(df, query):
+def filter_dataframe(df, query, index=None):
     """
     Filter DataFrame based on text query.
     
     Args:
         df (pandas.DataFrame): DataFrame to filter
         query (str): Text query to search for
+        index (InvertedIndex, optional): Index over the rows of df; when given
+            the query is a word search (AND/OR, prefix*, #tag, @user) answered
+            from the index instead of a substring scan
         
     Returns:
         pandas.DataFrame: Filtered DataFrame
@@ -25,33 +29,36 @@ def filter_dataframe(df, query):
     if df.empty or not query:
         return df
     
-    # Convert query to lowercase for case-insensitive matching
-    query = query.lower()
+    if index is not None:
+        if len(index) == len(df):
+            return df.iloc[index.search(query)]
+        logger.warning(f"Search index has {len(index)} rows but the frame has {len(df)}; scanning instead")
     
-    # Filter based on text, username, or hashtags
-    mask = (
-        df['text'].str.lower().str.contains(query, na=False) |
-        df['username'].str.lower().str.contains(query, na=False)
-    )
-    
-    # Also check hashtags if available
-    if 'hashtags' in df.columns:
-        # If hashtags are stored as strings, convert to lowercase
-        if df['hashtags'].dtype == 'object':
-            hashtag_mask = df['hashtags'].astype(str).str.lower().str.contains(query, na=False)
-        # If hashtags are stored as lists, check each list
-        else:
-            def check_hashtags(tags):
-                if isinstance(tags, list):
-                    return any(query in tag.lower() for tag in tags)
-                return False
-            
-            hashtag_mask = df['hashtags'].apply(check_hashtags)
-        
-        mask = mask | hashtag_mask
+    # Match text, username and hashtags case-insensitively; the engine keeps
+    # the lowercased columns of df, so repeated queries skip that work
+    mask = query_mask(df, query)
     
     return df[mask]
 
+def keep_newest(df, max_rows):
+    """
+    Keep the newest tweets of a DataFrame by creation time.
+
+    Args:
+        df (pandas.DataFrame): Tweets with a 'created_at' column
+        max_rows (int): Number of tweets to keep
+
+    Returns:
+        tuple: (kept, dropped) DataFrames; kept holds the max_rows tweets with
+               the latest created_at sorted oldest first, and both keep the
+               index labels of df. Tweets without a time are dropped first.
+    """
+    if 'created_at' in df.columns:
+        df = df.sort_values('created_at', kind='stable', na_position='first')
+
+    overflow = max(len(df) - max(max_rows, 0), 0)
+    return df.iloc[overflow:], df.iloc[:overflow]
+
 def cache_data(df):
     """
     Cache DataFrame to disk for persistence.
@@ -173,3 +180,55 @@ def export_data(df, format="csv"):
     except Exception as e:
         logger.error(f"Error exporting data: {e}")
         return None
+
+def export_data_chunks(chunks, format="csv"):
+    """
+    Export DataFrame chunks to one file without holding them all in memory.
+    
+    Args:
+        chunks (iterable): DataFrames with the same columns, e.g. from database.iter_tweets
+        format (str): Export format ('csv' or 'json')
+        
+    Returns:
+        tuple: (path to exported file, number of rows), or (None, 0) if there
+               was nothing to export or the export failed
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    is_json = format.lower() == "json"
+    filename = f"disaster_tweets_{timestamp}.{'json' if is_json else 'csv'}"
+    count = 0
+    
+    try:
+        with open(filename, "w", encoding="utf-8", newline="") as f:
+            if is_json:
+                f.write("[")
+            
+            for df in chunks:
+                if df.empty:
+                    continue
+                
+                if is_json:
+                    # Convert datetime to string to make JSON serializable
+                    df = df.copy()
+                    if 'created_at' in df.columns:
+                        df['created_at'] = df['created_at'].dt.strftime('%Y-%m-%d %H:%M:%S')
+                    records = df.to_json(orient="records", date_format="iso")[1:-1]
+                    f.write(("," if count else "") + records)
+                else:
+                    df.to_csv(f, index=False, header=(count == 0))
+                
+                count += len(df)
+            
+            if is_json:
+                f.write("]")
+        
+        if count == 0:
+            os.remove(filename)
+            return None, 0
+        
+        logger.info(f"Exported {count} rows to {filename}")
+        return filename, count
+        
+    except Exception as e:
+        logger.error(f"Error exporting data: {e}")
+        return None, 0
@@ -0,0 +1,353 @@
+"""
+This module scores text with VADER using a compiled, array-backed lexicon.
+Tokens are mapped to integer ids once, their lexicon valence and rule flags
+live in NumPy arrays, and the booster, negation, "least" and "but" rules are
+applied to a whole batch as operations over token-id matrices.
+
+Results match SentimentIntensityAnalyzer.polarity_scores within 1e-4 on the
+compound score and 1e-3 on pos/neu/neg (float summation order and rounding).
+Texts containing one of VADER's multi-word idioms or booster phrases such as
+"kind of" are scored by polarity_scores itself, so those stay exact too.
+
+Only words VADER's rules know about (lexicon, boosters, negations and the
+few rule words) get their own token ids; every other token maps to one of a
+few shared unknown ids, so the vocabulary stays bounded and the compiled
+lexicon can be shared between threads.
+"""
+
+import string
+import logging
+import threading
+from functools import lru_cache
+import numpy as np
+from nltk_resources import get_vader_analyzer
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+# Words whose exact (case-sensitive) form matters to VADER's "never so/this" rule
+NEVER_WORD = "never"
+SO_THIS_WORDS = {"so", "this"}
+
+# Other words VADER's rules look for
+RULE_WORDS = {"least", "at", "very", "but"}
+
+class CompiledVaderLexicon:
+    def __init__(self, analyzer):
+        """
+        Compile a VADER analyzer's lexicon and rules into lookup arrays.
+
+        Args:
+            analyzer (SentimentIntensityAnalyzer): Loaded NLTK VADER analyzer
+        """
+        self.analyzer = analyzer
+        self.lexicon = analyzer.lexicon
+        self.constants = analyzer.constants
+
+        self.punc_list = set(self.constants.PUNC_LIST)
+        self.remove_punctuation = self.constants.REGEX_REMOVE_PUNCTUATION
+
+        # Multi-word idioms and booster phrases are left to polarity_scores
+        phrases = list(self.constants.SPECIAL_CASE_IDIOMS) + [
+            phrase for phrase in self.constants.BOOSTER_DICT if ' ' in phrase
+        ]
+        phrase_words = sorted({word for phrase in phrases for word in phrase.split()})
+        self.phrase_codes = {word: code for code, word in enumerate(phrase_words, start=1)}
+        self.phrases = [tuple(self.phrase_codes[word] for word in phrase.split()) for phrase in phrases]
+        # "kind" followed by "of" is zeroed by polarity_scores' main loop
+        self.phrases.append((self.phrase_codes["kind"], self.phrase_codes["of"]))
+
+        # Lowercase words whose tokens get their own id; anything else only
+        # matters to the rules through its case and a "n't" negation
+        self.known_words = (set(self.lexicon) | set(self.constants.BOOSTER_DICT) | set(self.constants.NEGATE)
+                            | {NEVER_WORD} | SO_THIS_WORDS | RULE_WORDS | set(self.phrase_codes))
+
+        # Token id 0 is padding and has no effect on any rule; ids 1-4 are the
+        # shared unknown tokens, by (is_upper, is_negation)
+        self.token_ids = {}
+        self._attributes = {name: [default] for name, default in self._attribute_defaults().items()}
+        self._arrays = None
+        self._lock = threading.Lock()
+
+        self.unknown_ids = {}
+        for is_upper in (False, True):
+            for is_negation in (False, True):
+                self.unknown_ids[(is_upper, is_negation)] = self._add_token(
+                    dict(self._attribute_defaults(), is_upper=is_upper, is_negation=is_negation)
+                )
+
+    @staticmethod
+    def _attribute_defaults():
+        """Per-token attributes and their padding values."""
+        return {
+            'valence': 0.0,
+            'in_lexicon': False,
+            'booster': 0.0,
+            'is_booster': False,
+            'is_upper': False,
+            'is_negation': False,
+            'is_never': False,
+            'is_so_this': False,
+            'is_least': False,
+            'is_at_very': False,
+            'is_but': False,
+            'phrase_code': 0
+        }
+
+    def _token_id(self, token):
+        """Get the attribute id of a raw token, compiling a known word's attributes on first sight."""
+        lower = token.lower()
+        if lower not in self.known_words:
+            return self.unknown_ids[(token.isupper(), "n't" in lower)]
+
+        # Attributes depend on the lowercase word, whether it is all caps and
+        # whether it is all lowercase ("never", "so" and "this" are exact)
+        key = (lower, token.isupper(), token == lower)
+        token_id = self.token_ids.get(key)
+        if token_id is not None:
+            return token_id
+
+        with self._lock:
+            token_id = self.token_ids.get(key)
+            if token_id is None:
+                token_id = self._add_token({
+                    'valence': self.lexicon.get(lower, 0.0),
+                    'in_lexicon': lower in self.lexicon,
+                    'booster': self.constants.BOOSTER_DICT.get(lower, 0.0),
+                    'is_booster': lower in self.constants.BOOSTER_DICT,
+                    'is_upper': token.isupper(),
+                    'is_negation': lower in self.constants.NEGATE or "n't" in lower,
+                    'is_never': token == NEVER_WORD,
+                    'is_so_this': token in SO_THIS_WORDS,
+                    'is_least': lower == "least",
+                    'is_at_very': lower in ("at", "very"),
+                    'is_but': lower == "but",
+                    'phrase_code': self.phrase_codes.get(lower, 0)
+                })
+                self.token_ids[key] = token_id
+
+        return token_id
+
+    def _add_token(self, attributes):
+        """Append a token's attributes and return its id; call with the lock held or during __init__."""
+        for name, value in attributes.items():
+            self._attributes[name].append(value)
+
+        self._arrays = None
+        return len(self._attributes['valence']) - 1
+
+    def _attribute_arrays(self):
+        """NumPy views of the token attributes, rebuilt after new tokens were added."""
+        arrays = self._arrays
+        if arrays is None:
+            with self._lock:
+                if self._arrays is None:
+                    self._arrays = {name: np.array(values) for name, values in self._attributes.items()}
+                arrays = self._arrays
+        return arrays
+
+    def tokenize(self, text):
+        """
+        Split text into tokens exactly like VADER's SentiText.
+
+        Args:
+            text (str): Text to tokenize
+
+        Returns:
+            list: Tokens with leading/trailing punctuation removed from words
+        """
+        words_only = {word for word in self.remove_punctuation.sub("", text).split() if len(word) > 1}
+        tokens = [token for token in text.split() if len(token) > 1]
+
+        for i, token in enumerate(tokens):
+            if token in words_only:
+                continue
+            stripped = token.rstrip(string.punctuation)
+            if token[len(stripped):] in self.punc_list and stripped in words_only:
+                tokens[i] = stripped
+                continue
+            stripped = token.lstrip(string.punctuation)
+            if token[:len(token) - len(stripped)] in self.punc_list and stripped in words_only:
+                tokens[i] = stripped
+
+        return tokens
+
+    def polarity_scores_batch(self, texts):
+        """
+        Score many texts at once.
+
+        Args:
+            texts (list): Texts to score
+
+        Returns:
+            dict: 'neg', 'neu', 'pos' and 'compound' numpy arrays aligned with texts
+        """
+        texts = [text if isinstance(text, str) else str(text) for text in texts]
+        n = len(texts)
+
+        token_lists = [self.tokenize(text) for text in texts]
+        lengths = np.array([len(tokens) for tokens in token_lists], dtype=np.int64)
+        width = max(int(lengths.max()) if n else 0, 1)
+
+        # Attribute ids drive the rules; exact ids, from a vocabulary local to
+        # this call, tell repeated tokens apart like VADER's list.index
+        vocabulary = {}
+        ids = np.zeros((n, width), dtype=np.int64)
+        exact_ids = np.zeros((n, width), dtype=np.int64)
+        for row, tokens in enumerate(token_lists):
+            ids[row, :len(tokens)] = [self._token_id(token) for token in tokens]
+            exact_ids[row, :len(tokens)] = [vocabulary.setdefault(token, len(vocabulary) + 1) for token in tokens]
+
+        sentiments = self._sentiments(ids, exact_ids, lengths)
+        scores = self._score_valence(sentiments, lengths, texts)
+
+        # Idioms and booster phrases go through the reference implementation
+        for row in np.flatnonzero(self._phrase_rows(ids)):
+            exact = self.analyzer.polarity_scores(texts[row])
+            for name in scores:
+                scores[name][row] = exact[name]
+
+        return scores
+
+    def _shift(self, matrix, k):
+        """Shift columns right by k so position i holds the value at i - k."""
+        shifted = np.zeros_like(matrix)
+        if k < matrix.shape[1]:
+            shifted[:, k:] = matrix[:, :-k]
+        return shifted
+
+    def _sentiments(self, ids, exact_ids, lengths):
+        """Apply VADER's per-token rules to a token-id matrix."""
+        attr = self._attribute_arrays()
+        c = self.constants
+        n, width = ids.shape
+
+        position = np.broadcast_to(np.arange(width), (n, width))
+        valid = position < lengths[:, None]
+
+        is_upper = attr['is_upper'][ids]
+        upper_count = (is_upper & valid).sum(axis=1)
+        cap_diff = ((lengths - upper_count > 0) & (lengths - upper_count < lengths))[:, None]
+
+        # Only lexicon words that are not boosters themselves carry valence
+        scored = attr['in_lexicon'][ids] & ~attr['is_booster'][ids] & valid
+        valence = np.where(scored, attr['valence'][ids], 0.0)
+        valence = np.where(scored & is_upper & cap_diff,
+                           np.where(valence > 0, valence + c.C_INCR, valence - c.C_INCR), valence)
+
+        previous = [self._shift(ids, k + 1) for k in range(3)]
+
+        for k, prev in enumerate(previous):
+            apply = scored & (position > k) & ~attr['in_lexicon'][prev]
+
+            # Booster / dampener in one of the three preceding words
+            scalar = np.where(valence < 0, -attr['booster'][prev], attr['booster'][prev])
+            caps = attr['is_booster'][prev] & attr['is_upper'][prev] & cap_diff
+            scalar = np.where(caps, np.where(valence > 0, scalar + c.C_INCR, scalar - c.C_INCR), scalar)
+            scalar = scalar * (1.0, 0.95, 0.9)[k]
+            valence = np.where(apply, valence + scalar, valence)
+
+            # Negation and "never so/this"
+            if k == 0:
+                valence = np.where(apply & attr['is_negation'][previous[0]], valence * c.N_SCALAR, valence)
+            elif k == 1:
+                emphasis = attr['is_never'][previous[1]] & attr['is_so_this'][previous[0]]
+                valence = np.where(apply & emphasis, valence * 1.5,
+                                   np.where(apply & attr['is_negation'][previous[1]], valence * c.N_SCALAR, valence))
+            else:
+                emphasis = ((attr['is_never'][previous[2]] & attr['is_so_this'][previous[1]])
+                            | attr['is_so_this'][previous[0]])
+                valence = np.where(apply & emphasis, valence * 1.25,
+                                   np.where(apply & attr['is_negation'][previous[2]], valence * c.N_SCALAR, valence))
+
+        # "least" negates unless it is "at least" / "very least"
+        least = (scored & (position > 0) & attr['is_least'][previous[0]]
+                 & ~attr['in_lexicon'][previous[0]]
+                 & ~((position > 1) & attr['is_at_very'][previous[1]]))
+        valence = np.where(least, valence * c.N_SCALAR, valence)
+
+        # A repeated token reuses the result of its first occurrence
+        valence = valence[np.arange(n)[:, None], self._first_occurrence(exact_ids, valid)]
+
+        # Words before the first "but" are halved, words after it boosted
+        is_but = attr['is_but'][ids] & valid
+        has_but = is_but.any(axis=1)[:, None]
+        but_index = is_but.argmax(axis=1)[:, None]
+        valence = np.where(has_but & (position < but_index), valence * 0.5, valence)
+        valence = np.where(has_but & (position > but_index), valence * 1.5, valence)
+
+        return np.where(valid, valence, 0.0)
+
+    def _first_occurrence(self, exact_ids, valid):
+        """Column of the first occurrence of each token within its row."""
+        n, width = exact_ids.shape
+        first = np.broadcast_to(np.arange(width), (n, width)).copy()
+
+        rows, cols = np.nonzero(valid)
+        keys = rows * (int(exact_ids.max()) + 1) + exact_ids[rows, cols]
+        _, first_index, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        first[rows, cols] = cols[first_index][inverse]
+
+        return first
+
+    def _phrase_rows(self, ids):
+        """Rows containing a multi-word idiom or booster phrase."""
+        codes = self._attribute_arrays()['phrase_code'][ids]
+        width = codes.shape[1]
+        found = np.zeros(codes.shape[0], dtype=bool)
+
+        for phrase in self.phrases:
+            if len(phrase) > width:
+                continue
+            match = np.ones((codes.shape[0], width - len(phrase) + 1), dtype=bool)
+            for offset, code in enumerate(phrase):
+                match &= codes[:, offset:width - len(phrase) + 1 + offset] == code
+            found |= match.any(axis=1)
+
+        return found
+
+    def _score_valence(self, sentiments, lengths, texts):
+        """Turn per-token sentiments into VADER's neg/neu/pos/compound scores."""
+        has_tokens = lengths > 0
+        valid = np.arange(sentiments.shape[1]) < lengths[:, None]
+
+        # Emphasis from exclamation points (up to 4) and question marks (2 or more)
+        exclamations = np.minimum([text.count("!") for text in texts], 4) * 0.292
+        questions = np.array([text.count("?") for text in texts])
+        questions = np.where(questions > 3, 0.96, np.where(questions > 1, questions * 0.18, 0.0))
+        amplifier = exclamations + questions
+
+        # Sum left to right like polarity_scores so ties and zero sums agree exactly
+        total = np.cumsum(sentiments, axis=1)[:, -1]
+        total = np.where(total > 0, total + amplifier, np.where(total < 0, total - amplifier, total))
+        compound = total / np.sqrt(total * total + 15)
+
+        pos_sum = np.cumsum(np.where(sentiments > 0, sentiments + 1, 0.0), axis=1)[:, -1]
+        neg_sum = np.cumsum(np.where(sentiments < 0, sentiments - 1, 0.0), axis=1)[:, -1]
+        neu_count = ((sentiments == 0) & valid).sum(axis=1)
+
+        pos_sum, neg_sum = (np.where(pos_sum > np.abs(neg_sum), pos_sum + amplifier, pos_sum),
+                            np.where(pos_sum < np.abs(neg_sum), neg_sum - amplifier, neg_sum))
+
+        denominator = np.where(has_tokens, pos_sum + np.abs(neg_sum) + neu_count, 1.0)
+
+        return {
+            'neg': np.where(has_tokens, np.round(np.abs(neg_sum / denominator), 3), 0.0),
+            'neu': np.where(has_tokens, np.round(np.abs(neu_count / denominator), 3), 0.0),
+            'pos': np.where(has_tokens, np.round(np.abs(pos_sum / denominator), 3), 0.0),
+            'compound': np.where(has_tokens, np.round(compound, 4), 0.0)
+        }
+
+@lru_cache(maxsize=None)
+def get_compiled_lexicon():
+    """
+    Get the process-wide compiled VADER lexicon, building it on first use.
+
+    Returns:
+        CompiledVaderLexicon: Compiled lexicon, or None if VADER is unavailable
+    """
+    analyzer = get_vader_analyzer()
+    if analyzer is None:
+        return None
+
+    return CompiledVaderLexicon(analyzer)
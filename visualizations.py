@@ -6,21 +6,14 @@ from datetime import datetime, timedelta
 import matplotlib.pyplot as plt
 from matplotlib.colors import LinearSegmentedColormap
 from wordcloud import WordCloud
-import nltk
-from nltk.corpus import stopwords
 import logging
+from nltk_resources import get_stopwords
+from geocoder import geocode_series
+from time_rollup import TimeRollup
 
 # Initialize logger
 logger = logging.getLogger(__name__)
 
-# Try to download stopwords if needed
-try:
-    nltk.download('stopwords', quiet=True)
-    STOPWORDS = set(stopwords.words('english'))
-except Exception as e:
-    logger.warning(f"Failed to download NLTK stopwords: {e}")
-    STOPWORDS = set()
-
 # Add common Twitter terms and disaster-related terms to stopwords
 TWITTER_STOPWORDS = {
     'rt', 'amp', 'http', 'https', 'co', 't.co', 'twitter', 'tweet',
@@ -30,20 +23,30 @@ TWITTER_STOPWORDS = {
     'pics', 'live', 'happening', 'now', 'breaking'
 }
 
-# Combine stopwords
-STOPWORDS = STOPWORDS.union(TWITTER_STOPWORDS)
+def get_wordcloud_stopwords():
+    """Combine NLTK English stopwords, loaded on first use, with the Twitter terms."""
+    return set(get_stopwords('english')).union(TWITTER_STOPWORDS)
 
-def create_sentiment_chart(df):
+def create_sentiment_chart(df, counts=None):
     """
     Create a time-based sentiment analysis chart.
     
     Args:
         df (pandas.DataFrame): DataFrame containing tweet data with sentiment
+        counts (pandas.DataFrame, optional): Hourly counts from
+            TimeRollup.counts(by='sentiment'); used instead of grouping df
         
     Returns:
         plotly.graph_objects.Figure: Plotly figure object
     """
-    if df.empty or 'created_at' not in df.columns or 'sentiment' not in df.columns:
+    if counts is None:
+        if df.empty or 'created_at' not in df.columns or 'sentiment' not in df.columns:
+            counts = pd.DataFrame()
+        else:
+            # Group by hour and sentiment
+            counts = TimeRollup.from_frame(df, ['1h']).counts('1h', by='sentiment')
+    
+    if counts.empty:
         # Return empty figure with message
         fig = go.Figure()
         fig.add_annotation(
@@ -55,15 +58,7 @@ def create_sentiment_chart(df):
         )
         return fig
     
-    # Group by hour and sentiment
-    df_copy = df.copy()
-    df_copy['hour'] = df_copy['created_at'].dt.floor('H')
-    
-    sentiment_counts = df_copy.groupby(['hour', 'sentiment']).size().reset_index(name='count')
-    
-    # Pivot the data for plotting
-    pivot_df = sentiment_counts.pivot(index='hour', columns='sentiment', values='count').fillna(0)
-    pivot_df = pivot_df.reset_index()
+    pivot_df = counts.copy()
     
     # Ensure all sentiment categories exist
     for sentiment in ['positive', 'negative', 'neutral']:
@@ -74,7 +69,7 @@ def create_sentiment_chart(df):
     fig = go.Figure()
     
     fig.add_trace(go.Scatter(
-        x=pivot_df['hour'],
+        x=pivot_df['bucket'],
         y=pivot_df['positive'],
         mode='lines',
         stackgroup='one',
@@ -84,7 +79,7 @@ def create_sentiment_chart(df):
     ))
     
     fig.add_trace(go.Scatter(
-        x=pivot_df['hour'],
+        x=pivot_df['bucket'],
         y=pivot_df['neutral'],
         mode='lines',
         stackgroup='one',
@@ -94,7 +89,7 @@ def create_sentiment_chart(df):
     ))
     
     fig.add_trace(go.Scatter(
-        x=pivot_df['hour'],
+        x=pivot_df['bucket'],
         y=pivot_df['negative'],
         mode='lines',
         stackgroup='one',
@@ -120,17 +115,26 @@ def create_sentiment_chart(df):
     
     return fig
 
-def create_tweet_volume_chart(df):
+def create_tweet_volume_chart(df, counts=None):
     """
     Create a chart showing tweet volume over time.
     
     Args:
         df (pandas.DataFrame): DataFrame containing tweet data
+        counts (pandas.DataFrame, optional): Hourly counts from
+            TimeRollup.counts(); used instead of grouping df
         
     Returns:
         plotly.graph_objects.Figure: Plotly figure object
     """
-    if df.empty or 'created_at' not in df.columns:
+    if counts is None:
+        if df.empty or 'created_at' not in df.columns:
+            counts = pd.DataFrame()
+        else:
+            # Group by hour
+            counts = TimeRollup.from_frame(df, ['1h']).counts('1h')
+    
+    if counts.empty:
         # Return empty figure with message
         fig = go.Figure()
         fig.add_annotation(
@@ -142,18 +146,12 @@ def create_tweet_volume_chart(df):
         )
         return fig
     
-    # Group by hour
-    df_copy = df.copy()
-    df_copy['hour'] = df_copy['created_at'].dt.floor('H')
-    
-    volume_counts = df_copy.groupby('hour').size().reset_index(name='count')
-    
     # Create the volume chart
     fig = px.line(
-        volume_counts, 
-        x='hour', 
-        y='count',
-        labels={'hour': 'Time', 'count': 'Tweet Count'},
+        counts, 
+        x='bucket', 
+        y='tweet_count',
+        labels={'bucket': 'Time', 'tweet_count': 'Tweet Count'},
         title='Tweet Volume Over Time'
     )
     
@@ -212,7 +210,7 @@ def create_word_cloud(df, column='text', max_words=100):
         height=400,
         background_color='white',
         max_words=max_words,
-        stopwords=STOPWORDS,
+        stopwords=get_wordcloud_stopwords(),
         colormap=cmap,
         contour_width=1,
         contour_color='steelblue'
@@ -249,12 +247,19 @@ def create_location_map(df):
         )
         return fig
     
-    # For this example, we'll create a simplified map with random points
-    # In a real application, you would geocode the locations
-    
     # Filter to tweets with location
     location_df = df[df['location'].notna() & (df['location'] != '')].copy()
     
+    # Keep stored coordinates and geocode the rest from the location strings
+    coords = geocode_series(location_df['location'])
+    for column in ['lat', 'lon']:
+        if column in location_df.columns:
+            location_df[column] = pd.to_numeric(location_df[column], errors='coerce').fillna(coords[column])
+        else:
+            location_df[column] = coords[column]
+    
+    location_df = location_df.dropna(subset=['lat', 'lon'])
+    
     if location_df.empty:
         # Return empty figure with message
         fig = go.Figure()
@@ -267,13 +272,6 @@ def create_location_map(df):
         )
         return fig
     
-    # Generate random coordinates for demonstration
-    # In a real app, you would use geocoding
-    import random
-    
-    location_df['lat'] = [random.uniform(25, 50) for _ in range(len(location_df))]
-    location_df['lon'] = [random.uniform(-125, -70) for _ in range(len(location_df))]
-    
     # Set marker colors based on sentiment
     colors = {
         'positive': 'green',